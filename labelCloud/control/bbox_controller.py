@@ -352,8 +352,7 @@ class BoundingBoxController(object):
             x,
             y,
             self.unified_annotation_controller.items,
-            self.view.gl_widget.modelview,
-            self.view.gl_widget.projection,
+            self.view.gl_widget.camera,
         )
         if intersected_bbox_id is not None:
             self.set_active_bbox(intersected_bbox_id)
@@ -390,6 +389,15 @@ class BoundingBoxController(object):
         
         self.unified_annotation_controller.update_label_list()
 
+    def assign_point_label_in_all_boxes(self) -> None:
+        """Relabel the points inside all bounding boxes in one pass."""
+        boxes = [
+            item
+            for item in self.unified_annotation_controller.items
+            if isinstance(item, BBox)
+        ]
+        self.pcd_manager.assign_point_label_in_boxes(boxes)
+
     def assign_point_label_in_active_box(self) -> None:
         box = self.get_active_bbox()
         if box is not None:
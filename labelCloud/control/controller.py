@@ -51,6 +51,12 @@ class Controller:
         self.side_mode = False
         self.selected_side: Optional[str] = None
 
+        # Hovered side is only recomputed if the cursor, the view or the box changed
+        self.hover_key: Optional[tuple] = None
+        self.hovered_side: Optional[str] = None
+        self.hover_hits = 0
+        self.hover_recomputes = 0
+
     def startup(self, view: "GUI") -> None:
         """Sets the view in all controllers and dependent modules; Loads labels from file."""
         self.view = view
@@ -76,6 +82,8 @@ class Controller:
 
     def loop_gui(self) -> None:
         """Function collection called during each event loop iteration."""
+        # the hovered side and crosshair depend on the camera moved since the last frame
+        self.view.gl_widget.update_camera_pose()
         self.set_crosshair()
         self.set_selected_side()
         self.view.gl_widget.updateGL()
@@ -176,12 +184,8 @@ class Controller:
             )
             and isinstance( self.unified_annotation_controller.get_active_item(), BBox)
         ):
-            _, self.selected_side = oglhelper.get_intersected_sides(
-                self.curr_cursor_pos.x(),
-                self.curr_cursor_pos.y(),
-                self.unified_annotation_controller.get_active_item(),  # type: ignore
-                self.view.gl_widget.modelview,
-                self.view.gl_widget.projection,
+            self.selected_side = self.get_hovered_side(
+                self.unified_annotation_controller.get_active_item()  # type: ignore
             )
         if (
             self.selected_side
@@ -202,6 +206,26 @@ class Controller:
             self.view.gl_widget.selected_side_vertices = np.array([])
             self.view.status_manager.clear_message(Context.SIDE_HOVERED)
 
+    def get_hovered_side(self, bbox: BBox) -> Optional[str]:
+        """Returns the side of the bounding box below the cursor, cached until a change."""
+        assert self.curr_cursor_pos is not None
+        hover_key = (
+            self.curr_cursor_pos.x(),
+            self.curr_cursor_pos.y(),
+            self.view.gl_widget.camera.version,
+            bbox.version,  # unique across all boxes
+        )
+        if hover_key == self.hover_key:
+            self.hover_hits += 1
+            return self.hovered_side
+
+        self.hover_recomputes += 1
+        self.hover_key = hover_key
+        _, self.hovered_side = oglhelper.get_intersected_sides(
+            *hover_key[:2], bbox, self.view.gl_widget.camera
+        )
+        return self.hovered_side
+
     # EVENT PROCESSING
     def mouse_clicked(self, a0: QtGui.QMouseEvent) -> None:
         """Triggers actions when the user clicks the mouse."""
@@ -231,8 +255,7 @@ class Controller:
             x,
             y,
             self.unified_annotation_controller.items,
-            self.view.gl_widget.modelview,
-            self.view.gl_widget.projection,
+            self.view.gl_widget.camera,
         )
         if intersected_bbox_id is not None:
             self.unified_annotation_controller.set_active_item(intersected_bbox_id)
@@ -48,12 +48,25 @@ class DrawingManager(object):
         self, x: float, y: float, correction: bool = False, is_temporary: bool = False
     ) -> None:
         assert self.drawing_strategy is not None
-        world_point = self.view.gl_widget.get_world_coords(x, y, correction=correction)
+        point_id = None
+        if self.drawing_strategy.PICKS_POINT_IDS:
+            point_id = self.view.gl_widget.pick_point_id(x, y)
+
+        if point_id is not None:  # exact point under the cursor, no depth readback
+            pointcloud = self.view.gl_widget.pcd_manager.pointcloud
+            assert pointcloud is not None
+            world_point = tuple(pointcloud.points[point_id].tolist())
+            kwargs = {"point_id": point_id}
+        else:
+            world_point = self.view.gl_widget.get_world_coords(
+                x, y, correction=correction
+            )
+            kwargs = {}
 
         if is_temporary:
-            self.drawing_strategy.register_tmp_point(world_point)
+            self.drawing_strategy.register_tmp_point(world_point, **kwargs)
         else:
-            self.drawing_strategy.register_point(world_point)
+            self.drawing_strategy.register_point(world_point, **kwargs)
             
             # If the strategy is a point picking strategy, we add the point to the pick point controller
             if self.drawing_strategy.__class__.__name__== "PickingPointStrategy" and self.drawing_strategy.pick_flow: # Checking if we in pick point or pick flow 
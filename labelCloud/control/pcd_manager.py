@@ -9,16 +9,18 @@ from shutil import copyfile
 from typing import TYPE_CHECKING, List, Optional, Set, Tuple, Union
 
 import numpy as np
-import open3d as o3d
 import pkg_resources
 
 from ..definitions import LabelingMode, Point3D
 from ..io.labels.config import LabelConfig
-from ..io.pointclouds import BasePointCloudHandler, Open3DHandler
+from ..io.pointclouds import BasePointCloudHandler
 from ..model import BBox, Perspective, PointCloud, Point
+from ..utils import math3d
+from ..utils.box_labeling import label_points_in_bboxes
 from ..utils.logger import blue, green, print_column
 from .config_manager import config
 from .label_manager import LabelManager
+from .pcd_prefetcher import PointCloudPrefetcher
 
 if TYPE_CHECKING:
     from ..view.gui import GUI
@@ -36,6 +38,7 @@ class PointCloudManger(object):
         self.pcd_folder = config.getpath("FILE", "pointcloud_folder")
         self.pcds: List[Path] = []
         self.current_id = -1
+        self.prefetcher = PointCloudPrefetcher()
 
         self.view: GUI
         self.label_manager = LabelManager()
@@ -58,6 +61,7 @@ class PointCloudManger(object):
 
     def read_pointcloud_folder(self) -> None:
         """Checks point cloud folder and sets self.pcds to all valid point cloud file names."""
+        self.prefetcher.clear()
         if self.pcd_folder.is_dir():
             self.pcds = []
             for file in sorted(self.pcd_folder.rglob("*")):
@@ -101,11 +105,7 @@ class PointCloudManger(object):
         if self.pcds_left():
             self.current_id += 1
             self.save_current_perspective()
-            self.pointcloud = PointCloud.from_file(
-                self.pcd_path,
-                self.saved_perspective,
-                write_buffer=self.pointcloud is not None,
-            )
+            self.load_current_pcd()
             self.update_pcd_infos()
         else:
             logging.warning("No point clouds left!")
@@ -115,11 +115,7 @@ class PointCloudManger(object):
         if pcd_index < len(self.pcds):
             self.current_id = pcd_index
             self.save_current_perspective()
-            self.pointcloud = PointCloud.from_file(
-                self.pcd_path,
-                self.saved_perspective,
-                write_buffer=self.pointcloud is not None,
-            )
+            self.load_current_pcd()
             self.update_pcd_infos()
         else:
             logging.warning("This point cloud does not exists!")
@@ -129,13 +125,30 @@ class PointCloudManger(object):
         if self.current_id > 0:
             self.current_id -= 1
             self.save_current_perspective()
-            self.pointcloud = PointCloud.from_file(
-                self.pcd_path, self.saved_perspective
-            )
+            self.load_current_pcd()
             self.update_pcd_infos()
         else:
             raise Exception("No point cloud left for loading!")
 
+    def load_current_pcd(self) -> None:
+        """Show the current point cloud and prefetch its neighbours in the background."""
+        self.set_pointcloud(
+            PointCloud.from_file(
+                self.pcd_path,
+                self.saved_perspective,
+                write_buffer=self.pointcloud is not None,
+                frame=self.prefetcher.get_frame(self.pcd_path),
+            )
+        )
+        self.prefetcher.prefetch(self.pcds, self.current_id)
+
+    def set_pointcloud(self, pointcloud: PointCloud) -> None:
+        """Replace the shown point cloud and index the new one in the background."""
+        if self.pointcloud is not None:
+            self.pointcloud.release_spatial_index()
+        self.pointcloud = pointcloud
+        self.pointcloud.build_spatial_index()
+
     def populate_class_dropdown(self) -> None:
         # Add point label list
         self.view.current_class_dropdown.clear()
@@ -235,12 +248,12 @@ class PointCloudManger(object):
         logging.info("Copyied the original point cloud to %s.", blue(originals_path))
 
         # Rotate and translate point cloud
-        rotation_matrix = o3d.geometry.get_rotation_matrix_from_axis_angle(
+        rotation_matrix = math3d.get_rotation_matrix_from_axis_angle(
             np.multiply(axis, angle)
-        )
-        o3d_pointcloud = Open3DHandler.to_open3d_point_cloud(self.pointcloud)
-        o3d_pointcloud.rotate(rotation_matrix, center=tuple(rotation_point))
-        o3d_pointcloud.translate([0, 0, -rotation_point[2]])
+        ).astype(np.float32)
+        center = np.array(rotation_point, dtype=np.float32)
+        points = (self.pointcloud.points - center) @ rotation_matrix.T + center
+        points[:, 2] -= center[2]
         logging.info("Rotating point cloud...")
         print_column(["Angle:", str(np.round(angle, 3))])
         print_column(["Axis:", str(np.round(axis, 3))])
@@ -249,34 +262,58 @@ class PointCloudManger(object):
         # Check if pointcloud is upside-down
         if abs(self.pointcloud.pcd_mins[2]) > self.pointcloud.pcd_maxs[2]:
             logging.warning("Point cloud is upside down, rotating ...")
-            o3d_pointcloud.rotate(
-                o3d.geometry.get_rotation_matrix_from_xyz([np.pi, 0, 0]),
-                center=(0, 0, 0),
+            points[:, 1:] *= -1  # rotation by 180° around the x-axis
+
+        # colors and labels don't change and are passed on without copy, attributes
+        # are copied as they might be views into the memory-mapped file that is written
+        previous = self.pointcloud
+        chunks = previous.chunks
+        self.set_pointcloud(
+            PointCloud(
+                self.pcd_path,
+                points,
+                previous.original_colors,
+                previous.labels,
+                attributes={
+                    name: np.array(values)
+                    for name, values in previous.attributes.items()
+                },
+                order=previous.order,
+                chunks=chunks.moved(points) if chunks is not None else None,
             )
-
-        points, colors = Open3DHandler.to_point_cloud(o3d_pointcloud)
-        self.pointcloud = PointCloud(
-            self.pcd_path,
-            points,
-            colors,
-            self.pointcloud.labels,
         )
+        del previous, chunks  # the last references to the mapped file
         self.pointcloud.to_file()
 
     def assign_point_label_in_box(self, box: BBox) -> None:
+        self.assign_point_label_in_boxes([box])
+
+    def assign_point_label_in_boxes(self, boxes: List[BBox]) -> None:
+        """Relabel the points inside the boxes, later boxes overwrite earlier ones."""
         assert self.pointcloud is not None
-        points = self.pointcloud.points
-        points_inside = box.is_inside(points)
-
-        # Relabel the points if its inside the box
-        if self.pointcloud.has_label:
-            assert self.pointcloud.labels is not None
-            self.pointcloud.labels[points_inside] = (
-                LabelConfig().get_class(box.classname).id
-            )
-            self.pointcloud.update_selected_points_in_label_vbo(points_inside)
+        if not self.pointcloud.has_label or not boxes:
+            return
+        assert self.pointcloud.labels is not None
+        label_config = LabelConfig()
+        spatial_index = (  # don't wait for an index that is still being built
+            self.pointcloud.spatial_index if self.pointcloud.has_spatial_index else None
+        )
+        result = label_points_in_bboxes(
+            self.pointcloud.points,
+            [box.get_vertices() for box in boxes],
+            [label_config.get_class(box.classname).id for box in boxes],
+            self.pointcloud.labels,
+            spatial_index,
+            block_bounds=(
+                self.pointcloud.block_bounds
+                if spatial_index is None and self.pointcloud.is_reordered
+                else None
+            ),
+        )
+        self.pointcloud.update_selected_points_in_label_vbo(result.changed)
+        for box, count in zip(boxes, result.counts):
             logging.info(
-                f"Labeled {np.sum(points_inside)} points inside the current bounding box with label `{box.classname}`"
+                f"Labeled {count} points inside the bounding box with label `{box.classname}`"
             )
 
     # HELPER
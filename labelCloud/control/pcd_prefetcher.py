@@ -0,0 +1,137 @@
+"""
+Module to decode neighbouring point clouds in the background.
+While a point cloud is labeled, the following and preceding files are read by a pool
+of worker threads, so switching the point cloud only has to upload the buffers.
+"""
+
+import functools
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..model.point_cloud import PointCloud, PointCloudFrame
+from .config_manager import config
+
+BYTES_PER_MEGABYTE = 1024 * 1024
+
+
+class PointCloudPrefetcher(object):
+    """Bounded LRU cache of point cloud frames that are decoded by a worker pool.
+
+    Frames are evicted when they leave the prefetch window or when the decoded frames
+    exceed the memory limit (least recently requested first).
+    """
+
+    def __init__(self) -> None:
+        self.depth_next = config.getint("POINTCLOUD", "prefetch_next")
+        self.depth_previous = config.getint("POINTCLOUD", "prefetch_previous")
+        self.memory_limit = int(
+            config.getfloat("POINTCLOUD", "prefetch_memory_limit") * BYTES_PER_MEGABYTE
+        )
+        self.workers = config.getint("POINTCLOUD", "prefetch_workers")
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._frames: "OrderedDict[Path, Future[PointCloudFrame]]" = OrderedDict()
+        self._sizes: Dict[Path, int] = {}  # memory of the decoded frames
+        # futures finish in the worker threads, or directly when they are already done
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0 and (self.depth_next > 0 or self.depth_previous > 0)
+
+    @property
+    def memory_usage(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def __contains__(self, path: object) -> bool:
+        with self._lock:
+            return path in self._frames
+
+    def get_frame(self, path: Path) -> PointCloudFrame:
+        """Return the decoded frame from the cache or read it synchronously."""
+        with self._lock:
+            future = self._frames.pop(path, None)
+            self._sizes.pop(path, None)
+
+        if future is not None and not future.cancelled():
+            try:
+                frame = future.result()  # might still be decoding
+            except Exception:
+                logging.exception(f"Prefetching {path.name} failed, reading it again.")
+            else:
+                self.hits += 1
+                logging.info(
+                    f"Took {path.name} from prefetch cache "
+                    f"({self.hits} hits, {self.misses} misses)."
+                )
+                return frame
+
+        self.misses += 1
+        logging.info(
+            f"{path.name} was not prefetched ({self.hits} hits, {self.misses} misses)."
+        )
+        return PointCloud.read_frame(path)
+
+    def prefetch(self, pcds: List[Path], current_id: int) -> None:
+        """Start decoding the neighbours of the current point cloud in the background.
+
+        Frames outside of the new prefetch window are dropped from the cache.
+        """
+        if not self.enabled:
+            return
+
+        # alternate between following and preceding point clouds, closest first
+        window: List[Path] = []
+        for offset in range(1, max(self.depth_next, self.depth_previous) + 1):
+            if offset <= self.depth_next and current_id + offset < len(pcds):
+                window.append(pcds[current_id + offset])
+            if offset <= self.depth_previous and current_id - offset >= 0:
+                window.append(pcds[current_id - offset])
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="pcd_prefetch"
+            )
+
+        with self._lock:
+            for path in list(self._frames):
+                if path not in window:
+                    self._drop(path)
+            # the closest point clouds are requested last, so they are evicted last
+            for path in reversed(window):
+                if path in self._frames:
+                    self._frames.move_to_end(path)
+                    continue
+                future = self._executor.submit(PointCloud.read_frame, path)
+                self._frames[path] = future
+                future.add_done_callback(functools.partial(self._on_decoded, path))
+
+    def clear(self) -> None:
+        with self._lock:
+            for path in list(self._frames):
+                self._drop(path)
+
+    def _on_decoded(self, path: Path, future: "Future[PointCloudFrame]") -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            if self._frames.get(path) is not future:
+                return  # already dropped or taken
+            self._sizes[path] = future.result().nbytes
+            while sum(self._sizes.values()) > self.memory_limit:
+                evicted = next(p for p in self._frames if p in self._sizes)
+                logging.debug(f"Evicting {evicted.name} from prefetch cache.")
+                self._drop(evicted)
+
+    def _drop(self, path: Path) -> None:
+        """Remove a frame from the cache, the lock must be held by the caller."""
+        self._frames.pop(path).cancel()
+        self._sizes.pop(path, None)
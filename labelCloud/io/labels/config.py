@@ -1,6 +1,6 @@
 import json
 from dataclasses import dataclass
-from typing import Dict, List, Union
+from typing import Dict, List, Tuple, Union
 
 import numpy as np
 import numpy.typing as npt
@@ -96,19 +96,34 @@ class LabelConfig(object, metaclass=SingletonABCMeta):
     def nb_of_classes(self) -> int:
         return len(self.classes)
 
+    @property
+    def class_colors_key(self) -> tuple:
+        """Changes whenever a class id or color changes, used to invalidate caches."""
+        return tuple((c.id, tuple(c.color[0:3])) for c in self.classes)
+
+    def _get_class_lookups(self) -> Tuple[npt.NDArray[np.float32], npt.NDArray[np.int8]]:
+        key = self.class_colors_key
+        if getattr(self, "_class_lookups_key", None) != key:
+            color_map = np.array([c.color[0:3] for c in self.classes]).astype(np.float32)
+            max_class_id = max(c.id for c in self.classes) + 1
+            class_order = -np.ones((max_class_id,), dtype=np.int8)
+            for order, c in enumerate(self.classes):
+                class_order[c.id] = order
+            color_map.setflags(write=False)  # shared between all callers
+            class_order.setflags(write=False)
+            self._class_lookups = (color_map, class_order)
+            self._class_lookups_key = key
+        return self._class_lookups
+
     @property
     def color_map(self) -> npt.NDArray[np.float32]:
         """An (N, 3) array where N is the number of classes and color_map[i] represents the i-th class' rgb color."""
-        return np.array([c.color[0:3] for c in self.classes]).astype(np.float32)
+        return self._get_class_lookups()[0]
 
     @property
     def class_order(self) -> npt.NDArray[np.int8]:
         """An array lookup table to look up the order of a class id in the label definition."""
-        max_class_id = max(c.id for c in self.classes) + 1
-        lookup = -np.ones((max_class_id,), dtype=np.int8)
-        for order, c in enumerate(self.classes):
-            lookup[c.id] = order
-        return lookup
+        return self._get_class_lookups()[1]
 
     # GETTERS
 
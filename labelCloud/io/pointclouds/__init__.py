@@ -1,3 +1,5 @@
 from .base import BasePointCloudHandler
 from .numpy import NumpyHandler
+from .pcd import PcdHandler
+from .ply import PlyHandler
 from .open3d import Open3DHandler
@@ -1,9 +1,10 @@
 import logging
 from abc import abstractmethod
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, Set, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, NamedTuple, Optional, Set, Tuple
 
 import numpy as np
+import numpy.typing as npt
 
 from ...utils.logger import blue
 from ...utils.singleton import SingletonABCMeta
@@ -11,6 +12,47 @@ from ...utils.singleton import SingletonABCMeta
 if TYPE_CHECKING:
     from ...model import PointCloud
 
+# Number of points checked at once when scanning for NaN values
+NAN_SCAN_CHUNK_SIZE = 1 << 20
+# Number of points per block when streaming point cloud files
+STREAM_CHUNK_POINTS = 1 << 20
+
+
+class PointCloudChunk(NamedTuple):
+    """Consecutive points of a point cloud file with their colors and attributes."""
+
+    points: npt.NDArray[np.float32]  # (N, 3)
+    colors: Optional[npt.NDArray[np.float32]]
+    attributes: Dict[str, npt.NDArray]
+
+
+def get_nan_free_mask(
+    points: npt.NDArray, chunk_size: int = NAN_SCAN_CHUNK_SIZE
+) -> Optional[npt.NDArray[np.bool_]]:
+    """Return a mask of the points without NaN coordinates or None if there are none.
+
+    The points are scanned chunk-wise first, so memory-mapped arrays without NaN
+    values are only read once and never copied.
+    """
+    for start in range(0, len(points), chunk_size):
+        if np.isnan(points[start : start + chunk_size]).any():
+            return ~np.isnan(points).any(axis=1)
+    return None
+
+
+def drop_nan_points(
+    points: npt.NDArray,
+    colors: Optional[npt.NDArray],
+    attributes: Dict[str, npt.NDArray],
+) -> PointCloudChunk:
+    """Remove the points with NaN coordinates (and their colors and attributes)."""
+    nan_free = get_nan_free_mask(points)
+    if nan_free is not None:
+        points = points[nan_free]
+        colors = colors[nan_free] if colors is not None else None
+        attributes = {name: values[nan_free] for name, values in attributes.items()}
+    return PointCloudChunk(points, colors, attributes)
+
 
 class BasePointCloudHandler(object, metaclass=SingletonABCMeta):
     EXTENSIONS: Set[str] = set()  # should be set in subclasses
@@ -23,6 +65,50 @@ class BasePointCloudHandler(object, metaclass=SingletonABCMeta):
         )
         pass
 
+    def read_point_cloud_with_attributes(
+        self, path: Path
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], Dict[str, np.ndarray]]:
+        """Read a point cloud file and return the points, colors and any additional
+        per-point fields (e.g. intensity) keyed by their name.
+
+        Handlers that can't read additional fields fall back to `read_point_cloud`.
+        """
+        points, colors = self.read_point_cloud(path)
+        return points, colors, {}
+
+    def iter_chunks(
+        self, path: Path, chunk_points: int = STREAM_CHUNK_POINTS
+    ) -> Iterator[PointCloudChunk]:
+        """Read a point cloud file in blocks of at most `chunk_points` float32 points.
+
+        Handlers that can stream their format never hold the whole file in memory.
+        Points with NaN coordinates are dropped, so blocks can be smaller.
+        """
+        logging.info(
+            blue("Streaming point cloud from %s using %s."),
+            path,
+            self.__class__.__name__,
+        )
+        return self._iter_chunks(path, max(chunk_points, 1))
+
+    def _iter_chunks(self, path: Path, chunk_points: int) -> Iterator[PointCloudChunk]:
+        """Fallback for formats that can't be streamed, reads the whole file."""
+        points, colors, attributes = self.read_point_cloud_with_attributes(path)
+        points = np.asarray(points, dtype=np.float32)
+        if colors is not None and len(colors) != len(points):
+            colors = None  # e.g. empty colors of colorless point clouds
+        for start in range(0, len(points), chunk_points):
+            block = slice(start, start + chunk_points)
+            yield PointCloudChunk(
+                points[block],
+                (
+                    np.asarray(colors[block], dtype=np.float32)
+                    if colors is not None
+                    else None
+                ),
+                {name: values[block] for name, values in attributes.items()},
+            )
+
     @abstractmethod
     def write_point_cloud(self, path: Path, pointcloud: "PointCloud") -> None:
         logging.info(
@@ -36,7 +122,11 @@ class BasePointCloudHandler(object, metaclass=SingletonABCMeta):
 
     @classmethod
     def get_handler(cls, file_extension: str) -> "BasePointCloudHandler":
-        """Return a point cloud handler for the given file extension."""
+        """Return a point cloud handler for the given file extension.
+
+        Handlers are checked in the order they are imported in `__init__.py`, so
+        specialised handlers take precedence over the generic `Open3DHandler`.
+        """
         for subclass in cls.__subclasses__():
             if file_extension in subclass.EXTENSIONS:
                 return subclass()
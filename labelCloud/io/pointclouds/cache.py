@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import shutil
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from ...control.config_manager import config
+from ...utils.singleton import SingletonABCMeta
+from .base import PointCloudChunk
+
+BYTES_PER_MEGABYTE = 1024 * 1024
+MANIFEST = "manifest.json"
+
+
+class DecodedPointCloud(NamedTuple):
+    points: npt.NDArray[np.float32]
+    colors: Optional[npt.NDArray[np.float32]]
+    attributes: Dict[str, npt.NDArray]
+    bounds: npt.NDArray[np.float32]  # rows: minimums, maximums, center
+
+
+def get_bounds(points: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    return np.array(
+        [np.amin(points, axis=0), np.amax(points, axis=0), np.mean(points, axis=0)],
+        dtype=np.float32,
+    )
+
+
+class StreamingBounds(object):
+    """Bounds and center like `get_bounds` of points that are added chunk by chunk."""
+
+    def __init__(self) -> None:
+        self.mins = np.full(3, np.inf)
+        self.maxs = np.full(3, -np.inf)
+        self.sums = np.zeros(3)
+        self.no_of_points = 0
+
+    def add(self, points: npt.NDArray[np.float32]) -> None:
+        if len(points) == 0:
+            return
+        self.mins = np.minimum(self.mins, np.amin(points, axis=0))
+        self.maxs = np.maximum(self.maxs, np.amax(points, axis=0))
+        self.sums += np.sum(points, axis=0, dtype=np.float64)
+        self.no_of_points += len(points)
+
+    @property
+    def bounds(self) -> npt.NDArray[np.float32]:
+        center = self.sums / max(self.no_of_points, 1)
+        return np.array([self.mins, self.maxs, center], dtype=np.float32)
+
+
+def decode_chunks(chunks: Iterable[PointCloudChunk]) -> DecodedPointCloud:
+    """Join streamed chunks, the bounds are collected while they are read."""
+    bounds = StreamingBounds()
+    points: List[npt.NDArray[np.float32]] = []
+    colors: List[npt.NDArray[np.float32]] = []
+    attributes: Dict[str, List[npt.NDArray]] = {}
+    for chunk in chunks:
+        bounds.add(chunk.points)
+        points.append(chunk.points)
+        if chunk.colors is not None:
+            colors.append(chunk.colors)
+        for name, values in chunk.attributes.items():
+            attributes.setdefault(name, []).append(values)
+    if not points:
+        return DecodedPointCloud(
+            np.empty((0, 3), dtype=np.float32), None, {}, bounds.bounds
+        )
+    return DecodedPointCloud(
+        np.concatenate(points),
+        np.concatenate(colors) if colors else None,
+        {name: np.concatenate(values) for name, values in attributes.items()},
+        bounds.bounds,
+    )
+
+
+class DecodedPointCloudCache(object, metaclass=SingletonABCMeta):
+    """Opt-in disk cache of decoded point clouds stored as `.npy` arrays.
+
+    Entries are keyed by the path, modification time and size of the point cloud
+    file, so changed files are decoded again. The arrays are memory-mapped when
+    loaded and the least recently used entries are deleted above the size limit.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()  # point clouds are also decoded by the prefetcher
+        self._folder: Optional[Path] = None
+        self._entries: Dict[str, int] = {}  # key -> size, from least recently used
+
+    @property
+    def enabled(self) -> bool:
+        return config.getboolean("POINTCLOUD", "decoded_cache")
+
+    @property
+    def folder(self) -> Path:
+        """Cache folder next to the point cloud folder."""
+        pcd_folder = config.getpath("FILE", "pointcloud_folder").absolute()
+        return pcd_folder.parent / f".{pcd_folder.name}_cache"
+
+    @property
+    def size_limit(self) -> int:
+        return int(
+            config.getfloat("POINTCLOUD", "decoded_cache_size") * BYTES_PER_MEGABYTE
+        )
+
+    @staticmethod
+    def get_key(path: Path) -> str:
+        stat = path.stat()
+        identifier = f"{path.absolute()}:{stat.st_mtime_ns}:{stat.st_size}"
+        return hashlib.sha1(identifier.encode("utf-8")).hexdigest()
+
+    def load(self, path: Path) -> Optional[DecodedPointCloud]:
+        key = self.get_key(path)
+        with self._lock:
+            self._scan_folder()
+            if key not in self._entries:
+                return None
+            self._entries[key] = self._entries.pop(key)  # mark as recently used
+        entry = self.folder / key
+
+        try:
+            manifest = json.loads((entry / MANIFEST).read_text())
+            points = np.load(entry / "points.npy", mmap_mode="r")
+            colors = (
+                np.load(entry / "colors.npy", mmap_mode="r")
+                if manifest["colors"]
+                else None
+            )
+            attributes = {
+                name: np.load(entry / filename, mmap_mode="r")
+                for name, filename in manifest["attributes"].items()
+            }
+            bounds = np.load(entry / "bounds.npy")
+            (entry / MANIFEST).touch()  # keeps the order of use across sessions
+        except (OSError, ValueError, KeyError):
+            logging.warning(f"Dropping broken cache entry for {path.name}.")
+            with self._lock:
+                self._remove(key)
+            return None
+
+        logging.info(f"Loaded decoded point cloud {path.name} from cache.")
+        return DecodedPointCloud(points, colors, attributes, bounds)
+
+    def store(self, path: Path, decoded: DecodedPointCloud) -> None:
+        key = self.get_key(path)
+        # write into a temporary folder first, so no half-written entry is ever read
+        tmp_entry = self.folder / f".{key}_{uuid.uuid4().hex}"
+        try:
+            tmp_entry.mkdir(parents=True)
+            np.save(tmp_entry / "points.npy", decoded.points)
+            if decoded.colors is not None:
+                np.save(tmp_entry / "colors.npy", decoded.colors)
+            filenames = {}
+            for i, (name, values) in enumerate(decoded.attributes.items()):
+                filenames[name] = f"attribute_{i}.npy"
+                np.save(tmp_entry / filenames[name], values)
+            np.save(tmp_entry / "bounds.npy", decoded.bounds)
+            (tmp_entry / MANIFEST).write_text(
+                json.dumps(
+                    {
+                        "path": str(path),
+                        "colors": decoded.colors is not None,
+                        "attributes": filenames,
+                    }
+                )
+            )
+        except OSError:
+            logging.exception(f"Could not store {path.name} in the cache.")
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            return
+
+        with self._lock:
+            self._scan_folder()
+            try:
+                tmp_entry.rename(self.folder / key)
+            except OSError:  # stored by another thread in the meantime
+                shutil.rmtree(tmp_entry, ignore_errors=True)
+                return
+            self._entries[key] = self._get_size(self.folder / key)
+            while sum(self._entries.values()) > self.size_limit and self._entries:
+                self._remove(next(iter(self._entries)))
+        logging.info(f"Stored decoded point cloud {path.name} in cache.")
+
+    def _scan_folder(self) -> None:
+        """Index the existing entries of the cache folder, ordered by their last use."""
+        folder = self.folder
+        if self._folder == folder:
+            return
+        self._folder = folder
+        entries = sorted(
+            (
+                entry
+                for entry in folder.glob("*")
+                if not entry.name.startswith(".") and (entry / MANIFEST).is_file()
+            ),
+            key=lambda entry: (entry / MANIFEST).stat().st_mtime,
+        )
+        self._entries = {entry.name: self._get_size(entry) for entry in entries}
+
+    @staticmethod
+    def _get_size(entry: Path) -> int:
+        return sum(file.stat().st_size for file in entry.iterdir())
+
+    def _remove(self, key: str) -> None:
+        self._entries.pop(key, None)
+        shutil.rmtree(self.folder / key, ignore_errors=True)
@@ -1,33 +1,93 @@
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, Tuple
+from typing import TYPE_CHECKING, Dict, Iterator, Tuple
 
 import numpy as np
 import numpy.typing as npt
 
+from ...control.config_manager import config
 from . import BasePointCloudHandler
+from .base import PointCloudChunk, drop_nan_points
 
 if TYPE_CHECKING:
     from ...model import PointCloud
 
 
+def is_memory_mapped(array: npt.NDArray) -> bool:
+    """Check if the array (or the array it is a view of) is backed by a memory map."""
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base  # type: ignore
+    return False
+
+
 class NumpyHandler(BasePointCloudHandler):
     EXTENSIONS = {".bin"}
 
     def __init__(self) -> None:
         super().__init__()
 
+    @property
+    def memory_map(self) -> bool:
+        return config.getboolean("POINTCLOUD", "memory_map")
+
     def read_point_cloud(self, path: Path) -> Tuple[npt.NDArray, None]:
         """Read point cloud file as array and drop reflection and nan values."""
+        points, _, _ = self.read_point_cloud_with_attributes(path)
+        return (points, None)
+
+    def read_point_cloud_with_attributes(
+        self, path: Path
+    ) -> Tuple[npt.NDArray, None, Dict[str, npt.NDArray]]:
+        """Read point cloud file as array and keep reflection values as `intensity`.
+
+        With `memory_map` enabled the file is not loaded into memory, instead the
+        returned points and intensities are strided views into the mapped file. They
+        are only copied if the point cloud contains NaN values that must be removed.
+        """
         super().read_point_cloud(path)
-        points = np.fromfile(path, dtype=np.float32)
-        points = points.reshape((-1, 4 if len(points) % 4 == 0 else 3))[:, 0:3]
-        return (points[~np.isnan(points).any(axis=1)], None)
+        data: npt.NDArray[np.float32]
+        if self.memory_map:
+            data = np.memmap(path, dtype=np.float32, mode="r")
+        else:
+            data = np.fromfile(path, dtype=np.float32)
+        data = data.reshape((-1, 4 if len(data) % 4 == 0 else 3))
+        points = data[:, 0:3]
+        attributes = {"intensity": data[:, 3]} if data.shape[1] == 4 else {}
+        points, _, attributes = drop_nan_points(points, None, attributes)
+        return (points, None, attributes)
+
+    def _iter_chunks(self, path: Path, chunk_points: int) -> Iterator[PointCloudChunk]:
+        """Read blocks of the file with their own contiguous points and intensities."""
+        columns = 4 if (path.stat().st_size // 4) % 4 == 0 else 3
+        with path.open("rb") as stream:
+            while True:
+                data = np.fromfile(
+                    stream, dtype=np.float32, count=chunk_points * columns
+                )
+                if len(data) == 0:
+                    return
+                data = data.reshape((-1, columns))
+                attributes = (
+                    {"intensity": np.ascontiguousarray(data[:, 3])}
+                    if columns == 4
+                    else {}
+                )
+                yield drop_nan_points(
+                    np.ascontiguousarray(data[:, 0:3]), None, attributes
+                )
 
     def write_point_cloud(self, path: Path, pointcloud: "PointCloud") -> None:
-        """Write point cloud points into binary file."""
+        """Write point cloud points (and intensities if available) into binary file."""
         super().write_point_cloud(path, pointcloud)
-        logging.warning(
-            "Only writing point coordinates, any previous reflection values will be dropped."
-        )
-        pointcloud.points.tofile(path)
+        columns = [pointcloud.points]
+        if "intensity" in pointcloud.attributes:
+            columns.append(pointcloud.attributes["intensity"][:, None])
+        else:
+            logging.warning(
+                "Only writing point coordinates, the point cloud has no reflection values."
+            )
+        # the file might be memory-mapped itself, so it is read completely before writing
+        data = np.hstack(columns).astype(np.float32)
+        data.tofile(path)
@@ -31,7 +31,10 @@ class Open3DHandler(BasePointCloudHandler):
         o3d_pointcloud = o3d.geometry.PointCloud(
             o3d.utility.Vector3dVector(pointcloud.points)
         )
-        o3d_pointcloud.colors = o3d.utility.Vector3dVector(pointcloud.colors)
+        if pointcloud.original_colors is not None:
+            o3d_pointcloud.colors = o3d.utility.Vector3dVector(
+                pointcloud.original_colors
+            )
         return o3d_pointcloud
 
     def read_point_cloud(self, path: Path) -> Tuple[npt.NDArray, Optional[npt.NDArray]]:
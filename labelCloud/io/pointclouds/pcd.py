@@ -0,0 +1,259 @@
+import logging
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from . import BasePointCloudHandler
+from .base import PointCloudChunk, drop_nan_points
+
+if TYPE_CHECKING:
+    from ...model import PointCloud
+
+
+PCD_TYPES = {"F": "f", "I": "i", "U": "u"}
+COLOR_FIELDS = ("rgb", "rgba")
+COORDINATE_FIELDS = ("x", "y", "z")
+
+
+class PcdHeader(object):
+    """Parsed header of a PCD file (see https://pointclouds.org/documentation/tutorials/pcd_file_format.html)."""
+
+    def __init__(self, lines: Dict[str, List[str]]) -> None:
+        self.fields = lines["FIELDS"]
+        self.sizes = [int(size) for size in lines["SIZE"]]
+        self.types = lines["TYPE"]
+        self.counts = [int(c) for c in lines.get("COUNT", ["1"] * len(self.fields))]
+        self.points = (
+            int(lines["POINTS"][0])
+            if "POINTS" in lines
+            else int(lines["WIDTH"][0]) * int(lines["HEIGHT"][0])
+        )
+        self.data = lines["DATA"][0].lower()
+
+        # padding fields are all named "_" but must be unique in a structured dtype
+        self.names = [
+            f"_{i}" if field == "_" else field for i, field in enumerate(self.fields)
+        ]
+
+    @classmethod
+    def from_file(cls, stream: BinaryIO) -> "PcdHeader":
+        lines: Dict[str, List[str]] = {}
+        while True:
+            line = stream.readline()
+            if not line:
+                raise ValueError("PCD header ended without DATA entry.")
+            entry = line.decode("ascii").strip()
+            if not entry or entry.startswith("#"):
+                continue
+            key, *values = entry.split()
+            lines[key.upper()] = values
+            if key.upper() == "DATA":
+                return cls(lines)
+
+    def field_dtype(self, index: int) -> np.dtype:
+        name = self.fields[index]
+        if name in COLOR_FIELDS and self.sizes[index] == 4:
+            # packed colors are stored as float but must be decoded bitwise
+            return np.dtype("<u4")
+        return np.dtype(f"<{PCD_TYPES[self.types[index]]}{self.sizes[index]}")
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Structured dtype of one point record as stored in binary PCD files."""
+        return np.dtype(
+            [
+                (
+                    (name, self.field_dtype(i), (self.counts[i],))
+                    if self.counts[i] > 1
+                    else (name, self.field_dtype(i))
+                )
+                for i, name in enumerate(self.names)
+            ]
+        )
+
+
+def decode_packed_colors(packed: npt.NDArray[np.uint32]) -> npt.NDArray[np.float32]:
+    colors = np.empty((len(packed), 3), dtype=np.float32)
+    for channel, shift in enumerate((16, 8, 0)):
+        colors[:, channel] = (packed >> shift) & 0xFF
+    colors /= 255
+    return colors
+
+
+def encode_packed_colors(colors: npt.NDArray) -> npt.NDArray[np.uint32]:
+    rgb = np.clip(np.rint(np.asarray(colors) * 255), 0, 255).astype(np.uint32)
+    return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+
+class PcdHandler(BasePointCloudHandler):
+    """Reads and writes PCD files directly with NumPy.
+
+    In contrast to the `Open3DHandler` the points are decoded straight into float32
+    arrays and additional fields (e.g. intensity) are kept as attributes. LZF
+    compressed files are still read by Open3D, which decompresses them much faster.
+    """
+
+    EXTENSIONS = {".pcd"}
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def read_point_cloud(self, path: Path) -> Tuple[npt.NDArray, Optional[npt.NDArray]]:
+        points, colors, _ = self.read_point_cloud_with_attributes(path)
+        return points, colors
+
+    def read_point_cloud_with_attributes(
+        self, path: Path
+    ) -> Tuple[npt.NDArray, Optional[npt.NDArray], Dict[str, npt.NDArray]]:
+        super().read_point_cloud(path)
+        with path.open("rb") as stream:
+            header = PcdHeader.from_file(stream)
+            if header.data == "binary_compressed":
+                return self._read_compressed(path)
+            fields = self._read_fields(stream, header)
+        return self._split_fields(fields, header.points)
+
+    @staticmethod
+    def _read_compressed(path: Path) -> PointCloudChunk:
+        """Read an LZF compressed file with Open3D, without additional fields."""
+        # imported here, so this handler stays ahead of Open3D (see `get_handler`)
+        from .open3d import Open3DHandler
+
+        logging.info("Reading compressed %s with Open3D.", path.name)
+        points, colors = Open3DHandler().read_point_cloud(path)
+        if colors is not None and len(colors) == 0:
+            colors = None
+        return PointCloudChunk(points, colors, {})
+
+    def _iter_chunks(self, path: Path, chunk_points: int) -> Iterator[PointCloudChunk]:
+        """Read blocks of points, compressed files are read completely."""
+        with path.open("rb") as stream:
+            header = PcdHeader.from_file(stream)
+            if header.data != "binary_compressed":
+                for start in range(0, header.points, chunk_points):
+                    count = min(chunk_points, header.points - start)
+                    yield self._split_fields(
+                        self._read_fields(stream, header, count), count
+                    )
+                return
+        yield from super()._iter_chunks(path, chunk_points)
+
+    @staticmethod
+    def _split_fields(fields: Dict[str, npt.NDArray], count: int) -> PointCloudChunk:
+        """Points, colors and attributes of the decoded fields without NaN points."""
+        points = np.empty((count, 3), dtype=np.float32)
+        for axis, name in enumerate(COORDINATE_FIELDS):
+            points[:, axis] = fields.pop(name)
+
+        colors = None
+        for name in COLOR_FIELDS:
+            if name in fields:
+                colors = decode_packed_colors(fields.pop(name))
+
+        attributes = {
+            name: np.ascontiguousarray(values)
+            for name, values in fields.items()
+            if not name.startswith("_")
+        }
+        return drop_nan_points(points, colors, attributes)
+
+    @staticmethod
+    def _read_fields(
+        stream: BinaryIO, header: PcdHeader, count: Optional[int] = None
+    ) -> Dict[str, npt.NDArray]:
+        """Read the next `count` points (all points by default)."""
+        if count is None:
+            count = header.points
+        if header.data == "ascii":
+            return PcdHandler._read_ascii_fields(stream, header, count)
+
+        if header.data == "binary":
+            records = np.frombuffer(
+                stream.read(count * header.dtype.itemsize),
+                dtype=header.dtype,
+                count=count,
+            )
+            return {name: records[name] for name in header.names}
+
+        raise ValueError(f"Unsupported PCD data format `{header.data}`.")
+
+    @staticmethod
+    def _read_ascii_fields(
+        stream: BinaryIO, header: PcdHeader, count: int
+    ) -> Dict[str, npt.NDArray]:
+        # only the lines of the next points, the stream continues behind them
+        table = np.loadtxt(islice(stream, count), dtype=np.float64, ndmin=2)
+        fields, column = {}, 0
+        for i, name in enumerate(header.names):
+            values = table[:, column : column + header.counts[i]]
+            column += header.counts[i]
+            if name in COLOR_FIELDS and header.types[i] == "F":
+                values = values.astype(np.float32).view(np.uint32)
+            else:
+                values = values.astype(header.field_dtype(i))
+            fields[name] = values if header.counts[i] > 1 else values[:, 0]
+        return fields
+
+    def write_point_cloud(self, path: Path, pointcloud: "PointCloud") -> None:
+        """Write the point cloud as binary PCD file including colors and attributes."""
+        super().write_point_cloud(path, pointcloud)
+        columns: Dict[str, npt.NDArray] = {
+            name: np.asarray(pointcloud.points[:, axis], dtype=np.float32)
+            for axis, name in enumerate(COORDINATE_FIELDS)
+        }
+        if pointcloud.original_colors is not None:
+            columns["rgb"] = encode_packed_colors(pointcloud.original_colors)
+        columns.update(pointcloud.attributes.items())
+        pcd_types = {kind: pcd_type for pcd_type, kind in PCD_TYPES.items()}
+        for name, values in list(columns.items()):
+            if values.dtype == np.bool_:
+                columns[name] = values.astype(np.uint8)  # PCD has no boolean type
+            elif values.dtype.kind not in pcd_types:
+                raise ValueError(
+                    f"Can't write attribute `{name}` of type {values.dtype} to PCD, "
+                    "supported are floats, integers and bool."
+                )
+
+        dtype = np.dtype(
+            [
+                (name, values.dtype.newbyteorder("<"), values.shape[1:])
+                for name, values in columns.items()
+            ]
+        )
+        records = np.empty(len(pointcloud.points), dtype=dtype)
+        for name, values in columns.items():
+            records[name] = values
+
+        def type_of(name: str) -> str:
+            if name == "rgb":
+                return "F"  # PCL convention for packed colors
+            return pcd_types[dtype[name].base.kind]
+
+        def count_of(name: str) -> str:
+            return str(max(1, int(np.prod(dtype[name].shape))))
+
+        names = dtype.names
+        assert names is not None
+        header = "\n".join(
+            [
+                "# .PCD v0.7 - Point Cloud Data file format",
+                "VERSION 0.7",
+                "FIELDS " + " ".join(names),
+                "SIZE " + " ".join(str(dtype[n].base.itemsize) for n in names),
+                "TYPE " + " ".join(type_of(n) for n in names),
+                "COUNT " + " ".join(count_of(n) for n in names),
+                f"WIDTH {len(records)}",
+                "HEIGHT 1",
+                "VIEWPOINT 0 0 0 1 0 0 0",
+                f"POINTS {len(records)}",
+                "DATA binary",
+                "",
+            ]
+        )
+        with path.open("wb") as stream:
+            stream.write(header.encode("ascii"))
+            stream.write(records.tobytes())
+        logging.info("Wrote %s points with fields %s.", len(records), names)
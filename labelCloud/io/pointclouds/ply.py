@@ -0,0 +1,251 @@
+import logging
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from . import BasePointCloudHandler
+from .base import PointCloudChunk, drop_nan_points
+
+if TYPE_CHECKING:
+    from ...model import PointCloud
+
+
+PLY_TYPES = {
+    "char": "i1",
+    "int8": "i1",
+    "uchar": "u1",
+    "uint8": "u1",
+    "short": "i2",
+    "int16": "i2",
+    "ushort": "u2",
+    "uint16": "u2",
+    "int": "i4",
+    "int32": "i4",
+    "uint": "u4",
+    "uint32": "u4",
+    "float": "f4",
+    "float32": "f4",
+    "double": "f8",
+    "float64": "f8",
+}
+PLY_TYPE_NAMES = {
+    "i1": "char",
+    "u1": "uchar",
+    "i2": "short",
+    "u2": "ushort",
+    "i4": "int",
+    "u4": "uint",
+    "f4": "float",
+    "f8": "double",
+}
+PLY_FORMATS = {"ascii": "", "binary_little_endian": "<", "binary_big_endian": ">"}
+COLOR_PROPERTIES = ("red", "green", "blue")
+COORDINATE_PROPERTIES = ("x", "y", "z")
+
+
+class PlyElement(object):
+    def __init__(self, name: str, count: int) -> None:
+        self.name = name
+        self.count = count
+        self.properties: List[Tuple[str, str]] = []  # (name, numpy type)
+        self.has_lists = False
+
+    def dtype(self, byte_order: str) -> np.dtype:
+        return np.dtype([(name, byte_order + kind) for name, kind in self.properties])
+
+
+class PlyHeader(object):
+    def __init__(self, data_format: str, elements: List[PlyElement]) -> None:
+        if data_format not in PLY_FORMATS:
+            raise ValueError(f"Unsupported PLY format `{data_format}`.")
+        self.format = data_format
+        self.byte_order = PLY_FORMATS[data_format]
+        self.elements = elements
+
+    @classmethod
+    def from_file(cls, stream: BinaryIO) -> "PlyHeader":
+        if stream.readline().strip() != b"ply":
+            raise ValueError("File is not a PLY file.")
+        data_format = ""
+        elements: List[PlyElement] = []
+        while True:
+            line = stream.readline()
+            if not line:
+                raise ValueError("PLY header ended without `end_header`.")
+            keyword, *values = line.decode("ascii").split()
+            if keyword == "format":
+                data_format = values[0]
+            elif keyword == "element":
+                elements.append(PlyElement(values[0], int(values[1])))
+            elif keyword == "property":
+                if values[0] == "list":
+                    elements[-1].has_lists = True
+                else:
+                    elements[-1].properties.append((values[1], PLY_TYPES[values[0]]))
+            elif keyword == "end_header":
+                return cls(data_format, elements)
+
+    @property
+    def vertex_element(self) -> PlyElement:
+        for element in self.elements:
+            if element.name == "vertex":
+                return element
+        raise ValueError("PLY file does not contain vertices.")
+
+    def skip_to_vertices(self, stream: BinaryIO) -> None:
+        """Move the stream behind any elements stored before the vertices."""
+        for element in self.elements:
+            if element.name == "vertex":
+                return
+            if self.format == "ascii":
+                for _ in range(element.count):
+                    stream.readline()
+            elif element.has_lists:
+                raise ValueError(
+                    f"Can't skip element `{element.name}` with list properties "
+                    "stored before the vertices."
+                )
+            else:
+                stream.seek(element.count * element.dtype("<").itemsize, 1)
+
+
+class PlyHandler(BasePointCloudHandler):
+    """Reads and writes the vertices of PLY files directly with NumPy.
+
+    All vertex properties besides the coordinates and colors (e.g. intensity, ring,
+    timestamp or alpha) are kept as attributes and written back when saving.
+    """
+
+    EXTENSIONS = {".ply"}
+
+    def __init__(self) -> None:
+        super().__init__()
+
+    def read_point_cloud(self, path: Path) -> Tuple[npt.NDArray, Optional[npt.NDArray]]:
+        points, colors, _ = self.read_point_cloud_with_attributes(path)
+        return points, colors
+
+    def read_point_cloud_with_attributes(
+        self, path: Path
+    ) -> Tuple[npt.NDArray, Optional[npt.NDArray], Dict[str, npt.NDArray]]:
+        super().read_point_cloud(path)
+        with path.open("rb") as stream:
+            header = PlyHeader.from_file(stream)
+            header.skip_to_vertices(stream)
+            vertices = self._read_vertices(stream, header)
+        return self._split_vertices(vertices)
+
+    def _iter_chunks(self, path: Path, chunk_points: int) -> Iterator[PointCloudChunk]:
+        with path.open("rb") as stream:
+            header = PlyHeader.from_file(stream)
+            header.skip_to_vertices(stream)
+            no_of_vertices = header.vertex_element.count
+            for start in range(0, no_of_vertices, chunk_points):
+                count = min(chunk_points, no_of_vertices - start)
+                yield self._split_vertices(self._read_vertices(stream, header, count))
+
+    @staticmethod
+    def _split_vertices(vertices: np.ndarray) -> PointCloudChunk:
+        """Points, colors and attributes of the vertex records without NaN points."""
+        points = np.empty((len(vertices), 3), dtype=np.float32)
+        for axis, name in enumerate(COORDINATE_PROPERTIES):
+            points[:, axis] = vertices[name]
+
+        colors = None
+        names = set(vertices.dtype.names)  # type: ignore
+        if names.issuperset(COLOR_PROPERTIES):
+            colors = np.empty((len(vertices), 3), dtype=np.float32)
+            for channel, name in enumerate(COLOR_PROPERTIES):
+                colors[:, channel] = vertices[name]
+            if vertices.dtype["red"].kind in "iu":
+                colors /= np.iinfo(vertices.dtype["red"]).max
+
+        attributes = {
+            name: np.ascontiguousarray(
+                vertices[name], dtype=vertices.dtype[name].newbyteorder("=")
+            )
+            for name in vertices.dtype.names  # type: ignore
+            if name not in COORDINATE_PROPERTIES + COLOR_PROPERTIES
+        }
+        return drop_nan_points(points, colors, attributes)
+
+    @staticmethod
+    def _read_vertices(
+        stream: BinaryIO, header: PlyHeader, count: Optional[int] = None
+    ) -> np.ndarray:
+        """Read the next `count` vertices (all vertices by default)."""
+        element = header.vertex_element
+        if element.has_lists:
+            raise ValueError("Vertices with list properties are not supported.")
+        if count is None:
+            count = element.count
+        if header.format == "ascii":
+            # only the lines of the next vertices, the stream continues behind them
+            return np.loadtxt(
+                islice(stream, count),
+                dtype=element.dtype("<"),
+                ndmin=1,
+            )
+        dtype = element.dtype(header.byte_order)
+        return np.frombuffer(
+            stream.read(count * dtype.itemsize),
+            dtype=dtype,
+            count=count,
+        )
+
+    def write_point_cloud(self, path: Path, pointcloud: "PointCloud") -> None:
+        """Write the point cloud vertices as binary little endian PLY file."""
+        super().write_point_cloud(path, pointcloud)
+        columns: Dict[str, npt.NDArray] = {
+            name: np.asarray(pointcloud.points[:, axis], dtype=np.float32)
+            for axis, name in enumerate(COORDINATE_PROPERTIES)
+        }
+        if pointcloud.original_colors is not None:
+            rgb = np.clip(np.rint(np.asarray(pointcloud.original_colors) * 255), 0, 255)
+            for channel, name in enumerate(COLOR_PROPERTIES):
+                columns[name] = rgb[:, channel].astype(np.uint8)
+        for name, values in pointcloud.attributes.items():
+            if values.ndim == 1:
+                columns[name] = values
+            else:  # PLY has no fixed-size array properties, so split the columns
+                for i in range(values.shape[1]):
+                    columns[f"{name}_{i}"] = values[:, i]
+        for name, values in list(columns.items()):
+            if values.dtype == np.bool_:
+                columns[name] = values.astype(np.uint8)  # PLY has no boolean type
+            elif values.dtype.str[1:] not in PLY_TYPE_NAMES:
+                raise ValueError(
+                    f"Can't write attribute `{name}` of type {values.dtype} to PLY, "
+                    f"supported are {', '.join(PLY_TYPE_NAMES.values())} and bool."
+                )
+
+        dtype = np.dtype(
+            [(name, values.dtype.newbyteorder("<")) for name, values in columns.items()]
+        )
+        vertices = np.empty(len(pointcloud.points), dtype=dtype)
+        for name, values in columns.items():
+            vertices[name] = values
+
+        header = "\n".join(
+            [
+                "ply",
+                "format binary_little_endian 1.0",
+                "comment Created by labelCloud",
+                f"element vertex {len(vertices)}",
+                *(
+                    f"property {PLY_TYPE_NAMES[dtype[name].str[1:]]} {name}"
+                    for name in dtype.names  # type: ignore
+                ),
+                "end_header",
+                "",
+            ]
+        )
+        with path.open("wb") as stream:
+            stream.write(header.encode("ascii"))
+            stream.write(vertices.tobytes())
+        logging.info(
+            "Wrote %s vertices with properties %s.", len(vertices), dtype.names
+        )
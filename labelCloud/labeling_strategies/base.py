@@ -11,6 +11,7 @@ if TYPE_CHECKING:
 class BaseLabelingStrategy(ABC):
     POINTS_NEEDED: int
     PREVIEW: bool = False
+    PICKS_POINT_IDS: bool = False  # registers the id of the point under the cursor
 
     def __init__(self, view: "GUI") -> None:
         self.view = view
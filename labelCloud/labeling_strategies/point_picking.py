@@ -9,13 +9,13 @@ from ..definitions import Mode, Point3D
 from ..model import Point
 from ..utils import math3d as math3d
 from ..utils import oglhelper as ogl
-import open3d as o3d
 
 '''Point picking strategy for placing single points in the point cloud.
 This strategy allows users to pick a point in the point cloud, which is then stored as a Point object.
 It supports previewing the point location before finalizing the selection.
 
-We use a KDTree to efficiently find the nearest point in the point cloud to the picked location. This is used for pick point and pickflow.
+If the viewer has a point id buffer, the point under the cursor is read from it directly.
+Otherwise we use the spatial index of the point cloud to efficiently find the nearest point in the point cloud to the picked location. This is used for pick point and pickflow.
 
 
 Created with spanning.py and picking.py as references.
@@ -24,6 +24,7 @@ Created with spanning.py and picking.py as references.
 class PickingPointStrategy(BaseLabelingStrategy):
     POINTS_NEEDED = 1
     PREVIEW = True
+    PICKS_POINT_IDS = True
 
     def __init__(self, view: "GUI", pick_flow = False) -> None:
         super().__init__(view)
@@ -35,33 +36,46 @@ class PickingPointStrategy(BaseLabelingStrategy):
         self.point_1: Optional[Point3D] = None
         self.point_idx: int = None 
         self.tmp_p1: Optional[Point3D] = None
+        self.tmp_idx: Optional[int] = None  # id of the point under the cursor
         self.bbox_z_rotation: float = 0
         self.preview_color = (1, 1, 0, 1)
-        pcd = o3d.geometry.PointCloud()
-        pcd.points = o3d.utility.Vector3dVector(view.controller.pcd_manager.pointcloud.points)
+        self.pointcloud = view.controller.pcd_manager.pointcloud
 
         # Make sure the point cloud is not empty
-        assert len(pcd.points) > 0, "Point cloud is empty"
-
-        # Initialize KDTree
-        self.pcd_tree  = o3d.geometry.KDTreeFlann()
-        self.pcd_tree.set_geometry(pcd)
+        assert self.pointcloud.get_no_of_points() > 0, "Point cloud is empty"
         
         self.pick_flow = pick_flow
 
         if pick_flow:
             self.view.set_label_flow_status(self.view.current_class_dropdown.itemText(2))
 
-    def register_point(self, new_point: Point3D) -> None:
+    def get_nearest_point_id(
+        self, point: Point3D, point_id: Optional[int] = None, wait: bool = False
+    ) -> Optional[int]:
+        """Id of the point closest to `point`, None while the spatial index is built
+        in the background (unless `wait` is set)."""
+        if point_id is not None:
+            return point_id
+        if not wait and not self.pointcloud.has_spatial_index:
+            return None
+        idx, _ = self.pointcloud.spatial_index.query_knn(point, 1)
+        return int(idx[0]) if len(idx) else None
+
+    def register_point(self, new_point: Point3D, point_id: Optional[int] = None) -> None:
         if not self.tmp_p1 == None :
-            k, idx, dist= self.pcd_tree.search_knn_vector_3d(new_point,1);
-            if idx:
-                self.point_1 = self.view.controller.pcd_manager.pointcloud.points[idx[0]]
-                self.point_idx = idx[0]
+            # the final click may wait for the spatial index
+            point_id = self.get_nearest_point_id(new_point, point_id, wait=True)
+            if point_id is not None:
+                self.point_1 = self.pointcloud.points[point_id]
+                self.point_idx = point_id
                 self.points_registered += 1
                                                                          
-    def register_tmp_point(self, new_tmp_point: Point3D) -> None:
+    def register_tmp_point(
+        self, new_tmp_point: Point3D, point_id: Optional[int] = None
+    ) -> None:
         self.tmp_p1 = new_tmp_point
+        # searched once per cursor move instead of in every drawn frame
+        self.tmp_idx = self.get_nearest_point_id(new_tmp_point, point_id)
 
     def register_scrolling(self, distance: float) -> None:
         self.bbox_z_rotation += distance // 30
@@ -71,14 +85,13 @@ class PickingPointStrategy(BaseLabelingStrategy):
                 "Use Ctrl+Click to place marker", Mode.DRAWING
             )
  
-        if not self.tmp_p1 == None :
-            k, idx, dist= self.pcd_tree.search_knn_vector_3d(self.tmp_p1,1);
-            if idx:
-                ogl.draw_points([self.view.controller.pcd_manager.pointcloud.points[idx[0]]], color=self.preview_color, point_size=config.getint("POINTCLOUD", "POINT_SIZE")*2)
+        if self.tmp_idx is not None:
+            ogl.draw_points([self.pointcloud.points[self.tmp_idx]], color=self.preview_color, point_size=config.getint("POINTCLOUD", "POINT_SIZE")*2)
                                                 
     def get_point(self) -> Point3D: 
         assert self.point_1 is not None
-        return Point(self.point_1, self.point_idx)
+        # the index in the point cloud file, also if the points were reordered
+        return Point(self.point_1, int(self.pointcloud.get_original_ids(self.point_idx)))
     
 
     def get_point_idx(self)->int:
@@ -91,5 +104,6 @@ class PickingPointStrategy(BaseLabelingStrategy):
     def reset(self) -> None:
         super().reset()
         self.tmp_p1 = None
+        self.tmp_idx = None
         self.view.button_pick_point.setChecked(False)
     
\ No newline at end of file
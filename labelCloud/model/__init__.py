@@ -2,3 +2,4 @@ from .bbox import BBox
 from .perspective import Perspective
 from .point_cloud import PointCloud
 from .point import Point
+from .point_attributes import PointAttributes
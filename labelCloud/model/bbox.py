@@ -1,3 +1,4 @@
+import itertools
 import logging
 from typing import List, Optional
 
@@ -18,10 +19,26 @@ from ..definitions import (
 from ..io.labels.config import LabelConfig
 from ..utils import math3d, oglhelper
 
+BBOX_EDGE_VERTEX_IDS = [vertex_id for edge in BBOX_EDGES for vertex_id in edge]
+# Versions are unique across all boxes, so they also tell different boxes apart
+GEOMETRY_VERSIONS = itertools.count()
+
 
 class BBox(object):
     MIN_DIMENSION: float = config.getfloat("LABEL", "MIN_BOUNDINGBOX_DIMENSION")
     HIGHLIGHTED_COLOR: Color3f = Color3f(0, 1, 0)
+    # Changing one of these attributes gives the box geometry a new version
+    GEOMETRY_ATTRIBUTES = frozenset(
+        [
+            "center",
+            "length",
+            "width",
+            "height",
+            "x_rotation",
+            "y_rotation",
+            "z_rotation",
+        ]
+    )
 
     def __init__(
         self,
@@ -32,6 +49,10 @@ class BBox(object):
         width: Optional[float] = None,
         height: Optional[float] = None,
     ) -> None:
+        self.version = next(GEOMETRY_VERSIONS)
+        self._cached_version = -1  # version of the cached pose and vertices
+        self._pose: npt.NDArray = np.eye(4)
+        self._vertices: npt.NDArray = np.zeros((8, 3))
         self.center: Point3D = (cx, cy, cz)
         self.length: float = length or config.getfloat(
             "LABEL", "STD_BOUNDINGBOX_LENGTH"
@@ -47,6 +68,11 @@ class BBox(object):
         self.verticies: npt.NDArray = np.zeros((8, 3))
         self.set_axis_aligned_verticies()
 
+    def __setattr__(self, name: str, value) -> None:
+        super().__setattr__(name, value)
+        if name in BBox.GEOMETRY_ATTRIBUTES:
+            super().__setattr__("version", next(GEOMETRY_VERSIONS))
+
     # GETTERS
 
     def get_center(self) -> Point3D:
@@ -70,19 +96,31 @@ class BBox(object):
     def get_classname(self) -> str:
         return self.classname
 
+    def _update_geometry(self) -> None:
+        if self._cached_version == self.version:
+            return
+        self._pose = math3d.get_bbox_poses([self.center], [self.get_rotations()])[0]
+        vertices = math3d.UNIT_BBOX_VERTICES * self.get_dimensions()
+        self._vertices = vertices @ self._pose[:3, :3].T + self._pose[:3, 3]
+        self._vertices.setflags(write=False)  # shared by all callers until changed
+        self._cached_version = self.version
+
+    def get_pose(self) -> npt.NDArray:
+        """Return the 4x4 transformation from box to world coordinates."""
+        self._update_geometry()
+        return self._pose
+
     def get_vertices(self) -> npt.NDArray:
-        rotated_vertices = math3d.rotate_bbox_around_center(
-            self.get_axis_aligned_vertices(),
-            self.center,
-            self.get_rotations(),
-        )
-        return np.array(rotated_vertices)
+        """Return the (8, 3) vertices, only recomputed after the box has changed."""
+        self._update_geometry()
+        return self._vertices
 
     def get_axis_aligned_vertices(self) -> List[Point3D]:
-        coords = []
-        for vertex in self.verticies:  # Translate relative bbox to center
-            coords.append(math3d.translate_point(vertex, *self.center))
-        return coords
+        return [tuple(vertex) for vertex in self.verticies + self.center]  # type: ignore
+
+    def get_edge_vertices(self) -> npt.NDArray:
+        """Return the start and end vertex of each edge as (24, 3) array."""
+        return self.get_vertices()[BBOX_EDGE_VERTEX_IDS]
 
     def get_volume(self) -> float:
         return self.length * self.width * self.height
@@ -166,13 +204,9 @@ class BBox(object):
         if highlighted:
             bbox_color = self.HIGHLIGHTED_COLOR
 
-        vertices = self.get_vertices()
-        drawing_sequence = []
-        for edge in BBOX_EDGES:
-            for vertex_id in edge:
-                drawing_sequence.append(vertices[vertex_id])
-
-        oglhelper.draw_lines(drawing_sequence, color=Color3f.to_rgba(bbox_color))
+        oglhelper.draw_lines(
+            self.get_edge_vertices(), color=Color3f.to_rgba(bbox_color)
+        )
         GL.glPopMatrix()
 
     def draw_orientation(self, crossed_side: bool = True) -> None:
@@ -224,9 +258,8 @@ class BBox(object):
     # Translate bbox away from extension by half distance
     def translate_side(self, p_id_s: int, p_id_o: int, distance: float) -> None:
         # TODO: add doc string
-        direction = np.subtract(
-            self.get_vertices()[p_id_s], self.get_vertices()[p_id_o]
-        )
+        vertices = self.get_vertices()
+        direction = np.subtract(vertices[p_id_s], vertices[p_id_o])
         translation_vector = direction / np.linalg.norm(direction) * (distance / 2)
         self.center = math3d.translate_point(self.center, *translation_vector)
 
@@ -254,8 +287,6 @@ class BBox(object):
             self.translate_side(0, 4, distance)
 
     def is_inside(self, points: npt.NDArray[np.float32]) -> npt.NDArray[np.bool_]:
-        vertices = self.get_vertices().copy()
-
         #        .------------.
         #       /|           /|
         #      / |          / |
@@ -266,27 +297,8 @@ class BBox(object):
         #     | /          | /
         #     ./___________./
         #   (p0)           (p3)
-
-        p0 = vertices[0]
-        p1 = vertices[3]
-        p2 = vertices[1]
-        p3 = vertices[4]
-
-        # p0 as origin
-        v1 = p1 - p0
-        v2 = p2 - p0
-        v3 = p3 - p0
-
-        u = points - p0
-        u_dot_v1 = u.dot(v1)
-        u_dot_v2 = u.dot(v2)
-        u_dot_v3 = u.dot(v3)
-
-        inside_v1 = np.logical_and(np.sum(v1**2) > u_dot_v1, u_dot_v1 > 0)
-        inside_v2 = np.logical_and(np.sum(v2**2) > u_dot_v2, u_dot_v2 > 0)
-        inside_v3 = np.logical_and(np.sum(v3**2) > u_dot_v3, u_dot_v3 > 0)
-
-        points_inside: npt.NDArray[np.bool_] = np.logical_and(
-            np.logical_and(inside_v1, inside_v2), inside_v3
-        )
+        # p0 is the origin of the edges to p1, p2 and p3 (see math3d.get_bboxes_axes)
+        points_inside: npt.NDArray[np.bool_] = math3d.are_points_inside_bboxes(
+            points, self.get_vertices()[None]
+        )[0]
         return points_inside
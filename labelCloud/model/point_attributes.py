@@ -0,0 +1,70 @@
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+
+class PointAttributes(object):
+    """Columnar store for additional per-point fields (e.g. intensity, ring, timestamp).
+
+    Every column is a NumPy array with one row per point, keyed by its name. Columns
+    are stored as given by the point cloud handlers, so memory-mapped or otherwise
+    shared arrays are never copied when they are added.
+    """
+
+    def __init__(
+        self,
+        num_points: int,
+        columns: Optional[Dict[str, npt.NDArray]] = None,
+    ) -> None:
+        self.num_points = num_points
+        self._columns: Dict[str, npt.NDArray] = {}
+        for name, values in (columns or {}).items():
+            self.add(name, values)
+
+    def add(self, name: str, values: npt.NDArray) -> None:
+        values = np.asarray(values)
+        if len(values) != self.num_points:
+            raise ValueError(
+                f"Attribute `{name}` has {len(values)} values, but the point cloud "
+                f"contains {self.num_points} points."
+            )
+        self._columns[name] = values
+
+    def remove(self, name: str) -> None:
+        del self._columns[name]
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._columns)
+
+    def items(self) -> Iterator[Tuple[str, npt.NDArray]]:
+        return iter(self._columns.items())
+
+    def filter(self, indices: npt.NDArray) -> "PointAttributes":
+        """Return a new store with the rows selected by an index or boolean array."""
+        columns = {name: values[indices] for name, values in self._columns.items()}
+        num_points = (
+            int(np.count_nonzero(indices))
+            if np.asarray(indices).dtype == np.bool_
+            else len(indices)
+        )
+        return PointAttributes(num_points, columns)
+
+    def __getitem__(self, name: str) -> npt.NDArray:
+        return self._columns[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __repr__(self) -> str:
+        columns = ", ".join(
+            f"{name}: {values.dtype}" for name, values in self._columns.items()
+        )
+        return f"PointAttributes({self.num_points} points; {columns})"
@@ -1,7 +1,8 @@
-import ctypes
+import copy
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Tuple, cast
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union, cast
 
 import numpy as np
 import numpy.typing as npt
@@ -13,16 +14,36 @@ from labelCloud.io.labels.config import LabelConfig
 from ..control.config_manager import config
 from ..definitions import LabelingMode, Point3D, Rotations3D, Translation3D
 from ..io.pointclouds import BasePointCloudHandler
+from ..io.pointclouds.cache import (
+    DecodedPointCloud,
+    DecodedPointCloudCache,
+    decode_chunks,
+    get_bounds,
+)
 from ..io.segmentations import BaseSegmentationHandler
-from ..utils.color import colorize_points_with_height
+from ..utils.camera import Camera, get_model_matrix
+from ..utils.color import colorize_points_with_height, colorize_values
+from ..utils.lod import get_lod_order
 from ..utils.logger import end_section, green, print_column, red, start_section, yellow
+from ..utils.morton import (
+    BlockBounds,
+    get_block_bounds,
+    get_morton_order,
+    invert_permutation,
+)
+from ..utils.octree import DrawRanges, PointChunks, clip_draw_ranges
+from ..utils.spatial_index import SpatialIndex
+from ..utils.shaders import (
+    CLASS_ID_LOCATION,
+    COLOR_LOCATION,
+    POSITION_LOCATION,
+    PointCloudShader,
+)
 from . import Perspective
+from .point_attributes import PointAttributes
 
 from PyQt5.QtCore import QTimer
 
-# Get size of float (4 bytes) for VBOs
-SIZE_OF_FLOAT = ctypes.sizeof(ctypes.c_float)
-
 
 def calculate_init_translation(
     center: Tuple[float, float, float], mins: npt.NDArray, maxs: npt.NDArray
@@ -45,6 +66,54 @@ def consecutive(data: npt.NDArray[np.int64], stepsize=1) -> List[npt.NDArray[np.
     return np.split(data, np.where(np.diff(data) != stepsize)[0] + 1)
 
 
+# unchanged class ids uploaded to join two runs, cheaper than another upload call
+LABEL_UPLOAD_MAX_GAP = 64
+
+
+def get_index_runs(
+    indices: npt.NDArray[np.int64], max_gap: int = 0
+) -> List[Tuple[int, int]]:
+    """Start and stop of the runs of sorted indices, joining runs with small gaps."""
+    if len(indices) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(indices) > max_gap + 1)
+    starts = np.concatenate([indices[:1], indices[breaks + 1]])
+    stops = np.concatenate([indices[breaks], indices[-1:]]) + 1
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+class PointCloudFrame(NamedTuple):
+    """Decoded content of a point cloud file that is not yet shown (or uploaded)."""
+
+    points: npt.NDArray[np.float32]
+    colors: Optional[npt.NDArray[np.float32]]
+    segmentation_labels: Optional[npt.NDArray[np.int8]]
+    attributes: Dict[str, npt.NDArray]
+    bounds: Optional[npt.NDArray[np.float32]] = None
+    # file index of each point, if the points were reordered (see `morton_order`)
+    order: Optional[npt.NDArray[np.int64]] = None
+    # chunks sorted by level of detail (see `level_of_detail`)
+    chunks: Optional[PointChunks] = None
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.points, self.colors, self.segmentation_labels, self.order]
+        arrays.extend(self.attributes.values())
+        return sum(array.nbytes for array in arrays if array is not None)
+
+
+_SPATIAL_INDEX_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def get_spatial_index_executor() -> ThreadPoolExecutor:
+    global _SPATIAL_INDEX_EXECUTOR
+    if _SPATIAL_INDEX_EXECUTOR is None:
+        _SPATIAL_INDEX_EXECUTOR = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="spatial_index"
+        )
+    return _SPATIAL_INDEX_EXECUTOR
+
+
 class PointCloud(object):
     def __init__(
         self,
@@ -55,22 +124,44 @@ class PointCloud(object):
         init_translation: Optional[Tuple[float, float, float]] = None,
         init_rotation: Optional[Tuple[float, float, float]] = None,
         write_buffer: bool = True,
+        attributes: Union[PointAttributes, Dict[str, npt.NDArray], None] = None,
+        bounds: Optional[npt.NDArray[np.float32]] = None,
+        order: Optional[npt.NDArray[np.int64]] = None,
+        chunks: Optional[PointChunks] = None,
     ) -> None:
         start_section(f"Loading {path.name}")
         self.path = path
         self.points = points
+        # file index of each point if the points are not in file order, the files
+        # are still written in the original order (see `in_file_order`)
+        self.order = order
+        self._block_bounds: Optional[BlockBounds] = None
+        # octree chunks whose points are sorted by level of detail
+        self.chunks = chunks
+        self.drawn_points = 0  # number of points drawn in the last frame
         self.colors = colors if type(colors) == np.ndarray and len(colors) > 0 else None
+        # colors as stored in the file, `self.colors` holds the displayed colors
+        self.original_colors = self.colors
+        self.attributes = (
+            attributes
+            if isinstance(attributes, PointAttributes)
+            else PointAttributes(len(points), attributes)
+        )
 
         self.labels = None
         if LabelConfig().type == LabelingMode.SEMANTIC_SEGMENTATION:
             self.labels = segmentation_labels
             self.validate_segmentation_label()
-            self.mix_ratio = config.getfloat("POINTCLOUD", "label_color_mix_ratio")
 
-        self.vbo = None
-        self.center: Point3D = tuple(np.sum(points[:, i]) / len(points) for i in range(3))  # type: ignore
-        self.pcd_mins: npt.NDArray[np.float32] = np.amin(points, axis=0)
-        self.pcd_maxs: npt.NDArray[np.float32] = np.amax(points, axis=0)
+        self.position_vbo = self.color_vbo = self.label_vbo = None
+        self.uploaded_points = 0  # prefix of the points already in the buffers
+        # shared index for neighbourhood queries, see `spatial_index`
+        self._spatial_index: "Optional[Future[SpatialIndex]]" = None
+        if bounds is None:
+            bounds = get_bounds(points)
+        self.pcd_mins: npt.NDArray[np.float32] = bounds[0]
+        self.pcd_maxs: npt.NDArray[np.float32] = bounds[1]
+        self.center: Point3D = tuple(bounds[2].tolist())  # type: ignore
         self.init_translation: Point3D = init_translation or calculate_init_translation(
             self.center, self.pcd_mins, self.pcd_maxs
         )
@@ -80,25 +171,7 @@ class PointCloud(object):
         self.trans_x, self.trans_y, self.trans_z = self.init_translation
         self.rot_x, self.rot_y, self.rot_z = self.init_rotation
 
-        if self.colorless:
-            # if no color in point cloud, either color with height or color with a single color
-            if config.getboolean("POINTCLOUD", "COLORLESS_COLORIZE"):
-                self.colors = colorize_points_with_height(
-                    self.points, self.pcd_mins[2], self.pcd_maxs[2]
-                )
-                logging.info(
-                    "Generated colors for colorless point cloud based on height."
-                )
-            else:
-                colorless_color = np.array(
-                    config.getlist("POINTCLOUD", "COLORLESS_COLOR")
-                )
-                self.colors = (np.ones_like(self.points) * colorless_color).astype(
-                    np.float32
-                )
-                logging.info(
-                    "Generated colors for colorless point cloud based on `colorless_color`."
-                )
+        self.colorize()
         if write_buffer:
             self.create_buffers()
 
@@ -106,36 +179,143 @@ class PointCloud(object):
         self.print_details()
         end_section()
 
+    def colorize(self) -> None:
+        """Set the displayed colors according to the configured color source.
+
+        A scalar source named by `color_source` (an attribute like intensity or
+        `height` and `distance`) is mapped onto the colormap, otherwise the original
+        colors are shown. Colorless point clouds are colored by height or with a
+        single color.
+        """
+        colormap = config.get("POINTCLOUD", "colormap")
+        color_source = config.get("POINTCLOUD", "color_source")
+        values = self.get_scalar_values(color_source)
+        if values is not None and np.isnan(values).all():
+            logging.warning(f"No values of `{color_source}` to color by, all are NaN.")
+            values = None
+        if values is not None:
+            self.colors = colorize_values(
+                values, np.nanmin(values), np.nanmax(values), colormap
+            )
+            logging.info(f"Generated colors based on `{color_source}`.")
+        elif not self.colorless:
+            self.colors = self.original_colors
+        elif config.getboolean("POINTCLOUD", "COLORLESS_COLORIZE"):
+            # if no color in point cloud, either color with height or color with a single color
+            self.colors = colorize_points_with_height(
+                self.points, self.pcd_mins[2], self.pcd_maxs[2], colormap
+            )
+            logging.info("Generated colors for colorless point cloud based on height.")
+        else:
+            colorless_color = np.array(config.getlist("POINTCLOUD", "COLORLESS_COLOR"))
+            self.colors = (np.ones_like(self.points) * colorless_color).astype(
+                np.float32
+            )
+            logging.info(
+                "Generated colors for colorless point cloud based on `colorless_color`."
+            )
+
+    def get_scalar_values(self, source: str) -> Optional[npt.NDArray]:
+        """Return one value per point for the `height`, `distance` (to the sensor
+        origin) or a one-dimensional attribute, None for unknown sources."""
+        if source == "height":
+            return self.points[:, 2]
+        if source == "distance":
+            return np.sqrt(np.einsum("ij,ij->i", self.points, self.points))
+        if source in self.attributes and self.attributes[source].ndim == 1:
+            return self.attributes[source]
+        return None
+
+    def set_color_source(self, color_source: str) -> None:
+        """Color the point cloud by the given scalar source (or original colors if empty)."""
+        config.set("POINTCLOUD", "color_source", color_source)
+        self.colorize()
+        if self.color_vbo is not None:
+            self.colors = cast(npt.NDArray[np.float32], self.colors)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.color_vbo)
+            GL.glBufferSubData(GL.GL_ARRAY_BUFFER, 0, self.colors.nbytes, self.colors)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
     @property
     def point_size(self) -> float:
         return config.getfloat("POINTCLOUD", "point_size")
 
     def create_buffers(self) -> None:
-        """Create 3 different buffers holding points, colors and label colors information"""
+        """Create buffers holding the points, colors and (if labeled) 1-byte class ids.
+
+        The class colors are not uploaded per point, they are blended in the shader.
+        Only the first `upload_chunk_points` are uploaded, the following chunks with
+        `upload_next_chunk` in the next frames (all points at once without a limit).
+        """
         self.colors = cast(npt.NDArray[np.float32], self.colors)
-        (
-            self.position_vbo,
-            self.color_vbo,
-            self.label_vbo,
-        ) = GL.glGenBuffers(3)
-        for data, vbo in [
+        self.position_vbo, self.color_vbo = GL.glGenBuffers(2)
+        buffers: List[Tuple[npt.NDArray, Optional[int]]] = [
             (self.points, self.position_vbo),
             (self.colors, self.color_vbo),
-            (self.label_colors, self.label_vbo),
-        ]:
+        ]
+        if self.labels is not None:
+            self.label_vbo = GL.glGenBuffers(1)
+            buffers.append((self.labels, self.label_vbo))
+        for data, vbo in buffers:
+            row_bytes = data.itemsize * (data.shape[1] if data.ndim > 1 else 1)
             GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo)
-            GL.glBufferData(GL.GL_ARRAY_BUFFER, data.nbytes, data, GL.GL_DYNAMIC_DRAW)
+            GL.glBufferData(
+                GL.GL_ARRAY_BUFFER, len(data) * row_bytes, None, GL.GL_DYNAMIC_DRAW
+            )
             GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        self.uploaded_points = 0
+        self.upload_next_chunk()
 
     @property
-    def label_colors(self) -> npt.NDArray[np.float32]:
-        """blend the points with label color map"""
+    def is_uploaded(self) -> bool:
+        return self.uploaded_points >= self.get_no_of_points()
+
+    @property
+    def upload_progress(self) -> float:
+        if self.is_uploaded:
+            return 1.0
+        return self.uploaded_points / self.get_no_of_points()
+
+    def upload_next_chunk(self, no_of_points: Optional[int] = None) -> None:
+        """Upload the next `upload_chunk_points` points (colors and class ids)."""
+        if no_of_points is None:
+            no_of_points = config.getint("POINTCLOUD", "upload_chunk_points")
+        if no_of_points <= 0:
+            no_of_points = self.get_no_of_points()
+        start = self.uploaded_points
+        stop = min(start + no_of_points, self.get_no_of_points())
+        if stop <= start:
+            return
         self.colors = cast(npt.NDArray[np.float32], self.colors)
-        if self.labels is not None:
-            colors = LabelConfig().color_map[LabelConfig().class_order[self.labels]]
-            return colors * self.mix_ratio + self.colors * (1 - self.mix_ratio)
-        else:
-            return self.colors
+        buffers = [
+            (self.points[start:stop], self.position_vbo),
+            (self.colors[start:stop], self.color_vbo),
+        ]
+        if self.label_vbo is not None:
+            buffers.append((self.get_class_ids(slice(start, stop)), self.label_vbo))
+        for data, vbo in buffers:
+            # (memory-mapped) points can be strided, the buffers are tightly packed
+            data = np.ascontiguousarray(data)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo)
+            GL.glBufferSubData(
+                GL.GL_ARRAY_BUFFER, start * (data.nbytes // len(data)), data.nbytes, data
+            )
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        self.uploaded_points = stop
+
+    def get_class_ids(
+        self, indices: Union[slice, npt.NDArray] = slice(None)
+    ) -> npt.NDArray[np.uint8]:
+        """Segmentation labels as unsigned bytes, like they are read by the shader."""
+        assert self.labels is not None
+        labels = self.labels[indices]
+        if labels.dtype == np.int8:
+            return labels.view(np.uint8)
+        return labels.astype(np.uint8)
+
+    @property
+    def mix_ratio(self) -> float:
+        return config.getfloat("POINTCLOUD", "label_color_mix_ratio")
 
     def save_segmentation_labels(self, extension=".bin") -> None:
         label_path = (
@@ -147,24 +327,37 @@ class PointCloud(object):
         )()
         assert self.labels is not None
         self.validate_segmentation_label()
-        seg_handler.overwrite_labels(label_path=label_path, labels=self.labels)
+        seg_handler.overwrite_labels(
+            label_path=label_path, labels=self.to_file_order(self.labels)
+        )
         logging.info(f"Writing segmentation labels to {label_path}")
 
-    @classmethod
-    def from_file(
-        cls,
-        path: Path,
-        perspective: Optional[Perspective] = None,
-        write_buffer: bool = True,
-    ) -> "PointCloud":
-        init_translation, init_rotation = (None, None)
-        if perspective:
-            init_translation = perspective.translation
-            init_rotation = perspective.rotation
+    @staticmethod
+    def read_frame(path: Path) -> PointCloudFrame:
+        """Decode the point cloud file and its segmentation labels.
 
-        points, colors = BasePointCloudHandler.get_handler(
-            path.suffix
-        ).read_point_cloud(path=path)
+        Does not touch OpenGL or Qt, so it can also be called from worker threads.
+        With the `decoded_cache` enabled, already decoded files are memory-mapped from
+        the cache instead of parsing them again. With `stream_chunk_points`, the file
+        is read in chunks and the bounds are collected while reading.
+        """
+        cache = DecodedPointCloudCache()
+        decoded = cache.load(path) if cache.enabled else None
+        if decoded is None:
+            handler = BasePointCloudHandler.get_handler(path.suffix)
+            stream_chunk_points = config.getint("POINTCLOUD", "stream_chunk_points")
+            if stream_chunk_points > 0:
+                decoded = decode_chunks(handler.iter_chunks(path, stream_chunk_points))
+            else:
+                points, colors, attributes = handler.read_point_cloud_with_attributes(
+                    path=path
+                )
+                decoded = DecodedPointCloud(
+                    points, colors, attributes, get_bounds(points)
+                )
+            if cache.enabled:
+                cache.store(path, decoded)
+        points, colors, attributes, bounds = decoded
 
         labels = None
         if LabelConfig().type == LabelingMode.SEMANTIC_SEGMENTATION:
@@ -177,14 +370,51 @@ class PointCloud(object):
                 label_path=label_path, num_points=points.shape[0]
             )
 
+        order = chunks = None
+        if config.getboolean("POINTCLOUD", "level_of_detail") and len(points) > 1:
+            order, chunk_starts, level_ends = get_lod_order(
+                points, max_chunk_points=config.getint("POINTCLOUD", "chunk_points")
+            )
+        elif config.getboolean("POINTCLOUD", "morton_order") and len(points) > 1:
+            order = get_morton_order(points)
+        if order is not None:
+            points = points[order]
+            colors = colors[order] if colors is not None and len(colors) else colors
+            labels = labels[order] if labels is not None else None
+            attributes = {name: values[order] for name, values in attributes.items()}
+        if config.getboolean("POINTCLOUD", "level_of_detail") and order is not None:
+            chunks = PointChunks(points, chunk_starts, level_ends)
+        return PointCloudFrame(points, colors, labels, attributes, bounds, order, chunks)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: Path,
+        perspective: Optional[Perspective] = None,
+        write_buffer: bool = True,
+        frame: Optional[PointCloudFrame] = None,
+    ) -> "PointCloud":
+        """Load the point cloud from file, unless an already decoded `frame` is given."""
+        init_translation, init_rotation = (None, None)
+        if perspective:
+            init_translation = perspective.translation
+            init_rotation = perspective.rotation
+
+        if frame is None:
+            frame = cls.read_frame(path)
+
         return cls(
             path,
-            points,
-            colors,
-            labels,
+            frame.points,
+            frame.colors,
+            frame.segmentation_labels,
             init_translation,
             init_rotation,
             write_buffer,
+            frame.attributes,
+            frame.bounds,
+            frame.order,
+            frame.chunks,
         )
 
     def validate_segmentation_label(self) -> None:
@@ -220,12 +450,50 @@ class PointCloud(object):
         if not path:
             path = self.path
         BasePointCloudHandler.get_handler(path.suffix).write_point_cloud(
-            path=path, pointcloud=self
+            path=path, pointcloud=self.in_file_order()
         )
 
+    @property
+    def is_reordered(self) -> bool:
+        return self.order is not None
+
+    def get_original_ids(self, ids: npt.ArrayLike) -> npt.NDArray[np.int64]:
+        """Indices of the points in the point cloud file."""
+        if self.order is None:
+            return np.asarray(ids)
+        return self.order[np.asarray(ids)]
+
+    def to_file_order(self, values: npt.NDArray) -> npt.NDArray:
+        """Per-point values rearranged into the order of the point cloud file."""
+        if self.order is None:
+            return values
+        in_file_order = np.empty_like(values)
+        in_file_order[self.order] = values
+        return in_file_order
+
+    def in_file_order(self) -> "PointCloud":
+        """Shallow copy with the points, colors and attributes in file order."""
+        if self.order is None:
+            return self
+        pointcloud = copy.copy(self)
+        pointcloud.points = self.to_file_order(self.points)
+        if self.original_colors is not None:
+            pointcloud.original_colors = self.to_file_order(self.original_colors)
+        pointcloud.colors = pointcloud.original_colors
+        pointcloud.attributes = self.attributes.filter(invert_permutation(self.order))
+        pointcloud.order = None
+        return pointcloud
+
+    @property
+    def block_bounds(self) -> BlockBounds:
+        """Bounds of blocks of consecutive points, small if the points are reordered."""
+        if self._block_bounds is None:
+            self._block_bounds = get_block_bounds(self.points)
+        return self._block_bounds
+
     @property
     def colorless(self) -> bool:
-        return self.colors is None
+        return self.original_colors is None
 
     @property
     def color_with_label(self) -> bool:
@@ -236,36 +504,67 @@ class PointCloud(object):
         return self.labels is not None
 
     def update_selected_points_in_label_vbo(
-        self, points_inside: npt.NDArray[np.bool_]
+        self, points_inside: npt.NDArray[Union[np.bool_, np.int64]]
     ) -> None:
-        """Send the selected updated label colors to label vbo. This function
-        assumes the `self.label_colors[points_inside]` have been altered.
-        This function only partially updates the label vbo to minimise the
-        data sent to gpu. It leverages `glBufferSubData` method to perform
-        partial update and `consecutive` method to find consecutive indexes
-        so they can be updated in one single `glBufferSubData` call.
+        """Send the class ids of relabeled points to the label vbo.
+
+        Accepts a boolean mask or the indices of the points whose labels have changed.
+        Only one byte per changed point is uploaded, using `glBufferSubData` for each
+        run of consecutive indices (runs with small gaps are uploaded together).
         """
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.label_vbo)
-        inside_idx = np.where(points_inside)[0]
+        inside_idx = (
+            np.flatnonzero(points_inside)
+            if points_inside.dtype == np.bool_
+            else cast(npt.NDArray[np.int64], np.sort(points_inside))
+        )
         if inside_idx.shape[0] == 0:
             logging.warning("No points are found inside the selected boxes.")
             return
-        logging.debug(f"Update {len(inside_idx)} point colors in label VBO.")
+
+        logging.debug(f"Update {len(inside_idx)} class ids in label VBO.")
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.label_vbo)
         # find contiguous points so they can be updated together in one glBufferSubData call
-        arrays = consecutive(inside_idx)
-        label_color = self.label_colors
-        stride = label_color.shape[1] * SIZE_OF_FLOAT
-        for arr in arrays:
-            colors: npt.NDArray[np.float32] = label_color[arr]
-            # partially update label_vbo from positions arr[0] to arr[-1]
+        for start, stop in get_index_runs(inside_idx, LABEL_UPLOAD_MAX_GAP):
+            class_ids = self.get_class_ids(slice(start, stop))
             GL.glBufferSubData(
                 GL.GL_ARRAY_BUFFER,
-                offset=arr[0] * stride,
-                size=colors.nbytes,
-                data=colors,
+                offset=start,
+                size=class_ids.nbytes,
+                data=class_ids,
             )
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
 
     # GETTERS AND SETTERS
+    def build_spatial_index(self) -> None:
+        """Start building the spatial index in a background thread."""
+        if self._spatial_index is None:
+            self._spatial_index = get_spatial_index_executor().submit(
+                SpatialIndex, self.points
+            )
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """Index of the points, waits for the background build or builds it now."""
+        if self._spatial_index is None or self._spatial_index.cancelled():
+            future: "Future[SpatialIndex]" = Future()
+            future.set_result(SpatialIndex(self.points))
+            self._spatial_index = future
+        return self._spatial_index.result()
+
+    @property
+    def has_spatial_index(self) -> bool:
+        """Whether the spatial index is built and can be used without waiting."""
+        return (
+            self._spatial_index is not None
+            and self._spatial_index.done()
+            and not self._spatial_index.cancelled()
+        )
+
+    def release_spatial_index(self) -> None:
+        if self._spatial_index is not None:
+            self._spatial_index.cancel()
+            self._spatial_index = None
+
     def get_no_of_points(self) -> int:
         return len(self.points)
 
@@ -312,95 +611,109 @@ class PointCloud(object):
         self.trans_y = y
         self.trans_z = z
 
-    def set_gl_background(self) -> None:
-        GL.glTranslate(
-            self.trans_x, self.trans_y, self.trans_z
-        )  # third, pcd translation
+    def get_rotation_pivot(self) -> npt.NDArray:
+        """Center of the bounding box, which the point cloud is rotated around."""
+        return np.add(self.pcd_mins, (np.subtract(self.pcd_maxs, self.pcd_mins) / 2))
 
-        pcd_center = np.add(
-            self.pcd_mins, (np.subtract(self.pcd_maxs, self.pcd_mins) / 2)
+    def get_model_matrix(self) -> npt.NDArray[np.float64]:
+        return get_model_matrix(
+            self.get_translation(), self.get_rotations(), self.get_rotation_pivot()
         )
-        GL.glTranslate(*pcd_center)  # move point cloud back
-
-        GL.glRotate(self.rot_x, 1.0, 0.0, 0.0)
-        GL.glRotate(self.rot_y, 0.0, 1.0, 0.0)  # second, pcd rotation
-        GL.glRotate(self.rot_z, 0.0, 0.0, 1.0)
 
-        GL.glTranslate(*(pcd_center * -1))  # move point cloud to center for rotation
+    def set_gl_background(self) -> None:
+        # first rotation around the pivot, then the point cloud translation
+        GL.glMultMatrixd(self.get_model_matrix().T)
 
         GL.glPointSize(max(1.0, self.point_size))
     
 
-    def draw_pointcloud(self) -> None:
-        self.set_gl_background()
-        stride = 3 * SIZE_OF_FLOAT
-
-        # Enable programmable point size
-        GL.glEnable(GL.GL_POINT_SMOOTH)
-        GL.glEnable(GL.GL_PROGRAM_POINT_SIZE)   # needed on many drivers
-        GL.glHint(GL.GL_POINT_SMOOTH_HINT, GL.GL_NICEST)
-
-        # Point attenuation parameters
+    def get_point_attenuation(self, scaled: bool) -> Tuple[float, float, float]:
+        """Constant, linear and quadratic attenuation of the point size."""
         # Formula: size = base_size / sqrt(a + b*d + c*d^2)
-        GL.glPointSize(max(1.0, self.point_size))  # base size
-        GL.glPointParameterfv(GL.GL_POINT_DISTANCE_ATTENUATION,
-                            [1.0, 0.0, self.point_size*3])   # tweak b,c for effect
-        GL.glPointParameterf(GL.GL_POINT_SIZE_MIN, 1.0)
-        GL.glPointParameterf(GL.GL_POINT_SIZE_MAX, 200.0)
-
-        # Bind position buffer
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.position_vbo)
-        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
-        GL.glVertexPointer(3, GL.GL_FLOAT, stride, None)
-
-        # Bind color buffer
-        if self.color_with_label:
-            color_vbo = self.label_vbo
-        else:
-            color_vbo = self.color_vbo
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, color_vbo)
-        GL.glEnableClientState(GL.GL_COLOR_ARRAY)
-        GL.glColorPointer(3, GL.GL_FLOAT, stride, None)
-
-        # Draw
-        GL.glDrawArrays(GL.GL_POINTS, 0, self.get_no_of_points())
+        return (1.0, 0.0, self.point_size * 3) if scaled else (1.0, 0.0, 0.0)
+
+    def get_draw_ranges(
+        self, camera: Optional[Camera] = None, point_budget: int = 0
+    ) -> Optional[DrawRanges]:
+        """Ranges of the visible chunks at the finest level of detail within the
+        budget, None to draw all points."""
+        if self.chunks is None:
+            return None
+        return self.chunks.get_draw_ranges(
+            camera, point_budget, config.getfloat("POINTCLOUD", "lod_voxel_pixels")
+        )
 
-        # Cleanup
-        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
-        GL.glDisableClientState(GL.GL_COLOR_ARRAY)
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+    def get_no_of_drawn_points(self, point_budget: int = 0) -> int:
+        draw_ranges = self.get_draw_ranges(point_budget=point_budget)
+        if draw_ranges is None:
+            return self.get_no_of_points()
+        return int(draw_ranges[1].sum())
 
+    def draw_pointcloud(
+        self, shader: PointCloudShader, draw_ranges: Optional[DrawRanges] = None
+    ) -> None:
+        """Draw the points with a size that attenuates with the distance."""
+        GL.glEnable(GL.GL_POINT_SMOOTH)
+        GL.glHint(GL.GL_POINT_SMOOTH_HINT, GL.GL_NICEST)
+        self._draw_points(shader, self.get_point_attenuation(True), draw_ranges)
 
-    def draw_pointcloud_(self) -> None:
+    def draw_pointcloud_(
+        self, shader: PointCloudShader, draw_ranges: Optional[DrawRanges] = None
+    ) -> None:
+        """Draw the points with a fixed size."""
+        GL.glDisable(GL.GL_POINT_SMOOTH)
+        self._draw_points(shader, self.get_point_attenuation(False), draw_ranges)
 
+    def _draw_points(
+        self,
+        shader: PointCloudShader,
+        attenuation: Tuple[float, float, float],
+        draw_ranges: Optional[DrawRanges] = None,
+    ) -> None:
         self.set_gl_background()
-        stride = 3 * SIZE_OF_FLOAT
-
-        # Bind position buffer
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.position_vbo)
-        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
-        GL.glVertexPointer(3, GL.GL_FLOAT, stride, None)
-
-         # Reset point state to fixed mode
-        GL.glDisable(GL.GL_POINT_SMOOTH)
-        GL.glDisable(GL.GL_PROGRAM_POINT_SIZE)
-        GL.glPointSize(self.point_size)  # fixed size
-        GL.glPointParameterfv(GL.GL_POINT_DISTANCE_ATTENUATION, [1.0, 0.0, 0.0])
+        GL.glEnable(GL.GL_PROGRAM_POINT_SIZE)  # point size is set by the shader
+
+        use_labels = self.color_with_label and self.label_vbo is not None
+        shader.set_palette(LabelConfig().class_colors_key)
+        shader.use(
+            max(1.0, self.point_size),
+            attenuation,
+            mix_ratio=self.mix_ratio if use_labels else 0.0,
+        )
 
-        # Bind color buffer
-        if self.color_with_label:
-            color_vbo = self.label_vbo
+        for location, vbo in [
+            (POSITION_LOCATION, self.position_vbo),
+            (COLOR_LOCATION, self.color_vbo),
+        ]:
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo)
+            GL.glEnableVertexAttribArray(location)
+            GL.glVertexAttribPointer(location, 3, GL.GL_FLOAT, GL.GL_FALSE, 0, None)
+        if use_labels:
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.label_vbo)
+            GL.glEnableVertexAttribArray(CLASS_ID_LOCATION)
+            GL.glVertexAttribPointer(
+                CLASS_ID_LOCATION, 1, GL.GL_UNSIGNED_BYTE, GL.GL_FALSE, 0, None
+            )
         else:
-            color_vbo = self.color_vbo
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, color_vbo)
-        GL.glEnableClientState(GL.GL_COLOR_ARRAY)
-        GL.glColorPointer(3, GL.GL_FLOAT, stride, None)
-        GL.glDrawArrays(GL.GL_POINTS, 0, self.get_no_of_points())  # Draw the points
-
-        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
-        GL.glDisableClientState(GL.GL_COLOR_ARRAY)
-        # Release the buffer binding
+            GL.glVertexAttrib1f(CLASS_ID_LOCATION, 0.0)
+
+        # only the points that are already uploaded
+        if draw_ranges is not None and not self.is_uploaded:
+            draw_ranges = clip_draw_ranges(draw_ranges, self.uploaded_points)
+        if draw_ranges is None:
+            self.drawn_points = self.uploaded_points
+            GL.glDrawArrays(GL.GL_POINTS, 0, self.drawn_points)
+        elif len(draw_ranges[0]):  # a prefix of each visible chunk
+            self.drawn_points = int(draw_ranges[1].sum())
+            GL.glMultiDrawArrays(GL.GL_POINTS, *draw_ranges, len(draw_ranges[0]))
+        else:
+            self.drawn_points = 0
+
+        for location in [POSITION_LOCATION, COLOR_LOCATION, CLASS_ID_LOCATION]:
+            GL.glDisableVertexAttribArray(location)
         GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        shader.release()
+        GL.glDisable(GL.GL_PROGRAM_POINT_SIZE)
 
     def reset_perspective(self) -> None:
         self.trans_x, self.trans_y, self.trans_z = self.init_rotation
@@ -414,8 +727,13 @@ class PointCloud(object):
         points = self.points[indicies]
         if points.shape[0] == 0:
             return None
-        colors = self.colors[indicies]
+        colors = (
+            self.original_colors[indicies] if self.original_colors is not None else None
+        )
         labels = self.labels[indicies] if self.labels is not None else None
+        order = None
+        if self.order is not None:  # keep the relative order of the file
+            order = np.argsort(np.argsort(self.order[indicies]))
         path = self.path.parent / (self.path.stem + "_cropped" + self.path.suffix)
         return PointCloud(
             path=path,
@@ -423,6 +741,8 @@ class PointCloud(object):
             colors=colors,
             segmentation_labels=labels,
             write_buffer=False,
+            attributes=self.attributes.filter(indicies),
+            order=order,
         )
 
     def print_details(self) -> None:
@@ -0,0 +1,47 @@
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+from labelCloud.io.labels.config import LabelConfig  # noqa: F401 (before model)
+from labelCloud.model import PointCloud
+
+NUM_POINTS = 500
+
+PointCloudFactory = Callable[..., PointCloud]
+
+
+@pytest.fixture
+def make_pointcloud() -> PointCloudFactory:
+    """Create point clouds without OpenGL buffers to be written by the handlers."""
+
+    def make(
+        points: npt.NDArray[np.float32],
+        colors: Optional[npt.NDArray[np.float32]] = None,
+        attributes: Optional[Dict[str, npt.NDArray]] = None,
+    ) -> PointCloud:
+        return PointCloud(
+            Path("pointcloud"),
+            points,
+            colors,
+            write_buffer=False,
+            attributes=attributes,
+        )
+
+    return make
+
+
+@pytest.fixture
+def pointcloud(make_pointcloud: PointCloudFactory) -> PointCloud:
+    """Colored point cloud with float and integer attributes."""
+    colors = np.random.randint(0, 256, size=(NUM_POINTS, 3)).astype(np.float32) / 255
+    return make_pointcloud(
+        np.random.uniform(-10, 10, size=(NUM_POINTS, 3)).astype(np.float32),
+        colors,
+        {
+            "intensity": np.random.uniform(0, 1, NUM_POINTS).astype(np.float32),
+            "ring": np.random.randint(0, 64, NUM_POINTS).astype(np.uint16),
+            "timestamp": np.random.uniform(0, 1e9, NUM_POINTS),
+        },
+    )
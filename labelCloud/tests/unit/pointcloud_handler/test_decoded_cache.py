@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from labelCloud.control.config_manager import config
+from labelCloud.io.pointclouds.cache import (
+    DecodedPointCloud,
+    DecodedPointCloudCache,
+    StreamingBounds,
+    decode_chunks,
+    get_bounds,
+)
+from labelCloud.io.pointclouds.base import PointCloudChunk
+
+
+@pytest.fixture
+def cache(tmppath: Path):
+    previous = config.get("FILE", "pointcloud_folder")
+    config.set("FILE", "pointcloud_folder", str(tmppath / "pointclouds"))
+    yield DecodedPointCloudCache()
+    config.set("FILE", "pointcloud_folder", previous)
+
+
+def store_scan(cache: DecodedPointCloudCache, path: Path) -> DecodedPointCloud:
+    scan = np.random.uniform(-50, 50, size=(1000, 4)).astype(np.float32)
+    scan.tofile(path)
+    points = scan[:, :3]
+    decoded = DecodedPointCloud(
+        points, None, {"intensity": scan[:, 3]}, get_bounds(points)
+    )
+    cache.store(path, decoded)
+    return decoded
+
+
+def test_store_and_load(cache: DecodedPointCloudCache, tmppath: Path) -> None:
+    path = tmppath / "scan.bin"
+    decoded = store_scan(cache, path)
+
+    loaded = cache.load(path)
+
+    assert loaded is not None
+    assert cache.folder == tmppath / ".pointclouds_cache"
+    assert isinstance(loaded.points, np.memmap)
+    assert np.array_equal(loaded.points, decoded.points)
+    assert loaded.colors is None
+    assert np.array_equal(
+        loaded.attributes["intensity"], decoded.attributes["intensity"]
+    )
+    assert np.array_equal(loaded.bounds, decoded.bounds)
+
+
+def test_changed_file_is_not_loaded(
+    cache: DecodedPointCloudCache, tmppath: Path
+) -> None:
+    path = tmppath / "scan.bin"
+    store_scan(cache, path)
+
+    np.zeros((10, 4), dtype=np.float32).tofile(path)
+
+    assert cache.load(path) is None
+
+
+def test_size_limit_evicts_least_recently_used(
+    cache: DecodedPointCloudCache, tmppath: Path
+) -> None:
+    previous = config.get("POINTCLOUD", "decoded_cache_size")
+    config.set("POINTCLOUD", "decoded_cache_size", str(40_000 / 1024 / 1024))
+    paths = [tmppath / f"scan_{i}.bin" for i in range(3)]
+    store_scan(cache, paths[0])
+    store_scan(cache, paths[1])
+    cache.load(paths[0])
+    store_scan(cache, paths[2])  # each entry takes about 16 kB
+    config.set("POINTCLOUD", "decoded_cache_size", previous)
+
+    assert [cache.load(path) is not None for path in paths] == [True, False, True]
+
+
+def test_decode_chunks_collects_bounds() -> None:
+    points = np.random.uniform(-50, 50, size=(1000, 3)).astype(np.float32)
+    intensities = np.random.uniform(0, 1, 1000).astype(np.float32)
+    chunks = [
+        PointCloudChunk(
+            points[i : i + 300], None, {"intensity": intensities[i : i + 300]}
+        )
+        for i in range(0, 1000, 300)
+    ]
+
+    decoded = decode_chunks(chunks)
+
+    assert np.array_equal(decoded.points, points)
+    assert decoded.colors is None
+    assert np.array_equal(decoded.attributes["intensity"], intensities)
+    np.testing.assert_allclose(decoded.bounds, get_bounds(points), atol=1e-4)
+
+
+def test_streaming_bounds_without_points() -> None:
+    bounds = StreamingBounds()
+    bounds.add(np.empty((0, 3), dtype=np.float32))
+
+    assert bounds.no_of_points == 0
+    assert np.array_equal(bounds.bounds[2], [0, 0, 0])
+
+
+def test_streamed_frame_matches_read_frame(tmppath: Path) -> None:
+    from labelCloud.io.labels.config import LabelConfig  # noqa: F401 (before model)
+    from labelCloud.model import PointCloud
+
+    path = tmppath / "scan.bin"
+    np.random.uniform(-50, 50, size=(1000, 4)).astype(np.float32).tofile(path)
+    frame = PointCloud.read_frame(path)
+
+    previous = config.get("POINTCLOUD", "stream_chunk_points")
+    config.set("POINTCLOUD", "stream_chunk_points", "300")
+    try:
+        streamed = PointCloud.read_frame(path)
+    finally:
+        config.set("POINTCLOUD", "stream_chunk_points", previous)
+
+    assert np.array_equal(streamed.points, frame.points)
+    assert np.array_equal(
+        streamed.attributes["intensity"], frame.attributes["intensity"]
+    )
+    np.testing.assert_allclose(streamed.bounds, frame.bounds, atol=1e-4)
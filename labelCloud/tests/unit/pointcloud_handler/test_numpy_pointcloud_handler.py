@@ -0,0 +1,94 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from labelCloud.control.config_manager import config
+from labelCloud.io.pointclouds import NumpyHandler
+from labelCloud.io.pointclouds.numpy import is_memory_mapped
+
+
+@pytest.fixture
+def handler() -> NumpyHandler:
+    return NumpyHandler()
+
+
+@pytest.fixture(params=[True, False], ids=["memmap", "fromfile"])
+def memory_map(request):
+    previous = config.get("POINTCLOUD", "memory_map")
+    config.set("POINTCLOUD", "memory_map", str(request.param))
+    yield request.param
+    config.set("POINTCLOUD", "memory_map", previous)
+
+
+def test_read_kitti_point_cloud(
+    handler: NumpyHandler, memory_map: bool, tmppath: Path
+) -> None:
+    scan = np.random.uniform(-50, 50, size=(1000, 4)).astype(np.float32)
+    path = tmppath / "scan.bin"
+    scan.tofile(path)
+
+    points, colors, attributes = handler.read_point_cloud_with_attributes(path)
+
+    assert colors is None
+    assert points.shape == (1000, 3)
+    assert np.array_equal(points, scan[:, :3])
+    assert np.array_equal(attributes["intensity"], scan[:, 3])
+    assert is_memory_mapped(points) == memory_map
+    assert is_memory_mapped(attributes["intensity"]) == memory_map
+
+
+def test_read_point_cloud_drops_nan(
+    handler: NumpyHandler, memory_map: bool, tmppath: Path
+) -> None:
+    scan = np.random.uniform(-50, 50, size=(1000, 4)).astype(np.float32)
+    scan[[3, 500, 999], 1] = np.nan
+    path = tmppath / "scan.bin"
+    scan.tofile(path)
+
+    points, _ = handler.read_point_cloud(path)
+
+    assert points.shape == (997, 3)
+    assert not np.isnan(points).any()
+
+
+def test_write_point_cloud_onto_mapped_file(
+    handler: NumpyHandler, memory_map: bool, make_pointcloud, tmppath: Path
+) -> None:
+    # 1001 points, so the file size is not mistaken for points with reflection
+    scan = np.random.uniform(-50, 50, size=(1001, 3)).astype(np.float32)
+    path = tmppath / "scan.bin"
+    scan.tofile(path)
+    points, _ = handler.read_point_cloud(path)
+
+    handler.write_point_cloud(path, make_pointcloud(points))
+
+    assert np.array_equal(np.fromfile(path, dtype=np.float32).reshape(-1, 3), scan)
+
+
+def test_write_point_cloud_keeps_intensity(
+    handler: NumpyHandler, memory_map: bool, make_pointcloud, tmppath: Path
+) -> None:
+    scan = np.random.uniform(-50, 50, size=(1000, 4)).astype(np.float32)
+    path = tmppath / "scan.bin"
+    scan.tofile(path)
+    points, _, attributes = handler.read_point_cloud_with_attributes(path)
+
+    handler.write_point_cloud(path, make_pointcloud(points, attributes=attributes))
+
+    assert np.array_equal(np.fromfile(path, dtype=np.float32).reshape(-1, 4), scan)
+
+
+def test_iter_chunks(handler: NumpyHandler, tmppath: Path) -> None:
+    scan = np.random.uniform(-50, 50, size=(1000, 4)).astype(np.float32)
+    scan[500, 1] = np.nan
+    path = tmppath / "scan.bin"
+    scan.tofile(path)
+
+    chunks = list(handler.iter_chunks(path, chunk_points=300))
+
+    assert [len(chunk.points) for chunk in chunks] == [300, 299, 300, 100]
+    points = np.concatenate([chunk.points for chunk in chunks])
+    intensities = np.concatenate([chunk.attributes["intensity"] for chunk in chunks])
+    assert points.dtype == np.float32 and points.flags.c_contiguous
+    assert np.array_equal(points, np.delete(scan, 500, axis=0)[:, :3])
+    assert np.array_equal(intensities, np.delete(scan, 500, axis=0)[:, 3])
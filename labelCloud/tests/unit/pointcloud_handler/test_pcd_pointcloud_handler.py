@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from labelCloud.io.pointclouds import BasePointCloudHandler, PcdHandler
+from labelCloud.io.pointclouds.open3d import Open3DHandler
+from labelCloud.io.pointclouds.pcd import encode_packed_colors
+from labelCloud.model import PointCloud
+
+
+@pytest.fixture
+def handler() -> PcdHandler:
+    return PcdHandler()
+
+
+def write_header(path: Path, fields: str, sizes: str, types: str, data: str, n: int):
+    with path.open("w") as stream:
+        stream.write(
+            f"VERSION 0.7\nFIELDS {fields}\nSIZE {sizes}\nTYPE {types}\n"
+            f"COUNT {' '.join('1' for _ in fields.split())}\n"
+            f"WIDTH {n}\nHEIGHT 1\nVIEWPOINT 0 0 0 1 0 0 0\nPOINTS {n}\nDATA {data}\n"
+        )
+
+
+def test_pcd_handler_is_preferred_over_open3d() -> None:
+    assert isinstance(BasePointCloudHandler.get_handler(".pcd"), PcdHandler)
+
+
+def test_read_example_point_cloud(handler: PcdHandler) -> None:
+    points, colors = handler.read_point_cloud(
+        Path("labelCloud/resources/labelCloud_icon.pcd")
+    )
+    assert points.dtype == np.float32
+    assert points.shape == (12034, 3)
+    assert colors is not None
+    assert colors.dtype == np.float32
+    assert colors.shape == (12034, 3)
+    assert 0 <= colors.min() and colors.max() <= 1
+
+
+def test_read_ascii(handler: PcdHandler, tmppath: Path) -> None:
+    path = tmppath / "ascii.pcd"
+    write_header(path, "x y z rgb intensity", "4 4 4 4 4", "F F F F F", "ascii", 3)
+    rgb = encode_packed_colors(np.array([[1, 0, 0], [0, 1, 0], [0, 0, 1]]))
+    z_values = [0, np.nan, -2]  # the second point must be dropped
+    with path.open("a") as stream:
+        for i, (z, packed) in enumerate(zip(z_values, rgb.view(np.float32))):
+            stream.write(f"{i} {i + 0.5} {z} {packed!r} {i * 10}\n")
+
+    points, colors, attributes = handler.read_point_cloud_with_attributes(path)
+
+    assert np.array_equal(points, [[0, 0.5, 0], [2, 2.5, -2]])
+    assert np.array_equal(colors, [[1, 0, 0], [0, 0, 1]])
+    assert np.array_equal(attributes["intensity"], [0, 20])
+
+
+def test_compressed_files_are_read_with_open3d(
+    handler: PcdHandler, tmppath: Path, monkeypatch
+) -> None:
+    # decompressing LZF in Python is about ten times slower than Open3D
+    points = np.random.uniform(-10, 10, size=(500, 3)).astype(np.float32)
+    read_paths = []
+
+    def read_point_cloud(self, path: Path):
+        read_paths.append(path)
+        return points, np.empty((0, 3), dtype=np.float32)
+
+    monkeypatch.setattr(Open3DHandler, "read_point_cloud", read_point_cloud)
+    path = tmppath / "compressed.pcd"
+    write_header(path, "x y z", "4 4 4", "F F F", "binary_compressed", 500)
+
+    read_points, colors, attributes = handler.read_point_cloud_with_attributes(path)
+    chunks = list(handler.iter_chunks(path, chunk_points=200))
+
+    assert read_paths == [path, path]
+    assert read_points is points
+    assert colors is None
+    assert attributes == {}
+    assert [len(chunk.points) for chunk in chunks] == [200, 200, 100]
+    assert all(chunk.colors is None for chunk in chunks)
+
+
+def test_iter_chunks(
+    handler: PcdHandler, pointcloud: PointCloud, tmppath: Path
+) -> None:
+    path = tmppath / "chunks.pcd"
+    handler.write_point_cloud(path, pointcloud)
+
+    chunks = list(handler.iter_chunks(path, chunk_points=200))
+
+    assert [len(chunk.points) for chunk in chunks] == [200, 200, 100]
+    points = np.concatenate([chunk.points for chunk in chunks])
+    colors = np.concatenate([chunk.colors for chunk in chunks])
+    assert np.array_equal(points, pointcloud.points)
+    assert np.allclose(colors, pointcloud.original_colors, atol=1 / 510)
+    for name, values in pointcloud.attributes.items():
+        chunk_values = np.concatenate([chunk.attributes[name] for chunk in chunks])
+        assert np.array_equal(chunk_values, values)
+
+
+def test_iter_chunks_of_ascii(handler: PcdHandler, tmppath: Path) -> None:
+    path = tmppath / "ascii.pcd"
+    write_header(path, "x y z", "4 4 4", "F F F", "ascii", 5)
+    with path.open("a") as stream:
+        for i in range(5):
+            stream.write(f"{i} {i} {np.nan if i == 1 else i}\n")
+
+    chunks = list(handler.iter_chunks(path, chunk_points=2))
+
+    assert [len(chunk.points) for chunk in chunks] == [1, 2, 1]
+    points = np.concatenate([chunk.points for chunk in chunks])
+    assert np.array_equal(points[:, 0], [0, 2, 3, 4])
@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from labelCloud.io.pointclouds import BasePointCloudHandler, PlyHandler
+from labelCloud.model import PointCloud
+
+
+@pytest.fixture
+def handler() -> PlyHandler:
+    return PlyHandler()
+
+
+def test_ply_handler_is_preferred_over_open3d() -> None:
+    assert isinstance(BasePointCloudHandler.get_handler(".ply"), PlyHandler)
+
+
+def test_read_example_point_cloud(handler: PlyHandler) -> None:
+    points, colors, attributes = handler.read_point_cloud_with_attributes(
+        Path("pointclouds/exemplary.ply")
+    )
+    assert points.dtype == np.float32
+    assert points.shape == (86357, 3)
+    assert colors is not None
+    assert colors.dtype == np.float32
+    assert colors.shape == (86357, 3)
+    assert 0 <= colors.min() and colors.max() <= 1
+    assert attributes == {}
+
+
+def test_alpha_is_kept(
+    handler: PlyHandler, pointcloud: PointCloud, make_pointcloud, tmppath: Path
+) -> None:
+    alpha = np.random.randint(0, 256, len(pointcloud.points)).astype(np.uint8)
+    pointcloud.attributes.add("alpha", alpha)
+    path = tmppath / "alpha.ply"
+    handler.write_point_cloud(path, pointcloud)
+
+    # read and written again, like a rotated point cloud
+    handler.write_point_cloud(
+        path, make_pointcloud(*handler.read_point_cloud_with_attributes(path))
+    )
+    _, _, attributes = handler.read_point_cloud_with_attributes(path)
+
+    assert attributes["alpha"].dtype == np.uint8
+    assert np.array_equal(attributes["alpha"], alpha)
+
+
+def test_64_bit_integers_are_rejected(
+    handler: PlyHandler, pointcloud: PointCloud, tmppath: Path
+) -> None:
+    pointcloud.attributes.add("id", np.arange(len(pointcloud.points), dtype=np.int64))
+    path = tmppath / "ids.ply"
+
+    with pytest.raises(ValueError, match="attribute `id` of type int64"):
+        handler.write_point_cloud(path, pointcloud)
+    assert not path.exists()
+
+
+@pytest.mark.parametrize("data_format", ["ascii", "binary_big_endian"])
+def test_read_with_preceding_element(
+    handler: PlyHandler, data_format: str, tmppath: Path
+) -> None:
+    vertices = np.array(
+        [(0, 1, 2, 7), (3, np.nan, 5, 8), (6, 7, 8, 9)],
+        dtype=[("x", ">f4"), ("y", ">f4"), ("z", ">f4"), ("ring", ">u2")],
+    )
+    path = tmppath / "points.ply"
+    with path.open("wb") as stream:
+        stream.write(
+            (
+                f"ply\nformat {data_format} 1.0\n"
+                "element camera 1\nproperty float fov\n"
+                "element vertex 3\nproperty float x\nproperty float y\n"
+                "property float z\nproperty ushort ring\nend_header\n"
+            ).encode("ascii")
+        )
+        if data_format == "ascii":
+            stream.write(b"0.5\n")
+            for vertex in vertices:
+                stream.write((" ".join(str(v) for v in vertex) + "\n").encode("ascii"))
+        else:
+            stream.write(np.array([0.5], dtype=">f4").tobytes())
+            stream.write(vertices.tobytes())
+
+    points, colors, attributes = handler.read_point_cloud_with_attributes(path)
+
+    assert colors is None
+    assert np.array_equal(points, [[0, 1, 2], [6, 7, 8]])
+    assert np.array_equal(attributes["ring"], [7, 9])
+
+
+@pytest.mark.parametrize("data_format", ["ascii", "binary_big_endian"])
+def test_iter_chunks(handler: PlyHandler, data_format: str, tmppath: Path) -> None:
+    vertices = np.array(
+        [(0, 1, 2, 7), (3, np.nan, 5, 8), (6, 7, 8, 9), (1, 1, 1, 1), (2, 2, 2, 2)],
+        dtype=[("x", ">f4"), ("y", ">f4"), ("z", ">f4"), ("ring", ">u2")],
+    )
+    path = tmppath / "points.ply"
+    with path.open("wb") as stream:
+        stream.write(
+            (
+                f"ply\nformat {data_format} 1.0\n"
+                "element vertex 5\nproperty float x\nproperty float y\n"
+                "property float z\nproperty ushort ring\nend_header\n"
+            ).encode("ascii")
+        )
+        if data_format == "ascii":
+            for vertex in vertices:
+                stream.write((" ".join(str(v) for v in vertex) + "\n").encode("ascii"))
+        else:
+            stream.write(vertices.tobytes())
+
+    chunks = list(handler.iter_chunks(path, chunk_points=2))
+
+    assert [len(chunk.points) for chunk in chunks] == [1, 2, 1]
+    assert all(chunk.colors is None for chunk in chunks)
+    points = np.concatenate([chunk.points for chunk in chunks])
+    rings = np.concatenate([chunk.attributes["ring"] for chunk in chunks])
+    assert np.array_equal(points, [[0, 1, 2], [6, 7, 8], [1, 1, 1], [2, 2, 2]])
+    assert np.array_equal(rings, [7, 9, 1, 2])
@@ -0,0 +1,76 @@
+from pathlib import Path
+from typing import Tuple, Type
+
+import numpy as np
+import pytest
+from labelCloud.io.pointclouds import (
+    BasePointCloudHandler,
+    NumpyHandler,
+    PcdHandler,
+    PlyHandler,
+)
+from labelCloud.model import PointCloud
+
+
+def write_and_read(
+    handler_class: Type[BasePointCloudHandler], pointcloud: PointCloud, path: Path
+):
+    handler = handler_class()
+    handler.write_point_cloud(path, pointcloud)
+    return handler.read_point_cloud_with_attributes(path)
+
+
+@pytest.mark.parametrize(
+    "handler_class, kept_attributes, kept_colors",
+    [
+        (NumpyHandler, ("intensity",), False),
+        (PcdHandler, ("intensity", "ring", "timestamp"), True),
+        (PlyHandler, ("intensity", "ring", "timestamp"), True),
+    ],
+)
+def test_write_read_roundtrip(
+    handler_class: Type[BasePointCloudHandler],
+    kept_attributes: Tuple[str, ...],
+    kept_colors: bool,
+    pointcloud: PointCloud,
+    tmppath: Path,
+) -> None:
+    path = tmppath / f"roundtrip{next(iter(handler_class.EXTENSIONS))}"
+
+    points, colors, attributes = write_and_read(handler_class, pointcloud, path)
+
+    assert np.array_equal(points, pointcloud.points)
+    if kept_colors:
+        assert np.allclose(colors, pointcloud.original_colors, atol=1 / 510)
+    else:
+        assert colors is None
+    assert attributes.keys() == set(kept_attributes)
+    for name in kept_attributes:
+        assert attributes[name].dtype == pointcloud.attributes[name].dtype
+        assert np.array_equal(attributes[name], pointcloud.attributes[name])
+
+
+@pytest.mark.parametrize("handler_class", [PcdHandler, PlyHandler])
+def test_boolean_attributes_are_written_as_unsigned(
+    handler_class: Type[BasePointCloudHandler], pointcloud: PointCloud, tmppath: Path
+) -> None:
+    flag = np.random.uniform(0, 1, len(pointcloud.points)) > 0.5
+    pointcloud.attributes.add("flag", flag)
+    path = tmppath / f"flag{next(iter(handler_class.EXTENSIONS))}"
+
+    _, _, attributes = write_and_read(handler_class, pointcloud, path)
+
+    assert attributes["flag"].dtype == np.uint8
+    assert np.array_equal(attributes["flag"], flag)
+
+
+@pytest.mark.parametrize("handler_class", [PcdHandler, PlyHandler])
+def test_unsupported_attribute_types_are_rejected(
+    handler_class: Type[BasePointCloudHandler], pointcloud: PointCloud, tmppath: Path
+) -> None:
+    pointcloud.attributes.add("label", np.full(len(pointcloud.points), "car"))
+    path = tmppath / f"label{next(iter(handler_class.EXTENSIONS))}"
+
+    with pytest.raises(ValueError, match="attribute `label` of type <U3"):
+        handler_class().write_point_cloud(path, pointcloud)
+    assert not path.exists()
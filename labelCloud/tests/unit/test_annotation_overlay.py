@@ -0,0 +1,61 @@
+from typing import List
+
+import numpy as np
+import pytest
+from labelCloud.model import BBox
+from labelCloud.view import annotation_overlay
+from labelCloud.view.annotation_overlay import AnnotationOverlay
+
+
+@pytest.fixture
+def uploads(monkeypatch) -> List[tuple]:
+    """Record the buffer uploads instead of calling OpenGL."""
+    uploads: List[tuple] = []
+    gl = annotation_overlay.GL
+    monkeypatch.setattr(gl, "glGenBuffers", lambda n: 1)
+    monkeypatch.setattr(gl, "glBindBuffer", lambda *args: None)
+    monkeypatch.setattr(
+        gl, "glBufferData", lambda target, size, data, usage: uploads.append((0, size))
+    )
+    monkeypatch.setattr(
+        gl,
+        "glBufferSubData",
+        lambda target, offset, size, data: uploads.append((offset, size)),
+    )
+    return uploads
+
+
+def test_only_changed_boxes_are_uploaded(uploads: List[tuple]) -> None:
+    bboxes = [BBox(i, 0, 0) for i in range(10)]
+    overlay = AnnotationOverlay()
+    box_bytes = 24 * annotation_overlay.VERTEX_BYTES
+
+    overlay.update(bboxes)
+    assert uploads == [(0, 10 * box_bytes)]
+    np.testing.assert_allclose(
+        overlay.lines.data[24:48, :3], bboxes[1].get_edge_vertices()
+    )
+
+    uploads.clear()
+    overlay.update(bboxes)
+    assert uploads == []
+
+    bboxes[3].set_z_rotation(45)
+    bboxes[4].set_dimensions(2, 2, 2)
+    bboxes[8].translate_bbox(0, 1, 0)
+    overlay.update(bboxes)
+    assert uploads == [(3 * box_bytes, 2 * box_bytes), (8 * box_bytes, box_bytes)]
+    np.testing.assert_allclose(
+        overlay.lines.data[4 * 24 : 5 * 24, :3], bboxes[4].get_edge_vertices()
+    )
+    assert overlay.lines.uploaded_items == 13
+
+
+def test_removed_box_reallocates_buffer(uploads: List[tuple]) -> None:
+    bboxes = [BBox(i, 0, 0) for i in range(3)]
+    overlay = AnnotationOverlay()
+    overlay.update(bboxes)
+
+    overlay.update(bboxes[1:])
+    assert len(overlay.lines) == 2 * 24
+    assert uploads[-1] == (0, 2 * 24 * annotation_overlay.VERTEX_BYTES)
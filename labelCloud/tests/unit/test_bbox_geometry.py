@@ -0,0 +1,63 @@
+import numpy as np
+from labelCloud.model import BBox
+from labelCloud.utils import math3d
+
+
+def reference_vertices(bbox: BBox) -> np.ndarray:
+    """Rotate each vertex separately, as the boxes were computed before."""
+    length, width, height = bbox.get_dimensions()
+    vertices = math3d.UNIT_BBOX_VERTICES * [length, width, height]
+    return np.array(
+        [
+            math3d.rotate_around_zyx(vertex, *bbox.get_rotations(), degrees=True)
+            + bbox.get_center()
+            for vertex in vertices
+        ]
+    )
+
+
+def test_vertices_match_rotation_of_each_vertex() -> None:
+    bbox = BBox(1, 2, 3, length=4, width=2, height=1)
+    bbox.set_rotations(10, 20, 30)
+
+    np.testing.assert_allclose(bbox.get_vertices(), reference_vertices(bbox))
+    np.testing.assert_allclose(
+        bbox.get_pose()[:3, :3] @ [1, 0, 0] * 4 / 2 + bbox.get_center(),
+        bbox.get_vertices()[[2, 3, 6, 7]].mean(axis=0),  # center of the right side
+    )
+
+
+def test_vertices_are_cached_until_changed() -> None:
+    bbox = BBox(0, 0, 0)
+    vertices = bbox.get_vertices()
+    assert bbox.get_vertices() is vertices
+
+    version = bbox.version
+    bbox.length += 1  # attributes are also changed directly
+    assert bbox.version != version
+    assert bbox.get_vertices() is not vertices
+    np.testing.assert_allclose(bbox.get_vertices(), reference_vertices(bbox))
+
+
+def test_batch_vertices_match_single_boxes() -> None:
+    bboxes = [BBox(i, -i, 0.5 * i, 1 + i, 2, 3) for i in range(5)]
+    for i, bbox in enumerate(bboxes):
+        bbox.set_rotations(15 * i, 0, 40 * i)
+
+    vertices = math3d.get_bboxes_vertices(
+        [bbox.get_center() for bbox in bboxes],
+        [bbox.get_dimensions() for bbox in bboxes],
+        [bbox.get_rotations() for bbox in bboxes],
+    )
+    np.testing.assert_allclose(vertices, [bbox.get_vertices() for bbox in bboxes])
+
+
+def test_points_inside_rotated_box() -> None:
+    bbox = BBox(0, 0, 0, length=4, width=1, height=1)
+    bbox.set_z_rotation(90)
+    points = np.array([[0, 1.5, 0], [1.5, 0, 0], [0, 0, 0]], dtype=np.float32)
+
+    assert bbox.is_inside(points).tolist() == [True, False, True]
+    assert math3d.are_points_inside_bboxes(
+        points, bbox.get_vertices()[None]
+    ).tolist() == [[True, False, True]]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from labelCloud.utils import math3d
+from labelCloud.utils.box_labeling import label_points_in_bboxes
+from labelCloud.utils.spatial_index import SpatialIndex
+
+
+@pytest.fixture
+def points() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.uniform((-20, -20, -2), (20, 20, 2), (50000, 3)).astype(np.float32)
+
+
+@pytest.fixture
+def vertices() -> np.ndarray:
+    rng = np.random.default_rng(1)
+    centers = rng.uniform(-18, 18, (40, 3))
+    dimensions = rng.uniform(1, 6, (40, 3))
+    rotations = rng.uniform(0, 360, (40, 3))
+    return math3d.get_bboxes_vertices(centers, dimensions, rotations)
+
+
+@pytest.mark.parametrize("use_index", [False, True])
+@pytest.mark.parametrize("workers", [1, 4])
+def test_matches_boxes_assigned_one_by_one(points, vertices, use_index, workers):
+    class_ids = np.arange(len(vertices)) % 7 + 1
+    expected = np.zeros(len(points), dtype=np.int8)
+    masks = math3d.are_points_inside_bboxes(points, vertices)
+    for mask, class_id in zip(masks, class_ids):
+        expected[mask] = class_id
+
+    labels = np.zeros(len(points), dtype=np.int8)
+    result = label_points_in_bboxes(
+        points,
+        vertices,
+        class_ids,
+        labels,
+        SpatialIndex(points) if use_index else None,
+        workers=workers,
+        chunk_size=4096,
+    )
+
+    assert result.labels is labels
+    np.testing.assert_array_equal(labels, expected)
+    np.testing.assert_array_equal(result.counts, masks.sum(axis=1))
+    np.testing.assert_array_equal(result.changed, np.flatnonzero(masks.any(axis=0)))
+
+
+def test_boxes_outside_of_the_points(points) -> None:
+    vertices = math3d.get_bboxes_vertices([(100, 0, 0)], [(1, 1, 1)], [(0, 0, 0)])
+    labels = np.zeros(len(points), dtype=np.int8)
+    result = label_points_in_bboxes(points, vertices, [3], labels, SpatialIndex(points))
+    assert result.counts.tolist() == [0]
+    assert len(result.changed) == 0
+    assert not labels.any()
+
+
+def test_aabb_candidates_contain_points_inside(points) -> None:
+    index = SpatialIndex(points)
+    for mins, maxs in [((-3, -2, -1), (1, 4, 0.5)), ((-50, -50, -50), (50, 50, 50))]:
+        inside = np.flatnonzero(np.all((points >= mins) & (points <= maxs), axis=1))
+        candidates = index.query_aabb_candidates(mins, maxs)
+        assert np.isin(inside, candidates).all()
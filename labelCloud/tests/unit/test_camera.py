@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from labelCloud.utils.camera import Camera, get_model_matrix
+
+
+@pytest.fixture
+def camera() -> Camera:
+    camera = Camera(fov=45.0, near=0.1, far=300)
+    camera.set_viewport(800, 600)
+    camera.set_pose((1, -2, -10), (30, 15, 60), (0.5, 0.5, 0.5))
+    return camera
+
+
+def test_near_and_far_plane_map_to_depth_range() -> None:
+    camera = Camera(fov=45.0, near=0.1, far=300)
+    camera.set_viewport(800, 600)
+
+    window = camera.project([[0, 0, -0.1], [0, 0, -300]])
+    np.testing.assert_allclose(window, [[400, 300, 0], [400, 300, 1]], atol=1e-6)
+
+
+def test_unproject_inverts_project(camera: Camera) -> None:
+    points = np.random.default_rng(0).uniform(-3, 3, size=(100, 3))
+    window = camera.project(points)
+
+    np.testing.assert_allclose(
+        camera.unproject(window[:, 0], window[:, 1], window[:, 2]), points, atol=1e-6
+    )
+
+
+def test_model_matrix_rotates_around_pivot() -> None:
+    pivot = (1.0, 2.0, 3.0)
+    matrix = get_model_matrix((0, 0, 0), (0, 0, 90), pivot)
+
+    np.testing.assert_allclose(matrix @ [*pivot, 1], [*pivot, 1], atol=1e-12)
+    np.testing.assert_allclose(matrix @ [2, 2, 3, 1], [1, 3, 3, 1], atol=1e-12)
+
+
+def test_matrices_are_only_recomputed_on_changes(camera: Camera) -> None:
+    inverse_mvp = camera.inverse_mvp
+    camera.set_pose((1, -2, -10), (30, 15, 60), (0.5, 0.5, 0.5))
+    camera.set_viewport(800, 600)
+    assert camera.inverse_mvp is inverse_mvp
+
+    camera.set_viewport(1024, 768)
+    assert camera.inverse_mvp is not inverse_mvp
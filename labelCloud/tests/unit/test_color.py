@@ -1,6 +1,18 @@
+from pathlib import Path
+
 import numpy as np
+import pytest
 
-from labelCloud.utils.color import colorize_points_with_height, get_distinct_colors
+from labelCloud.control.config_manager import config
+from labelCloud.io.labels.config import LabelConfig  # noqa: F401 (before model)
+from labelCloud.model import PointCloud
+from labelCloud.utils.color import (
+    COLORMAPS,
+    colorize_points_with_height,
+    colorize_values,
+    get_distinct_colors,
+    get_palette,
+)
 
 
 def test_get_distinct_colors() -> None:
@@ -20,3 +32,71 @@ def test_colorize_points_with_height() -> None:
     assert colors.dtype == np.float32
     assert colors.shape == (num_points, 3)
     assert 0 <= colors.max() <= 1
+
+
+def test_colorize_values_matches_palette() -> None:
+    palette = get_palette("rocket")
+    values = np.linspace(-5, 5, len(palette), dtype=np.float32)
+
+    colors = colorize_values(values, -5, 5)
+
+    assert np.array_equal(colors, palette)
+
+
+@pytest.mark.parametrize("colormap", COLORMAPS)
+def test_colorize_values_in_chunks(colormap: str) -> None:
+    values = np.random.uniform(low=0, high=100, size=10_000).astype(np.float32)
+
+    colors = colorize_values(values, 0, 100, colormap, chunk_size=999)
+
+    assert colors.dtype == np.float32
+    assert np.array_equal(colors, colorize_values(values, 0, 100, colormap))
+
+
+def test_colorize_values_with_nan() -> None:
+    values = np.array([1, np.nan, 3, np.inf], dtype=np.float32)
+
+    colors = colorize_values(values, 1, 3)
+
+    palette = get_palette("rocket")
+    assert np.array_equal(colors, palette[[0, 0, -1, 0]])
+
+
+@pytest.fixture
+def color_source():
+    previous = config.get("POINTCLOUD", "color_source")
+    yield lambda source: config.set("POINTCLOUD", "color_source", source)
+    config.set("POINTCLOUD", "color_source", previous)
+
+
+def test_colorize_by_intensity_with_nan(color_source) -> None:
+    color_source("intensity")
+    points = np.random.uniform(0, 1, size=(3, 3)).astype(np.float32)
+    intensity = np.array([1, np.nan, 3], dtype=np.float32)
+
+    pointcloud = PointCloud(
+        Path("scan.bin"),
+        points,
+        write_buffer=False,
+        attributes={"intensity": intensity},
+    )
+
+    palette = get_palette(config.get("POINTCLOUD", "colormap"))
+    assert np.array_equal(pointcloud.colors, palette[[0, 0, -1]])
+
+
+def test_colorize_falls_back_if_all_values_are_nan(color_source) -> None:
+    color_source("intensity")
+    points = np.random.uniform(0, 1, size=(3, 3)).astype(np.float32)
+    colors = np.random.uniform(0, 1, size=(3, 3)).astype(np.float32)
+    intensity = np.full(3, np.nan, dtype=np.float32)
+
+    pointcloud = PointCloud(
+        Path("scan.bin"),
+        points,
+        colors,
+        write_buffer=False,
+        attributes={"intensity": intensity},
+    )
+
+    assert np.array_equal(pointcloud.colors, colors)
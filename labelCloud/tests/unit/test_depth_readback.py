@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from labelCloud.view.depth_readback import (
+    DEPTH_WINDOW_SIZE,
+    DepthReadback,
+    get_window_origin,
+)
+
+
+def test_window_is_centered_on_cursor() -> None:
+    x, y = get_window_origin(100, 50)
+    assert (x + DEPTH_WINDOW_SIZE // 2, y + DEPTH_WINDOW_SIZE // 2) == (100, 50)
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    readback = DepthReadback(cache_size=2)
+    depths = np.ones((DEPTH_WINDOW_SIZE, DEPTH_WINDOW_SIZE), dtype=np.float32)
+
+    readback._store((0, 0), depths)
+    readback._store((1, 1), depths * 0.5)
+    assert readback.get((0, 0)) is depths  # now the most recently used
+    readback._store((2, 2), depths * 0.25)
+
+    assert readback.get((1, 1)) is None
+    assert readback.get((0, 0)) is depths
+    assert readback.hits == 2
+
+    readback.clear()
+    assert readback.get((0, 0)) is None
+
+
+def test_async_read_without_buffers_is_ignored() -> None:
+    readback = DepthReadback()
+    readback.read_async((0, 0), 0, 0)  # no GL context, no pixel buffer objects
+    assert not readback.has_pending
+
+
+@pytest.mark.parametrize("has_spatial_index", [True, False])
+def test_empty_depth_picks_along_ray_only_with_index(has_spatial_index: bool) -> None:
+    from labelCloud.io.labels.config import LabelConfig  # noqa: F401 (before view)
+    from labelCloud.view.viewer import GLWidget
+
+    picks = []
+    widget = SimpleNamespace(
+        to_gl_pixel=lambda x, y: (int(x), int(y)),
+        depth_readback=SimpleNamespace(
+            read=lambda key, x, y: np.ones((DEPTH_WINDOW_SIZE, DEPTH_WINDOW_SIZE))
+        ),
+        pcd_manager=SimpleNamespace(
+            pointcloud=SimpleNamespace(
+                has_spatial_index=has_spatial_index,
+                points=np.array([[1, 2, 3]], dtype=np.float32),
+            )
+        ),
+        pick_point_along_ray=lambda x, y: picks.append((x, y)) or 0,
+        unproject_depths=lambda x, y, depths, correction: (0.0, 0.0, 0.0),
+    )
+
+    coords = GLWidget.get_world_coords(widget, 10, 20)  # type: ignore
+
+    # the index is built in the background, the cursor must not wait for it
+    assert coords == ((1.0, 2.0, 3.0) if has_spatial_index else (0.0, 0.0, 0.0))
+    assert len(picks) == int(has_spatial_index)
+
+
+@pytest.mark.parametrize("has_spatial_index", [True, False])
+def test_pick_point_id_waits_for_no_index(has_spatial_index: bool) -> None:
+    from labelCloud.io.labels.config import LabelConfig  # noqa: F401 (before view)
+    from labelCloud.view.viewer import GLWidget
+
+    widget = SimpleNamespace(
+        pcd_manager=SimpleNamespace(
+            pointcloud=SimpleNamespace(
+                has_spatial_index=has_spatial_index, is_uploaded=False
+            )
+        ),
+        point_id_buffer=SimpleNamespace(is_ready=True),
+        pick_point_along_ray=lambda x, y: 7,
+    )
+
+    point_id = GLWidget.pick_point_id(widget, 10, 20)  # type: ignore
+
+    # still uploading and no index yet, the depth readback is used instead
+    assert point_id == (7 if has_spatial_index else None)
@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+from labelCloud.control.controller import Controller
+from labelCloud.model import BBox
+from labelCloud.utils import oglhelper
+from labelCloud.utils.camera import Camera
+from PyQt5.QtCore import QPoint
+
+
+@pytest.fixture
+def controller(monkeypatch) -> Controller:
+    monkeypatch.setattr(oglhelper, "DEVICE_PIXEL_RATIO", 1.0)
+    camera = Camera(fov=45.0, near=0.1, far=300)
+    camera.set_viewport(800, 600)
+    camera.set_pose((0, 0, -10), (0, 0, 0), (0, 0, 0))
+    controller = Controller()
+    controller.view = SimpleNamespace(gl_widget=SimpleNamespace(camera=camera))  # type: ignore
+    controller.curr_cursor_pos = QPoint(400, 300)
+    return controller
+
+
+def test_hovered_side_is_cached_while_nothing_changes(controller: Controller) -> None:
+    bbox = BBox(0, 0, 0, length=2, width=2, height=2)
+
+    for _ in range(10):
+        assert controller.get_hovered_side(bbox) == "top"
+    assert (controller.hover_recomputes, controller.hover_hits) == (1, 9)
+
+
+def test_hovered_side_is_recomputed_on_changes(controller: Controller) -> None:
+    bbox = BBox(0, 0, 0, length=2, width=2, height=2)
+    controller.get_hovered_side(bbox)
+
+    controller.curr_cursor_pos = QPoint(0, 0)  # cursor moved away from the box
+    assert controller.get_hovered_side(bbox) is None
+
+    bbox.set_dimensions(30, 30, 2)  # box grew below the cursor
+    assert controller.get_hovered_side(bbox) == "top"
+
+    controller.view.gl_widget.camera.set_pose((0, 0, -10), (0, 0, 45), (0, 0, 0))
+    assert controller.get_hovered_side(bbox) == "top"
+    assert (controller.hover_recomputes, controller.hover_hits) == (4, 0)
+
+
+def test_camera_is_moved_before_hovering(controller: Controller, monkeypatch) -> None:
+    camera = controller.view.gl_widget.camera
+    versions = []
+    controller.view.gl_widget.update_camera_pose = lambda: camera.set_pose(  # type: ignore
+        (0, 0, -10), (0, 0, 45), (0, 0, 0)
+    )
+    controller.view.gl_widget.updateGL = lambda: None  # type: ignore
+    monkeypatch.setattr(controller, "set_crosshair", lambda: None)
+    monkeypatch.setattr(
+        controller, "set_selected_side", lambda: versions.append(camera.version)
+    )
+    version = camera.version
+
+    # e.g. after zooming with the wheel, before the next frame is drawn
+    controller.loop_gui()
+
+    assert versions == [version + 1]
@@ -0,0 +1,55 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from labelCloud.definitions import LabelingMode
+from labelCloud.io.labels.config import LabelConfig
+from labelCloud.model import PointCloud
+from labelCloud.utils.shaders import get_palette_texture_data
+
+
+@pytest.fixture
+def pointcloud(monkeypatch) -> PointCloud:
+    monkeypatch.setattr(LabelConfig(), "type", LabelingMode.SEMANTIC_SEGMENTATION)
+    points = np.random.uniform(-10, 10, size=(1000, 3)).astype(np.float32)
+    colors = np.random.uniform(0, 1, size=(1000, 3)).astype(np.float32)
+    labels = np.zeros(1000, dtype=np.int8)
+    return PointCloud(Path("scan.bin"), points, colors, labels, write_buffer=False)
+
+
+def palette_colors(pointcloud: PointCloud, indices=slice(None)) -> np.ndarray:
+    palette = get_palette_texture_data(LabelConfig().class_colors_key)[0]
+    return palette[pointcloud.get_class_ids(indices)]
+
+
+def test_relabeled_points_get_class_color(pointcloud: PointCloud) -> None:
+    new_class = LabelConfig().classes[1]
+    indices = np.arange(100, 200)
+
+    pointcloud.labels[indices] = new_class.id  # type: ignore
+
+    assert np.allclose(palette_colors(pointcloud, indices), new_class.color[0:3])
+    assert np.allclose(
+        palette_colors(pointcloud, slice(0, 100)), LabelConfig().classes[0].color[0:3]
+    )
+
+
+def test_palette_follows_class_color(pointcloud: PointCloud, monkeypatch) -> None:
+    key = LabelConfig().class_colors_key
+
+    monkeypatch.setattr(LabelConfig().classes[0], "color", (0.1, 0.2, 0.3))
+
+    assert LabelConfig().class_colors_key != key
+    assert np.allclose(palette_colors(pointcloud), (0.1, 0.2, 0.3))
+
+
+def test_class_ids_match_palette(pointcloud: PointCloud) -> None:
+    label_config = LabelConfig()
+    pointcloud.labels[:10] = label_config.classes[-1].id  # type: ignore
+
+    class_ids = pointcloud.get_class_ids()
+    palette = get_palette_texture_data(label_config.class_colors_key)[0]
+
+    assert class_ids.dtype == np.uint8
+    class_colors = label_config.color_map[label_config.class_order[pointcloud.labels]]
+    assert np.allclose(palette[class_ids], class_colors)
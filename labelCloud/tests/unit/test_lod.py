@@ -0,0 +1,81 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from labelCloud.control.config_manager import config
+from labelCloud.io.labels.config import LabelConfig  # noqa: F401 (before model)
+from labelCloud.model import PointCloud
+from labelCloud.utils.lod import get_highest_bits, get_lod_order
+from labelCloud.utils.morton import get_morton_codes
+
+
+@pytest.fixture
+def points() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 10, (20000, 3)).astype(np.float32)
+
+
+@pytest.fixture
+def level_of_detail():
+    previous = config.get("POINTCLOUD", "level_of_detail")
+    config.set("POINTCLOUD", "level_of_detail", "True")
+    yield
+    config.set("POINTCLOUD", "level_of_detail", previous)
+
+
+def test_highest_bits() -> None:
+    values = np.array([0, 1, 6, 2**53 - 1, 2**53 + 1, 2**62], dtype=np.uint64)
+
+    assert get_highest_bits(values).tolist() == [-1, 0, 2, 52, 53, 62]
+
+
+def test_levels_are_voxel_subsamples(points: np.ndarray) -> None:
+    order, starts, level_ends = get_lod_order(points, bits=10)
+    codes = get_morton_codes(points, bits=10)[order]
+
+    assert np.array_equal(np.sort(order), np.arange(len(points)))
+    assert starts.tolist() == [0]
+    level_ends = level_ends[0]
+    assert level_ends[-1] == len(points)
+    for depth in range(1, 11):
+        voxels = codes >> np.uint64(3 * (10 - depth))
+        level = voxels[: level_ends[depth]]
+        # one point per voxel, and every occupied voxel is in the level
+        assert len(np.unique(level)) == len(level)
+        assert np.array_equal(np.unique(level), np.unique(voxels))
+
+
+def test_chunks_are_sorted_by_level(points: np.ndarray) -> None:
+    order, starts, level_ends = get_lod_order(points, bits=10, max_chunk_points=1000)
+    codes = get_morton_codes(points, bits=10)[order]
+
+    assert len(starts) > 20
+    assert np.array_equal(np.diff(starts, append=len(points)), level_ends[:, -1])
+    for start, ends in zip(starts, level_ends):
+        chunk = codes[start : start + ends[-1]]
+        for depth in range(1, 11):
+            voxels = chunk >> np.uint64(3 * (10 - depth))
+            level = voxels[: ends[depth]]
+            assert len(np.unique(level)) == len(level)
+            assert np.array_equal(np.unique(level), np.unique(voxels))
+
+
+def test_pointcloud_draws_coarse_prefix(
+    points: np.ndarray, tmppath: Path, level_of_detail
+) -> None:
+    path = tmppath / "scan.bin"
+    scan = np.hstack([points, np.arange(len(points), dtype=np.float32)[:, None]])
+    scan.tofile(path)
+
+    pointcloud = PointCloud.from_file(path, write_buffer=False)
+
+    assert pointcloud.get_no_of_drawn_points() == len(points)
+    coarse = pointcloud.get_no_of_drawn_points(1000)
+    assert 0 < coarse <= 1000
+    # the prefix is spread over the whole point cloud
+    drawn = pointcloud.points[:coarse]
+    extents = np.ptp(points, axis=0)
+    assert np.all(np.ptp(drawn, axis=0) > 0.8 * extents)
+
+    pointcloud.to_file()
+    assert np.array_equal(np.fromfile(path, dtype=np.float32), scan.ravel())
@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from labelCloud.control.config_manager import config
+from labelCloud.definitions import LabelingMode
+from labelCloud.io.labels.config import LabelConfig
+from labelCloud.model import PointCloud
+from labelCloud.model.point_cloud import LABEL_UPLOAD_MAX_GAP, get_index_runs
+from labelCloud.utils.box_labeling import label_points_in_bboxes
+from labelCloud.utils.math3d import get_bboxes_vertices
+from labelCloud.utils.morton import (
+    get_block_bounds,
+    get_morton_codes,
+    get_morton_order,
+    invert_permutation,
+)
+
+
+@pytest.fixture
+def scan() -> np.ndarray:
+    """Scan-line ordered points with intensities."""
+    x, y = np.meshgrid(np.linspace(-20, 20, 200), np.linspace(-20, 20, 200))
+    z = np.sin(x / 3) + np.cos(y / 5)
+    intensities = np.arange(x.size) % 256
+    return np.stack([x.ravel(), y.ravel(), z.ravel(), intensities], axis=1).astype(
+        np.float32
+    )
+
+
+@pytest.fixture
+def morton_order(tmppath: Path, monkeypatch):
+    monkeypatch.setattr(LabelConfig(), "type", LabelingMode.SEMANTIC_SEGMENTATION)
+    previous = [
+        config.get("POINTCLOUD", "morton_order"),
+        config.get("FILE", "segmentation_folder"),
+    ]
+    config.set("POINTCLOUD", "morton_order", "True")
+    config.set("FILE", "segmentation_folder", str(tmppath / "segmentation"))
+    yield
+    config.set("POINTCLOUD", "morton_order", previous[0])
+    config.set("FILE", "segmentation_folder", previous[1])
+
+
+def test_codes_interleave_axes() -> None:
+    points = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 1]])
+
+    codes = get_morton_codes(points, bits=1)
+
+    assert codes.tolist() == [0, 1, 2, 4, 7]
+
+
+def test_order_is_permutation(scan: np.ndarray) -> None:
+    order = get_morton_order(scan[:, :3])
+
+    assert np.array_equal(np.sort(order), np.arange(len(scan)))
+    assert np.array_equal(order[invert_permutation(order)], np.arange(len(scan)))
+
+
+def test_box_selection_has_fewer_runs(scan: np.ndarray) -> None:
+    # e.g. merged scans, whose points are not ordered by scan lines
+    points = scan[np.random.default_rng(0).permutation(len(scan)), :3]
+    box = get_bboxes_vertices([(3, -4, 0)], [(6, 6, 6)], [(0, 0, 0)])
+    ordered_points = points[get_morton_order(points)]
+
+    runs = []
+    for pts in [points, ordered_points]:
+        labels = np.zeros(len(pts), dtype=np.int8)
+        changed = label_points_in_bboxes(pts, box, [1], labels).changed
+        runs.append(len(get_index_runs(changed, LABEL_UPLOAD_MAX_GAP)))
+
+    assert runs[1] * 10 < runs[0]
+
+
+def test_index_runs_join_small_gaps() -> None:
+    indices = np.array([3, 4, 5, 8, 9, 30, 100])
+
+    assert get_index_runs(indices) == [(3, 6), (8, 10), (30, 31), (100, 101)]
+    assert get_index_runs(indices, max_gap=2) == [(3, 10), (30, 31), (100, 101)]
+    assert get_index_runs(np.array([], dtype=np.int64)) == []
+
+
+def test_blocks_skip_points_outside(scan: np.ndarray) -> None:
+    points = scan[:, :3]
+    points = points[get_morton_order(points)]
+    box = get_bboxes_vertices([(3, -4, 0)], [(6, 6, 6)], [(0, 0, 0)])
+
+    expected = np.zeros(len(points), dtype=np.int8)
+    label_points_in_bboxes(points, box, [1], expected)
+    labels = np.zeros(len(points), dtype=np.int8)
+    label_points_in_bboxes(
+        points, box, [1], labels, block_bounds=get_block_bounds(points, 256)
+    )
+
+    assert np.array_equal(labels, expected)
+
+
+def test_reordered_pointcloud_is_written_in_file_order(
+    scan: np.ndarray, tmppath: Path, morton_order
+) -> None:
+    path = tmppath / "scan.bin"
+    scan.tofile(path)
+    class_ids = np.array([c.id for c in LabelConfig().classes], dtype=np.int8)
+    labels = class_ids[np.arange(len(scan)) % len(class_ids)]
+    (tmppath / "segmentation").mkdir()
+    labels.tofile(tmppath / "segmentation" / "scan.bin")
+
+    pointcloud = PointCloud.from_file(path, write_buffer=False)
+    assert pointcloud.is_reordered
+    assert not np.array_equal(pointcloud.points, scan[:, :3])
+    ids = pointcloud.get_original_ids(np.arange(10))
+    assert np.array_equal(pointcloud.points[:10], scan[ids, :3])
+    assert np.array_equal(pointcloud.attributes["intensity"][:10], scan[ids, 3])
+    assert np.array_equal(pointcloud.labels[:10], labels[ids])
+
+    pointcloud.to_file()
+    pointcloud.save_segmentation_labels()
+
+    assert np.array_equal(np.fromfile(path, dtype=np.float32), scan.ravel())
+    saved_labels = np.fromfile(tmppath / "segmentation" / "scan.bin", dtype=np.int8)
+    assert np.array_equal(saved_labels, labels)
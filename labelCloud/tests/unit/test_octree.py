@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+from labelCloud.utils.camera import Camera
+from labelCloud.utils.lod import get_lod_order
+from labelCloud.utils.morton import get_morton_codes
+from labelCloud.utils.octree import (
+    PointChunks,
+    clip_draw_ranges,
+    get_visible_boxes,
+    split_into_chunks,
+)
+
+
+@pytest.fixture
+def points() -> np.ndarray:
+    """A flat 100 x 100 m area."""
+    rng = np.random.default_rng(0)
+    return rng.uniform((0, 0, 0), (100, 100, 2), (200000, 3)).astype(np.float32)
+
+
+@pytest.fixture
+def chunks(points: np.ndarray):
+    order, starts, level_ends = get_lod_order(points, max_chunk_points=5000)
+    return PointChunks(points[order], starts, level_ends)
+
+
+@pytest.fixture
+def camera() -> Camera:
+    """Looking down onto the corner at (10, 10)."""
+    camera = Camera(45, 0.1, 1000)
+    camera.set_viewport(800, 600)
+    camera.set_pose((-10, -10, -15), (0, 0, 0), (0, 0, 0))
+    return camera
+
+
+def test_chunks_are_octree_nodes() -> None:
+    codes = np.sort(np.random.default_rng(1).integers(0, 1 << 30, 10000, np.uint64))
+
+    starts = split_into_chunks(codes, 500, bits=10)
+
+    sizes = np.diff(starts, append=len(codes))
+    assert starts[0] == 0 and np.all(sizes <= 500)
+    for start, size in zip(starts, sizes):
+        node = codes[start : start + size]
+        # all codes of a chunk share the prefix of an octree node
+        depth = 10 - (int(node[0] ^ node[-1]).bit_length() + 2) // 3
+        prefix = np.uint64(3 * (10 - depth))
+        assert np.all(node >> prefix == node[0] >> prefix)
+    assert split_into_chunks(codes, 0).tolist() == [0]
+
+
+def test_boxes_outside_of_the_frustum_are_culled(camera: Camera) -> None:
+    mins = np.array([[9, 9, 0], [-200, 9, 0], [9, 9, 20], [0, 0, -5]], dtype=float)
+    maxs = mins + 2
+    maxs[3] = (100, 100, 5)  # contains the whole view
+
+    assert get_visible_boxes(mins, maxs, camera.mvp).tolist() == [
+        True,
+        False,  # left of the view
+        False,  # behind the camera
+        True,
+    ]
+
+
+def test_only_visible_chunks_are_drawn(chunks: PointChunks, camera: Camera) -> None:
+    firsts, counts = chunks.get_draw_ranges(camera)
+
+    assert 0 < len(firsts) < len(chunks) / 4
+    assert counts.sum() < chunks.no_of_points / 4
+    visible = get_visible_boxes(chunks.mins, chunks.maxs, camera.mvp)
+    assert set(firsts.tolist()) == set(chunks.starts[visible].tolist())
+
+
+def test_distant_chunks_draw_fewer_points(chunks: PointChunks) -> None:
+    camera = Camera(45, 0.1, 1000)
+    camera.set_viewport(800, 600)
+    camera.set_pose((-50, -50, -500), (0, 0, 0), (0, 0, 0))  # far above the area
+
+    _, full = chunks.get_draw_ranges(camera)
+    _, reduced = chunks.get_draw_ranges(camera, voxel_pixels=2)
+
+    assert full.sum() == chunks.no_of_points
+    assert reduced.sum() < full.sum() / 2
+
+
+def test_point_budget_limits_all_chunks(chunks: PointChunks) -> None:
+    _, counts = chunks.get_draw_ranges(point_budget=20000)
+
+    assert 0 < counts.sum() <= 20000
+    assert chunks.get_draw_ranges(point_budget=10**9)[1].sum() == chunks.no_of_points
+
+
+def test_draw_ranges_are_clipped_to_uploaded_points() -> None:
+    ranges = (np.array([0, 100, 250], np.int32), np.array([50, 100, 10], np.int32))
+
+    firsts, counts = clip_draw_ranges(ranges, 150)
+
+    assert firsts.tolist() == [0, 100]
+    assert counts.tolist() == [50, 50]
+    assert counts.dtype == np.int32
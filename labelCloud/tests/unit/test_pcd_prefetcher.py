@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+from labelCloud.control.pcd_prefetcher import PointCloudPrefetcher
+
+
+@pytest.fixture
+def pcds(tmppath: Path) -> List[Path]:
+    paths = []
+    for i in range(6):
+        path = tmppath / f"scan_{i}.bin"
+        np.random.uniform(-50, 50, size=(1000, 4)).astype(np.float32).tofile(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def prefetcher() -> PointCloudPrefetcher:
+    prefetcher = PointCloudPrefetcher()
+    prefetcher.depth_next, prefetcher.depth_previous = 2, 1
+    prefetcher.memory_limit = 1 << 30
+    return prefetcher
+
+
+def test_prefetch_neighbours(
+    prefetcher: PointCloudPrefetcher, pcds: List[Path]
+) -> None:
+    prefetcher.prefetch(pcds, current_id=2)
+
+    assert [path in prefetcher for path in pcds] == [0, 1, 0, 1, 1, 0]
+
+    frame = prefetcher.get_frame(pcds[3])
+    assert frame.points.shape == (1000, 3)
+    assert frame.attributes["intensity"].shape == (1000,)
+    assert pcds[3] not in prefetcher
+
+    prefetcher.get_frame(pcds[2])
+    assert (prefetcher.hits, prefetcher.misses) == (1, 1)
+
+    prefetcher.prefetch(pcds, current_id=3)
+    assert [path in prefetcher for path in pcds] == [0, 0, 1, 0, 1, 1]
+
+
+def test_memory_limit(prefetcher: PointCloudPrefetcher, pcds: List[Path]) -> None:
+    prefetcher.memory_limit = 2 * 1000 * 4 * 4  # points and intensities of 2 scans
+    prefetcher.prefetch(pcds, current_id=2)
+    prefetcher._executor.shutdown(wait=True)  # type: ignore
+
+    # the farthest point cloud is evicted first
+    assert [path in prefetcher for path in pcds] == [0, 1, 0, 1, 0, 0]
+    assert prefetcher.memory_usage <= prefetcher.memory_limit
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from labelCloud.control.config_manager import config
+from labelCloud.model import BBox
+from labelCloud.utils import math3d
+from labelCloud.utils.picking import BBoxPicker, BoundingVolumeHierarchy
+
+
+@pytest.fixture
+def bboxes() -> list:
+    rng = np.random.default_rng(0)
+    bboxes = []
+    for center, rotation in zip(
+        rng.uniform(-20, 20, size=(300, 3)), rng.uniform(0, 360, size=300)
+    ):
+        bbox = BBox(*center, length=1.5, width=1, height=0.5)
+        bbox.set_z_rotation(rotation)
+        bboxes.append(bbox)
+    return bboxes
+
+
+@pytest.mark.parametrize(
+    "origin, direction, side",
+    [
+        ((0, 0, 10), (0, 0, -1), "top"),
+        ((0, 0, -10), (0, 0, 1), "bottom"),
+        ((10, 0, 0), (-1, 0, 0), "right"),
+        ((-10, 0, 0), (1, 0, 0), "left"),
+        ((0, 10, 0), (0, -1, 0), "front"),
+        ((0, -10, 0), (0, 1, 0), "back"),
+    ],
+)
+def test_ray_hits_side_of_box(origin, direction, side) -> None:
+    bbox = BBox(0, 0, 0, length=2, width=2, height=2)
+    distances, sides = math3d.intersect_ray_with_bboxes(
+        origin, direction, bbox.get_pose()[None], [bbox.get_dimensions()]
+    )
+    assert distances.tolist() == [9]
+    assert sides.tolist() == [side]
+
+
+def test_ray_misses_rotated_box() -> None:
+    bbox = BBox(0, 0, 0, length=4, width=0.5, height=0.5)
+    bbox.set_z_rotation(90)  # the long side points along y now
+    distances, _ = math3d.intersect_ray_with_bboxes(
+        (1.5, 0, 10), (0, 0, -1), bbox.get_pose()[None], [bbox.get_dimensions()]
+    )
+    assert np.isinf(distances[0])
+
+
+def test_bvh_finds_all_hit_boxes(bboxes: list, monkeypatch) -> None:
+    vertices = np.array([bbox.get_vertices() for bbox in bboxes])
+    bvh = BoundingVolumeHierarchy(vertices.min(axis=1), vertices.max(axis=1))
+    picker = BBoxPicker()
+    rng = np.random.default_rng(1)
+    monkeypatch.setitem(config["LABEL"], "picking_bvh_threshold", "100000")
+
+    hits = 0
+    for origin, target in zip(
+        rng.uniform(-30, 30, size=(50, 3)), rng.uniform(-20, 20, size=(50, 3))
+    ):
+        direction = target - origin
+        distances, _ = picker.intersect(bboxes, origin, direction)
+        hit = np.flatnonzero(np.isfinite(distances))
+        assert set(hit) <= set(bvh.query_ray(origin, direction))
+        hits += len(hit)
+    assert hits > 0
+
+
+def test_picker_with_bvh_matches_brute_force(bboxes: list, monkeypatch) -> None:
+    origin, direction = np.array([-30.0, -30, 0]), np.array([60.0, 61, 0.5])
+    brute_force = BBoxPicker()
+    monkeypatch.setitem(config["LABEL"], "picking_bvh_threshold", "100000")
+    expected = brute_force.intersect(bboxes, origin, direction)
+
+    with_bvh = BBoxPicker()
+    monkeypatch.setitem(config["LABEL"], "picking_bvh_threshold", "10")
+    distances, sides = with_bvh.intersect(bboxes, origin, direction)
+    assert with_bvh.bvh is not None
+    np.testing.assert_array_equal(distances, expected[0])
+    hit = np.isfinite(distances)
+    np.testing.assert_array_equal(sides[hit], expected[1][hit])
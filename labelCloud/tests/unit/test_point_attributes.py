@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from labelCloud.model.point_attributes import PointAttributes
+
+
+def test_add_keeps_arrays_without_copy() -> None:
+    intensity = np.random.uniform(0, 1, 100).astype(np.float32)
+    attributes = PointAttributes(100, {"intensity": intensity})
+
+    assert attributes.names == ("intensity",)
+    assert "intensity" in attributes
+    assert attributes["intensity"] is intensity
+
+
+def test_add_rejects_wrong_length() -> None:
+    attributes = PointAttributes(100)
+    with pytest.raises(ValueError):
+        attributes.add("ring", np.zeros(99, dtype=np.uint16))
+
+
+@pytest.mark.parametrize(
+    "indices", [np.arange(100) % 3 == 0, np.arange(0, 100, 3)], ids=["mask", "index"]
+)
+def test_filter(indices: np.ndarray) -> None:
+    ring = np.arange(100, dtype=np.uint16)
+    normals = np.random.uniform(-1, 1, size=(100, 3))
+    attributes = PointAttributes(100, {"ring": ring, "normal": normals})
+
+    filtered = attributes.filter(indices)
+
+    assert filtered.num_points == 34
+    assert np.array_equal(filtered["ring"], ring[::3])
+    assert np.array_equal(filtered["normal"], normals[::3])
@@ -0,0 +1,94 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from labelCloud.view.point_id_buffer import decode_point_id, encode_point_ids
+
+# Renders the ids with Mesa in a headless EGL context. PyOpenGL selects its platform
+# on import, so this runs in a separate interpreter.
+HEADLESS_PICKING = """
+import ctypes, json, sys
+from types import SimpleNamespace
+
+from OpenGL import EGL
+
+display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+try:
+    EGL.eglInitialize(display, None, None)
+    config, count = EGL.EGLConfig(), EGL.EGLint()
+    attributes = (EGL.EGLint * 3)(EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+    EGL.eglChooseConfig(display, attributes, ctypes.pointer(config), 1, ctypes.pointer(count))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT, None)
+    assert EGL.eglMakeCurrent(display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, context)
+except Exception:
+    sys.exit(77)
+
+import numpy as np
+import OpenGL.GL as GL
+from labelCloud.utils.camera import Camera
+from labelCloud.view.point_id_buffer import PointIdBuffer
+
+points = np.full((100000, 3), 1000, dtype=np.float32)  # out of view
+points[70000] = (0, 0, 0)
+points[99999] = (0, 0, 0.5)  # in front of point 70000
+points[12345] = (0.5, 0.3, 0)
+position_vbo = GL.glGenBuffers(1)
+GL.glBindBuffer(GL.GL_ARRAY_BUFFER, position_vbo)
+GL.glBufferData(GL.GL_ARRAY_BUFFER, points.nbytes, points, GL.GL_STATIC_DRAW)
+pointcloud = SimpleNamespace(
+    position_vbo=position_vbo,
+    point_size=3.0,
+    get_no_of_points=lambda: len(points),
+    get_point_attenuation=lambda scaled: (1.0, 0.0, 0.0),
+)
+
+camera = Camera(45, 0.1, 100)
+camera.set_viewport(200, 200)
+camera.set_pose((0, 0, -3), (0, 0, 0), (0, 0, 0))
+
+buffer = PointIdBuffer()
+buffer.init_gl()
+picks = {}
+for name, point in [("center", points[70000]), ("side", points[12345])]:
+    buffer.render(pointcloud, camera, scaled=False)
+    x, y, _ = camera.project(point)
+    picks[name] = buffer.pick(int(x), int(y))
+picks["background"] = buffer.pick(10, 10)
+picks["outside"] = buffer.pick(500, 10)
+print(json.dumps({"picks": picks, "renders": buffer.renders, "reads": buffer.reads}))
+"""
+
+
+def test_point_ids_roundtrip_through_rgba() -> None:
+    rgba = encode_point_ids(70000).reshape(-1, 4)
+    assert decode_point_id(rgba[0].tobytes()) == 0
+    assert decode_point_id(rgba[69999].tobytes()) == 69999
+    assert decode_point_id(bytes(4)) is None
+
+
+def test_picks_visible_point_headless() -> None:
+    env = dict(os.environ, PYOPENGL_PLATFORM="egl", EGL_PLATFORM="surfaceless")
+    result = subprocess.run(
+        [sys.executable, "-c", HEADLESS_PICKING],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode == 77:
+        pytest.skip("No headless EGL context available.")
+    assert result.returncode == 0, result.stderr
+    output = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert output["picks"] == {
+        "center": 99999,  # occluded point 70000 is not picked
+        "side": 12345,
+        "background": None,
+        "outside": None,
+    }
+    assert output["renders"] == 1  # the view did not change between the picks
+    assert output["reads"] == 3
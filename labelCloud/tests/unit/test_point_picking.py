@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from labelCloud.io.labels.config import LabelConfig  # noqa: F401 (before model)
+from labelCloud.labeling_strategies import PickingPointStrategy
+
+
+class IndexBuilding(object):
+    """Point cloud whose spatial index is still built in the background."""
+
+    has_spatial_index = False
+
+    def __init__(self) -> None:
+        self.points = np.zeros((4, 3))
+        self.waited = False
+
+    @property
+    def spatial_index(self):
+        self.waited = True
+        return SimpleNamespace(query_knn=lambda point, k: (np.array([3]), None))
+
+
+@pytest.fixture
+def pointcloud() -> IndexBuilding:
+    return IndexBuilding()
+
+
+@pytest.fixture
+def strategy(pointcloud: IndexBuilding) -> PickingPointStrategy:
+    strategy = PickingPointStrategy.__new__(PickingPointStrategy)  # without a GUI
+    strategy.pointcloud = pointcloud  # type: ignore
+    strategy.points_registered = 0
+    return strategy
+
+
+def test_cursor_doesnt_wait_for_index(
+    strategy: PickingPointStrategy, pointcloud: IndexBuilding
+) -> None:
+    strategy.register_tmp_point((1.0, 2.0, 3.0))
+
+    assert strategy.tmp_idx is None
+    assert not pointcloud.waited
+
+
+def test_click_waits_for_index(
+    strategy: PickingPointStrategy, pointcloud: IndexBuilding
+) -> None:
+    strategy.tmp_p1 = (1.0, 2.0, 3.0)
+
+    strategy.register_point((1.0, 2.0, 3.0))
+
+    assert pointcloud.waited
+    assert strategy.point_idx == 3
@@ -0,0 +1,66 @@
+from itertools import count
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+from labelCloud.control.config_manager import config
+from labelCloud.io.labels.config import LabelConfig  # noqa: F401 (before model)
+from labelCloud.model import PointCloud, point_cloud
+
+
+@pytest.fixture
+def uploads(monkeypatch) -> List[tuple]:
+    """Record the buffer uploads (buffer, offset, size) instead of calling OpenGL."""
+    uploads: List[tuple] = []
+    bound = [0]
+    ids = count(1)
+    gl = point_cloud.GL
+    monkeypatch.setattr(
+        gl,
+        "glGenBuffers",
+        lambda n: [next(ids) for _ in range(n)] if n > 1 else next(ids),
+    )
+    monkeypatch.setattr(
+        gl, "glBindBuffer", lambda target, vbo: bound.__setitem__(0, vbo)
+    )
+    monkeypatch.setattr(gl, "glBufferData", lambda target, size, data, usage: None)
+    monkeypatch.setattr(
+        gl,
+        "glBufferSubData",
+        lambda target, offset, size, data: uploads.append((bound[0], offset, size)),
+    )
+    return uploads
+
+
+@pytest.fixture
+def upload_chunk_points():
+    previous = config.get("POINTCLOUD", "upload_chunk_points")
+    config.set("POINTCLOUD", "upload_chunk_points", "400")
+    yield
+    config.set("POINTCLOUD", "upload_chunk_points", previous)
+
+
+def test_points_are_uploaded_in_chunks(
+    uploads: List[tuple], upload_chunk_points
+) -> None:
+    scan = np.random.default_rng(0).random((1000, 4), dtype=np.float32)
+    pointcloud = PointCloud(Path("scan.bin"), scan[:, :3], write_buffer=False)
+    pointcloud.create_buffers()
+
+    assert pointcloud.uploaded_points == 400
+    assert pointcloud.upload_progress == 0.4
+    assert not pointcloud.is_uploaded
+    assert uploads == [(1, 0, 400 * 12), (2, 0, 400 * 12)]  # positions and colors
+
+    uploads.clear()
+    pointcloud.upload_next_chunk()
+    pointcloud.upload_next_chunk()
+    assert uploads[0] == (1, 400 * 12, 400 * 12)
+    assert uploads[-1] == (2, 800 * 12, 200 * 12)
+    assert pointcloud.is_uploaded
+    assert pointcloud.upload_progress == 1.0
+
+    uploads.clear()
+    pointcloud.upload_next_chunk()
+    assert uploads == []
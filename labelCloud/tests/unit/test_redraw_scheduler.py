@@ -0,0 +1,27 @@
+from PyQt5.QtCore import QEvent
+from labelCloud.view.redraw_scheduler import RedrawScheduler
+
+
+def test_requests_are_coalesced(qtbot) -> None:
+    redraws = []
+    scheduler = RedrawScheduler(lambda: redraws.append(True))
+
+    for _ in range(10):
+        scheduler.request()
+    assert scheduler.dirty
+    qtbot.waitUntil(lambda: len(redraws) == 1)
+
+    qtbot.wait(int(3 * scheduler.frame_interval))
+    assert len(redraws) == 1
+    assert not scheduler.dirty
+    assert (scheduler.redraws, scheduler.requests) == (1, 10)
+
+
+def test_only_input_events_request_redraws(qtbot) -> None:
+    scheduler = RedrawScheduler(lambda: None)
+
+    scheduler.request_for_event(QEvent(QEvent.Timer))
+    assert not scheduler.dirty
+
+    scheduler.request_for_event(QEvent(QEvent.MouseMove))
+    assert scheduler.dirty
@@ -0,0 +1,43 @@
+import gc
+import weakref
+from pathlib import Path
+
+import numpy as np
+import pytest
+from labelCloud.control.config_manager import config
+from labelCloud.control.pcd_manager import PointCloudManger
+from labelCloud.io.pointclouds.numpy import is_memory_mapped
+from labelCloud.model import PointCloud
+
+
+@pytest.fixture
+def memory_map():
+    previous = config.get("POINTCLOUD", "memory_map")
+    config.set("POINTCLOUD", "memory_map", "True")
+    yield
+    config.set("POINTCLOUD", "memory_map", previous)
+
+
+def test_rotated_pointcloud_does_not_keep_the_mapped_file(
+    tmppath: Path, memory_map, monkeypatch
+) -> None:
+    monkeypatch.setattr(PointCloud, "create_buffers", lambda self: None)
+    scan = np.random.uniform(-50, 50, size=(1000, 4)).astype(np.float32)
+    path = tmppath / "scan.bin"
+    scan.tofile(path)
+    manager = PointCloudManger()
+    manager.pcd_folder = tmppath
+    manager.pcds, manager.current_id = [path], 0
+    manager.set_pointcloud(PointCloud.from_file(path, write_buffer=False))
+    assert is_memory_mapped(manager.pointcloud.attributes["intensity"])
+    mapped = weakref.ref(manager.pointcloud)
+
+    manager.rotate_pointcloud([0, 0, 1], np.pi / 2, (0, 0, 0))
+    manager.pointcloud.release_spatial_index()
+    gc.collect()
+
+    assert mapped() is None
+    assert not is_memory_mapped(manager.pointcloud.attributes["intensity"])
+    written = np.fromfile(path, dtype=np.float32).reshape(-1, 4)
+    assert np.array_equal(written[:, 3], scan[:, 3])
+    np.testing.assert_allclose(written[:, 0], -scan[:, 1], atol=1e-4)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from labelCloud.utils import oglhelper
+from labelCloud.utils.camera import Camera
+from labelCloud.utils.spatial_index import SpatialIndex
+
+
+@pytest.fixture
+def points() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    ground = np.column_stack(
+        [rng.uniform(-30, 30, (20000, 2)), rng.normal(0, 0.05, 20000)]
+    )
+    objects = rng.normal(0, 1, (5000, 3)) + rng.uniform(-20, 20, (5000, 1))
+    return np.concatenate([ground, objects]).astype(np.float32)
+
+
+@pytest.fixture
+def index(points) -> SpatialIndex:
+    return SpatialIndex(points)
+
+
+def test_cells_contain_every_point_once(index, points) -> None:
+    assert sorted(index.order.tolist()) == list(range(len(points)))
+    assert index.cell_starts[-1] == len(points)
+
+
+@pytest.mark.parametrize("k", [1, 8])
+def test_knn_matches_brute_force(index, points, k) -> None:
+    for query in [(0, 0, 0), (12.3, -4.5, 0.2), (100, 100, 100), (-29, 29, -3)]:
+        ids, distances = index.query_knn(query, k)
+        expected = np.sort(np.linalg.norm(points - np.array(query), axis=1))[:k]
+        np.testing.assert_allclose(distances, expected, rtol=1e-6)
+        np.testing.assert_allclose(
+            np.linalg.norm(points[ids] - np.array(query), axis=1), distances
+        )
+
+
+def test_radius_matches_brute_force(index, points) -> None:
+    query = np.array([3.0, -2.0, 0.0])
+    ids = index.query_radius(query, 1.5)
+    expected = np.flatnonzero(np.linalg.norm(points - query, axis=1) <= 1.5)
+    assert sorted(ids.tolist()) == expected.tolist()
+
+
+@pytest.mark.parametrize("radius_slope", [0.0, 0.01])
+def test_ray_matches_brute_force(index, points, radius_slope) -> None:
+    origin, direction = np.array([-40.0, -35.0, 20.0]), np.array([80.0, 70.0, -25.0])
+    ids, t = index.query_ray(origin, direction, 0.3, radius_slope)
+
+    unit = direction / np.linalg.norm(direction)
+    along = (points - origin) @ unit
+    across = np.linalg.norm((points - origin) - along[:, None] * unit, axis=1)
+    expected = np.flatnonzero(
+        (along >= 0)
+        & (along <= np.linalg.norm(direction))
+        & (across <= 0.3 + radius_slope * along)
+    )
+    assert sorted(ids.tolist()) == expected.tolist()
+    assert np.all(np.diff(t) >= 0)
+
+
+def test_ray_missing_the_points(index) -> None:
+    ids, t = index.query_ray((0, 0, 100), (0, 10, 0), 0.5)
+    assert len(ids) == 0 and len(t) == 0
+
+
+@pytest.mark.parametrize("radius_slope", [0.0, 0.01])
+def test_first_ray_hit_is_closest_in_cone(index, radius_slope) -> None:
+    rng = np.random.default_rng(1)
+    for origin, target in zip(
+        rng.uniform(-40, 40, (20, 3)) + (0, 0, 30), rng.uniform(-30, 30, (20, 3))
+    ):
+        direction = (target - origin) * 3
+        ids, t = index.query_ray(origin, direction, 0.2, radius_slope)
+        hit = index.query_ray_first(origin, direction, 0.2, radius_slope)
+        if len(ids):
+            assert hit == (ids[0], pytest.approx(t[0]))
+        else:
+            assert hit is None
+
+
+def test_ray_picked_point_from_screen(index, points, monkeypatch) -> None:
+    monkeypatch.setattr(oglhelper, "DEVICE_PIXEL_RATIO", 1.0)
+    camera = Camera(45, 0.1, 300)
+    camera.set_viewport(800, 600)
+    camera.set_pose((0, 0, -40), (-60, 0, 0), (0, 0, 0))
+
+    x, y, _ = camera.project(points[12345])
+    # a few pixels next to the point, where the depth buffer might be empty
+    point_id = oglhelper.get_ray_picked_point(x + 2, 600 - y, index, camera, 6)
+    assert point_id is not None
+    distance_on_screen = np.linalg.norm(camera.project(points[point_id])[:2] - (x, y))
+    assert distance_on_screen <= 2 + 6 * 1.3  # the cone is wider off the image center
+    assert camera.project(points[point_id])[2] <= camera.project(points[12345])[2]
@@ -0,0 +1,125 @@
+"""
+Assigns class ids to the points inside many bounding boxes at once.
+Each box only tests the points in the cells of the spatial index (or the blocks of
+spatially reordered points) that overlap its axis-aligned bounds. The oriented test
+runs in fixed-size float32 chunks and the boxes are distributed over a thread pool
+(NumPy releases the GIL for the computation).
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from . import math3d
+from .morton import BlockBounds, get_points_in_overlapping_blocks
+
+if TYPE_CHECKING:
+    from .spatial_index import SpatialIndex
+
+LABELING_CHUNK_SIZE = 1 << 18  # points tested at once, bounds the temporary memory
+
+
+class BoxLabelingResult(NamedTuple):
+    labels: npt.NDArray  # class id of each point
+    counts: npt.NDArray[np.int64]  # number of points inside each box
+    changed: npt.NDArray[np.int64]  # sorted ids of the points inside any box
+
+
+def get_points_inside_bbox(
+    points: npt.NDArray,
+    candidates: Optional[npt.NDArray],
+    origin: npt.NDArray,
+    axes: npt.NDArray,
+    chunk_size: int = LABELING_CHUNK_SIZE,
+) -> npt.NDArray[np.int64]:
+    """Ids of the points (of the candidates, otherwise all points) inside the box.
+
+    Uses the same test as `math3d.are_points_inside_bboxes`, after discarding the
+    points outside of the axis-aligned bounds of the box.
+    """
+    mins = origin + np.minimum(axes, 0).sum(axis=0)
+    maxs = origin + np.maximum(axes, 0).sum(axis=0)
+    origin32, axes32 = origin.astype(np.float32), axes.astype(np.float32)
+    squared_lengths = np.sum(axes32**2, axis=1)
+
+    no_of_candidates = len(points) if candidates is None else len(candidates)
+    inside = []
+    for start in range(0, no_of_candidates, chunk_size):
+        if candidates is None:
+            ids = np.arange(start, min(start + chunk_size, no_of_candidates))
+            chunk = points[start : start + chunk_size].astype(np.float32, copy=False)
+        else:
+            ids = candidates[start : start + chunk_size]
+            chunk = points[ids].astype(np.float32, copy=False)
+
+        in_bounds = np.all((chunk >= mins) & (chunk <= maxs), axis=1)
+        ids, chunk = ids[in_bounds], chunk[in_bounds]
+        projections = (chunk - origin32) @ axes32.T
+        in_box = np.all((projections > 0) & (projections < squared_lengths), axis=1)
+        inside.append(ids[in_box])
+    if not inside:
+        return np.array([], dtype=np.int64)
+    return np.concatenate(inside).astype(np.int64, copy=False)
+
+
+def label_points_in_bboxes(
+    points: npt.NDArray,
+    vertices: npt.ArrayLike,
+    class_ids: npt.ArrayLike,
+    labels: npt.NDArray,
+    spatial_index: Optional["SpatialIndex"] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = LABELING_CHUNK_SIZE,
+    block_bounds: Optional[BlockBounds] = None,
+) -> BoxLabelingResult:
+    """Set the labels of the points inside the boxes (N, 8, 3) to their class ids.
+
+    The labels are changed in place. Points inside several boxes get the class id of
+    the last one, as if the boxes were assigned one after the other.
+    Without a spatial index, every box tests all points of the blocks of consecutive
+    points (if given) that overlap its bounds.
+    """
+    start_time = time.perf_counter()
+    origins, axes = math3d.get_bboxes_axes(np.asarray(vertices, dtype=np.float64))
+    class_ids = np.asarray(class_ids)
+    mins = origins + np.minimum(axes, 0).sum(axis=1)
+    maxs = origins + np.maximum(axes, 0).sum(axis=1)
+
+    def find_inside(box: int) -> npt.NDArray[np.int64]:
+        candidates = None
+        if spatial_index is not None:
+            candidates = spatial_index.query_aabb_candidates(mins[box], maxs[box])
+        elif block_bounds is not None:
+            candidates = get_points_in_overlapping_blocks(
+                block_bounds, len(points), mins[box], maxs[box]
+            )
+        return get_points_inside_bbox(
+            points, candidates, origins[box], axes[box], chunk_size
+        )
+
+    workers = workers or os.cpu_count() or 1
+    if len(origins) > 1 and workers > 1:
+        with ThreadPoolExecutor(
+            max_workers=min(workers, len(origins)), thread_name_prefix="box_labeling"
+        ) as executor:
+            inside = list(executor.map(find_inside, range(len(origins))))
+    else:
+        inside = [find_inside(box) for box in range(len(origins))]
+
+    counts = np.zeros(len(origins), dtype=np.int64)
+    for box, ids in enumerate(inside):  # in order, so later boxes overwrite
+        labels[ids] = class_ids[box]
+        counts[box] = len(ids)
+    changed = (
+        np.unique(np.concatenate(inside)) if inside else np.array([], dtype=np.int64)
+    )
+    logging.info(
+        f"Labeled {len(changed)} points inside {len(origins)} boxes "
+        f"in {time.perf_counter() - start_time:.2f} s."
+    )
+    return BoxLabelingResult(labels, counts, changed)
@@ -0,0 +1,162 @@
+"""
+NumPy version of the fixed-function transformations of the viewer.
+The camera keeps the modelview and projection matrix together with their product and
+its inverse, so screen and world coordinates can be converted without querying OpenGL.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from ..definitions import Point3D, Rotations3D
+
+Viewport = Tuple[int, int, int, int]  # x, y, width, height
+
+
+def get_translation_matrix(translation: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    matrix = np.eye(4)
+    matrix[:3, 3] = translation
+    return matrix
+
+
+def get_rotation_matrix(angle: float, axis: int) -> npt.NDArray[np.float64]:
+    """Rotation by the angle (in degrees) around the x- (0), y- (1) or z-axis (2)."""
+    angle = np.radians(angle)
+    cos, sin = np.cos(angle), np.sin(angle)
+    i, j = [(1, 2), (2, 0), (0, 1)][axis]
+    matrix = np.eye(4)
+    matrix[i, i], matrix[i, j] = cos, -sin
+    matrix[j, i], matrix[j, j] = sin, cos
+    return matrix
+
+
+def get_perspective_matrix(
+    fov: float, aspect: float, near: float, far: float
+) -> npt.NDArray[np.float64]:
+    """Same matrix as `gluPerspective` with the vertical field of view in degrees."""
+    f = 1 / np.tan(np.radians(fov) / 2)
+    return np.array(
+        [
+            [f / aspect, 0, 0, 0],
+            [0, f, 0, 0],
+            [0, 0, (far + near) / (near - far), 2 * far * near / (near - far)],
+            [0, 0, -1, 0],
+        ]
+    )
+
+
+def get_model_matrix(
+    translation: Point3D, rotations: Rotations3D, pivot: npt.ArrayLike
+) -> npt.NDArray[np.float64]:
+    """Rotate around the pivot (x first, then y, then z) and translate afterwards."""
+    pivot = np.asarray(pivot, dtype=float)
+    return (
+        get_translation_matrix(translation)
+        @ get_translation_matrix(pivot)
+        @ get_rotation_matrix(rotations[0], 0)
+        @ get_rotation_matrix(rotations[1], 1)
+        @ get_rotation_matrix(rotations[2], 2)
+        @ get_translation_matrix(-pivot)
+    )
+
+
+class Camera(object):
+    """Modelview, projection and viewport of the viewer.
+
+    The matrices are stored in row-major order (use `.T` for OpenGL) and are only
+    recomputed when the pose of the point cloud or the viewport changes.
+    """
+
+    def __init__(self, fov: float, near: float, far: float) -> None:
+        self.fov = fov
+        self.near = near
+        self.far = far
+
+        self.viewport: Viewport = (0, 0, 1, 1)
+        self.modelview = np.eye(4)
+        self.projection = get_perspective_matrix(fov, 1, near, far)
+        self._pose: Optional[tuple] = None
+        self.version = 0  # increased whenever the matrices or the viewport change
+        self._mvp: Optional[npt.NDArray[np.float64]] = None
+        self._inverse_mvp: Optional[npt.NDArray[np.float64]] = None
+
+    def set_viewport(self, width: int, height: int) -> None:
+        viewport = (0, 0, width, height)
+        if viewport == self.viewport:
+            return
+        self.viewport = viewport
+        self.projection = get_perspective_matrix(
+            self.fov, width / float(height), self.near, self.far
+        )
+        self._mvp = self._inverse_mvp = None
+        self.version += 1
+
+    def set_pose(
+        self, translation: Point3D, rotations: Rotations3D, pivot: npt.ArrayLike
+    ) -> None:
+        """Move the point cloud as `PointCloud.set_gl_background` does."""
+        pose = (tuple(translation), tuple(rotations), tuple(np.asarray(pivot).tolist()))
+        if pose == self._pose:
+            return
+        self._pose = pose
+        self.modelview = get_model_matrix(translation, rotations, pivot)
+        self._mvp = self._inverse_mvp = None
+        self.version += 1
+
+    def get_pixel_slope(self) -> float:
+        """Height of a pixel per meter of distance to the camera."""
+        return 2 * np.tan(np.radians(self.fov) / 2) / self.viewport[3]
+
+    @property
+    def mvp(self) -> npt.NDArray[np.float64]:
+        if self._mvp is None:
+            self._mvp = self.projection @ self.modelview
+        return self._mvp
+
+    @property
+    def inverse_mvp(self) -> npt.NDArray[np.float64]:
+        if self._inverse_mvp is None:
+            self._inverse_mvp = np.linalg.inv(self.mvp)
+        return self._inverse_mvp
+
+    def unproject(
+        self, x: npt.ArrayLike, y: npt.ArrayLike, z: npt.ArrayLike
+    ) -> npt.NDArray[np.float64]:
+        """Convert window coordinates (origin bottom left) and depths into world points.
+
+        Accepts scalars or arrays of the same shape and returns the points in an
+        array with an additional last dimension of size 3.
+        """
+        vx, vy, width, height = self.viewport
+        x, y, z = np.broadcast_arrays(
+            np.asarray(x, dtype=float),
+            np.asarray(y, dtype=float),
+            np.asarray(z, dtype=float),
+        )
+        ndc = np.stack(
+            [
+                2 * (x - vx) / width - 1,
+                2 * (y - vy) / height - 1,
+                2 * z - 1,
+                np.ones_like(x),
+            ],
+            axis=-1,
+        )
+        world = ndc @ self.inverse_mvp.T
+        return world[..., :3] / world[..., 3:]
+
+    def project(self, points: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        """Convert world points (..., 3) into window coordinates and depths (..., 3)."""
+        points = np.asarray(points, dtype=float)
+        clip = points @ self.mvp[:, :3].T + self.mvp[:, 3]
+        ndc = clip[..., :3] / clip[..., 3:]
+        vx, vy, width, height = self.viewport
+        return np.stack(
+            [
+                vx + width * (ndc[..., 0] + 1) / 2,
+                vy + height * (ndc[..., 1] + 1) / 2,
+                (ndc[..., 2] + 1) / 2,
+            ],
+            axis=-1,
+        )
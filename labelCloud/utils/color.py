@@ -1,4 +1,7 @@
 import colorsys
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 import numpy as np
@@ -32,18 +35,81 @@ def get_distinct_colors(n: int) -> List[str]:
     return [rgb_to_hex(color) for color in colors]
 
 
+# Number of values that are colorized at once (per thread)
+COLORIZE_CHUNK_SIZE = 1 << 20
+COLORMAPS = ("rocket", "rainbow", "gray")
+PALETTE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=None)
+def get_palette(colormap: str = "rocket") -> npt.NDArray[np.float32]:
+    """Return the colors of a colormap as (n, 3) array, loaded only once."""
+    colors: npt.ArrayLike
+    if colormap == "rocket":
+        colors = np.loadtxt(
+            pkg_resources.resource_filename(
+                "labelCloud.resources", "rocket-palette.txt"
+            )
+        )
+    elif colormap == "rainbow":  # from blue (low) to red (high)
+        colors = [
+            colorsys.hsv_to_rgb(hue, 1.0, 1.0)
+            for hue in np.linspace(2 / 3, 0, PALETTE_SIZE)
+        ]
+    elif colormap == "gray":
+        colors = np.repeat(np.linspace(0, 1, PALETTE_SIZE)[:, None], 3, axis=1)
+    else:
+        raise ValueError(
+            f"Unknown colormap `{colormap}`, choose one of {', '.join(COLORMAPS)}."
+        )
+    palette = np.array(colors, dtype=np.float32)
+    palette.setflags(write=False)  # shared between all calls
+    return palette
+
+
 def colorize_points_with_height(
-    points: np.ndarray, z_min: float, z_max: float
+    points: np.ndarray, z_min: float, z_max: float, colormap: str = "rocket"
 ) -> npt.NDArray[np.float32]:
-    palette = np.loadtxt(
-        pkg_resources.resource_filename("labelCloud.resources", "rocket-palette.txt")
-    )
-    palette_len = len(palette) - 1
+    return colorize_values(points[:, 2], z_min, z_max, colormap)
+
 
-    colors = np.zeros(points.shape)
-    for ind, height in enumerate(points[:, 2]):
-        colors[ind] = palette[round((height - z_min) / (z_max - z_min) * palette_len)]
-    return colors.astype(np.float32)
+def colorize_values(
+    values: np.ndarray,
+    v_min: float,
+    v_max: float,
+    colormap: str = "rocket",
+    chunk_size: int = COLORIZE_CHUNK_SIZE,
+) -> npt.NDArray[np.float32]:
+    """Map scalar values (e.g. height, intensity or distance) to colors of a colormap.
+
+    The values are mapped onto palette indices chunk-wise, large arrays are
+    colorized by multiple threads (NumPy releases the GIL for the computation).
+    Non-finite values get the first color of the palette.
+    """
+    palette = get_palette(colormap)
+    scale = (len(palette) - 1) / ((v_max - v_min) or 1)
+    colors = np.empty((len(values), 3), dtype=np.float32)
+
+    def colorize_chunk(start: int) -> None:
+        chunk = values[start : start + chunk_size]
+        indices = np.rint((chunk - v_min) * scale)
+        indices[~np.isfinite(indices)] = 0
+        np.clip(indices, 0, len(palette) - 1, out=indices)
+        np.take(
+            palette,
+            indices.astype(np.intp),
+            axis=0,
+            out=colors[start : start + len(chunk)],
+        )
+
+    starts = range(0, len(values), chunk_size)
+    if len(starts) > 1:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            list(executor.map(colorize_chunk, starts))
+    else:
+        for start in starts:
+            colorize_chunk(start)
+    return colors
 
 
 def hex_to_rgb(hex: str) -> Color3f:
@@ -0,0 +1,69 @@
+"""
+Level-of-detail ordering of point clouds for drawing fewer points.
+The points are sorted so that each level is a prefix of the point buffer: level d
+holds the first point (along the Morton curve) of every voxel of a grid with 2^d
+cells per axis. Drawing the first `level_ends[d]` points therefore shows an evenly
+thinned out point cloud, and every finer level only appends points. With octree
+chunks, the points of each chunk are sorted like this.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .morton import MORTON_BITS, get_morton_codes
+from .octree import split_into_chunks
+
+
+def get_highest_bits(values: npt.NDArray[np.uint64]) -> npt.NDArray[np.int64]:
+    """Position of the highest set bit of each value, -1 for zeros."""
+    highest = np.full(len(values), -1, dtype=np.int64)
+    non_zero = values != 0
+    values = values[non_zero]
+    # the float estimate can be off by one for large values
+    estimate = np.floor(np.log2(values.astype(np.float64))).astype(np.int64)
+    estimate -= (values >> estimate.astype(np.uint64)) == 0
+    estimate += (values >> (estimate + 1).astype(np.uint64)) != 0
+    highest[non_zero] = estimate
+    return highest
+
+
+def get_lod_depths(
+    sorted_codes: npt.NDArray[np.uint64], bits: int = MORTON_BITS
+) -> npt.NDArray[np.int8]:
+    """Coarsest grid depth at which each point is the first point of its voxel.
+
+    Points with the same code as their predecessor never are and get `bits + 1`.
+    """
+    depths = np.zeros(len(sorted_codes), dtype=np.int8)
+    if len(sorted_codes) > 1:
+        highest = get_highest_bits(sorted_codes[1:] ^ sorted_codes[:-1])
+        depths[1:] = bits - highest // 3
+    return depths
+
+
+def get_lod_order(
+    points: npt.NDArray, bits: int = MORTON_BITS, max_chunk_points: int = 0
+) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    """Permutation that sorts the points by octree chunk, by level within each chunk
+    and along the Morton curve within each level.
+
+    Also returns the starts of the chunks and the number of points up to each level
+    of each chunk (C, bits + 2). Without a chunk size, all points form one chunk.
+    """
+    codes = get_morton_codes(points, bits)
+    order = np.argsort(codes)
+    codes = codes[order]
+    starts = split_into_chunks(codes, max_chunk_points, bits)
+    depths = get_lod_depths(codes, bits)
+    depths[starts] = 0  # every level of a chunk contains its first point
+    del codes
+
+    no_of_levels = bits + 2
+    chunk_ids = np.repeat(np.arange(len(starts)), np.diff(starts, append=len(points)))
+    keys = chunk_ids * no_of_levels + depths
+    order = order[np.argsort(keys, kind="stable")]
+    level_ends = np.bincount(keys, minlength=len(starts) * no_of_levels)
+    level_ends = level_ends.reshape(len(starts), no_of_levels).cumsum(axis=1)
+    return order, starts, level_ends
@@ -94,15 +94,126 @@ def rotate_around_zyx(
     )
 
 
+def get_rotation_matrix_from_axis_angle(rotation_vector: npt.ArrayLike) -> npt.NDArray:
+    """Rotation matrix for a rotation vector (axis scaled by the angle in radians)."""
+    rotation_vector = np.asarray(rotation_vector, dtype=float)
+    angle = np.linalg.norm(rotation_vector)
+    if angle == 0:
+        return np.eye(3)
+    x, y, z = rotation_vector / angle
+    cross_matrix = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    return (
+        np.eye(3)
+        + np.sin(angle) * cross_matrix
+        + (1 - np.cos(angle)) * cross_matrix @ cross_matrix
+    )
+
+
 def rotate_bbox_around_center(
     vertices: List[Point3D], center: Point3D, rotations: Rotations3D
 ) -> List[Point3D]:
-    rotated_vertices = []
-    for vertex in vertices:
-        centered_vertex = translate_point(vertex, *center, backwards=True)
-        rotated_vertex = rotate_around_zyx(centered_vertex, *rotations, degrees=True)
-        rotated_vertices.append(translate_point(rotated_vertex, *center))
-    return rotated_vertices
+    rotated_vertices = rotate_bboxes_around_centers(
+        np.asarray(vertices, dtype=float)[None], [center], [rotations]
+    )[0]
+    return [tuple(vertex) for vertex in rotated_vertices]  # type: ignore
+
+
+# BATCHES OF BOUNDING BOXES
+
+# Corners of the unit cube in the vertex order of the bounding boxes (see BBOX_SIDES)
+UNIT_BBOX_VERTICES = np.array(
+    [
+        [-0.5, -0.5, -0.5],
+        [-0.5, 0.5, -0.5],
+        [0.5, 0.5, -0.5],
+        [0.5, -0.5, -0.5],
+        [-0.5, -0.5, 0.5],
+        [-0.5, 0.5, 0.5],
+        [0.5, 0.5, 0.5],
+        [0.5, -0.5, 0.5],
+    ]
+)
+
+
+def get_rotation_matrices(rotations: npt.ArrayLike) -> npt.NDArray:
+    """Rotation matrices (N, 3, 3) for (N, 3) rotations in degrees.
+
+    The rotations are applied around x first, then y and z (as `rotate_around_zyx`).
+    """
+    x, y, z = np.radians(np.asarray(rotations, dtype=float)).T
+    cos_x, sin_x = np.cos(x), np.sin(x)
+    cos_y, sin_y = np.cos(y), np.sin(y)
+    cos_z, sin_z = np.cos(z), np.sin(z)
+    return np.stack(
+        [
+            np.stack(
+                [
+                    cos_z * cos_y,
+                    cos_z * sin_y * sin_x - sin_z * cos_x,
+                    cos_z * sin_y * cos_x + sin_z * sin_x,
+                ],
+                axis=-1,
+            ),
+            np.stack(
+                [
+                    sin_z * cos_y,
+                    sin_z * sin_y * sin_x + cos_z * cos_x,
+                    sin_z * sin_y * cos_x - cos_z * sin_x,
+                ],
+                axis=-1,
+            ),
+            np.stack([-sin_y, cos_y * sin_x, cos_y * cos_x], axis=-1),
+        ],
+        axis=-2,
+    )
+
+
+def get_bbox_poses(centers: npt.ArrayLike, rotations: npt.ArrayLike) -> npt.NDArray:
+    """Homogeneous transformations (N, 4, 4) from box to world coordinates."""
+    rotation_matrices = get_rotation_matrices(rotations)
+    poses = np.zeros((len(rotation_matrices), 4, 4))
+    poses[:, :3, :3] = rotation_matrices
+    poses[:, :3, 3] = centers
+    poses[:, 3, 3] = 1
+    return poses
+
+
+def get_bboxes_vertices(
+    centers: npt.ArrayLike, dimensions: npt.ArrayLike, rotations: npt.ArrayLike
+) -> npt.NDArray:
+    """Vertices (N, 8, 3) of N boxes given by centers, dimensions and rotations."""
+    poses = get_bbox_poses(centers, rotations)
+    local_vertices = UNIT_BBOX_VERTICES * np.asarray(dimensions, dtype=float)[:, None]
+    return local_vertices @ poses[:, :3, :3].transpose(0, 2, 1) + poses[:, None, :3, 3]
+
+
+def rotate_bboxes_around_centers(
+    vertices: npt.ArrayLike, centers: npt.ArrayLike, rotations: npt.ArrayLike
+) -> npt.NDArray:
+    """Rotate the vertices (N, 8, 3) of N boxes around their centers (N, 3)."""
+    centers = np.asarray(centers, dtype=float)[:, None]
+    rotation_matrices = get_rotation_matrices(rotations)
+    return (np.asarray(vertices) - centers) @ rotation_matrices.transpose(
+        0, 2, 1
+    ) + centers
+
+
+def get_bboxes_axes(vertices: npt.ArrayLike) -> Tuple[npt.NDArray, npt.NDArray]:
+    """Origin vertices (N, 3) and edge vectors (N, 3, 3) along length, width, height."""
+    vertices = np.asarray(vertices)
+    origins = vertices[:, 0]
+    axes = vertices[:, [3, 1, 4]] - origins[:, None]
+    return origins, axes
+
+
+def are_points_inside_bboxes(
+    points: npt.NDArray, vertices: npt.ArrayLike
+) -> npt.NDArray[np.bool_]:
+    """Mask (N, P) of the points (P, 3) inside each of the boxes with vertices (N, 8, 3)."""
+    origins, axes = get_bboxes_axes(vertices)
+    projections = np.einsum("nij,npj->npi", axes, points[None] - origins[:, None])
+    squared_lengths = np.sum(axes**2, axis=-1)[:, None]
+    return np.all((projections > 0) & (projections < squared_lengths), axis=-1)
 
 
 #  CONVERSION
@@ -201,3 +312,59 @@ def get_line_plane_intersection(
         return np.add(p0, u)
     else:
         return None  # The segment is parallel to plane.
+
+
+# Names of the box sides by axis (length, width, height) and direction (-, +)
+BBOX_SIDE_NAMES = np.array([["left", "right"], ["back", "front"], ["bottom", "top"]])
+
+
+def intersect_ray_with_bboxes(
+    origin: npt.ArrayLike,
+    direction: npt.ArrayLike,
+    poses: npt.NDArray,
+    dimensions: npt.ArrayLike,
+) -> Tuple[npt.NDArray, npt.NDArray]:
+    """Intersect a ray with N oriented boxes using the slab test in box coordinates.
+
+    :param origin: start of the ray (3,)
+    :param direction: direction of the ray (3,)
+    :param poses: transformations (N, 4, 4) from box to world coordinates
+    :param dimensions: length, width and height (N, 3) of the boxes
+    :return: ray parameters of the hits (inf for missed boxes) and the hit sides
+    """
+    rotations, centers = poses[:, :3, :3], poses[:, :3, 3]
+    local_origins = np.einsum("nji,nj->ni", rotations, np.subtract(origin, centers))
+    local_directions = np.einsum("nji,j->ni", rotations, np.asarray(direction))
+    local_directions[local_directions == 0] = 1e-12  # parallel to the slab
+    half_dimensions = np.asarray(dimensions, dtype=float) / 2
+
+    t_lower = (-half_dimensions - local_origins) / local_directions
+    t_upper = (half_dimensions - local_origins) / local_directions
+    t_min, t_max = np.minimum(t_lower, t_upper), np.maximum(t_lower, t_upper)
+    t_near, t_far = t_min.max(axis=1), t_max.min(axis=1)
+
+    # the ray enters through the side of its last slab, or leaves if it starts inside
+    outside = t_near >= 0
+    axes = np.where(outside, t_min.argmax(axis=1), t_max.argmin(axis=1))
+    axis_directions = local_directions[np.arange(len(axes)), axes] > 0
+    positive_sides = np.where(outside, ~axis_directions, axis_directions).astype(int)
+    sides = BBOX_SIDE_NAMES[axes, positive_sides]
+
+    distances = np.where(outside, t_near, t_far)
+    distances[(t_near > t_far) | (t_far < 0)] = np.inf
+    return distances, sides
+
+
+def intersect_ray_with_points(
+    origin: npt.ArrayLike,
+    direction: npt.ArrayLike,
+    points: npt.ArrayLike,
+    threshold: float,
+) -> npt.NDArray:
+    """Ray parameters of the N points closer than the threshold to the ray (else inf)."""
+    direction = np.asarray(direction, dtype=float)
+    offsets = np.asarray(points, dtype=float) - origin
+    distances = offsets @ direction / (direction @ direction)
+    closest = np.asarray(origin) + distances[:, None] * direction
+    missed = np.linalg.norm(np.asarray(points) - closest, axis=1) > threshold
+    return np.where(missed | (distances < 0), np.inf, distances)
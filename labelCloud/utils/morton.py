@@ -0,0 +1,107 @@
+"""
+Spatial reordering of point clouds along the Morton (Z-order) curve.
+Points that are close in space get close indices, so the points of a box selection
+form a few long runs of indices instead of one short run per scan line. The blocks
+of consecutive points then have small bounds and can be skipped as a whole.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+MORTON_BITS = 21  # per axis, 3 * 21 bits fit into an unsigned 64-bit code
+BLOCK_SIZE = 4096  # consecutive points summarized by one bounding box
+
+
+class BlockBounds(NamedTuple):
+    mins: npt.NDArray[np.float32]  # (B, 3)
+    maxs: npt.NDArray[np.float32]  # (B, 3)
+    block_size: int
+
+
+def _spread_bits(values: npt.NDArray[np.uint64]) -> npt.NDArray[np.uint64]:
+    """Insert two zero bits in front of each of the lowest 21 bits."""
+    values = values & np.uint64(0x1FFFFF)
+    for shift, mask in [
+        (32, 0x1F00000000FFFF),
+        (16, 0x1F0000FF0000FF),
+        (8, 0x100F00F00F00F00F),
+        (4, 0x10C30C30C30C30C3),
+        (2, 0x1249249249249249),
+    ]:
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+# spread bits of all 11-bit values, two lookups spread 21 bits
+_SPREAD_TABLE = _spread_bits(np.arange(1 << 11, dtype=np.uint64))
+
+
+def get_morton_codes(
+    points: npt.NDArray, bits: int = MORTON_BITS
+) -> npt.NDArray[np.uint64]:
+    """Interleave the quantized x, y and z coordinates of the points (N, 3).
+
+    All axes share the same scale, so each prefix of the codes (of a multiple of
+    three bits) is the key of a cubic voxel.
+    """
+    assert bits <= MORTON_BITS
+    # per column, much faster than reducing along the first axis
+    mins = np.array([np.min(points[:, axis]) for axis in range(3)], dtype=np.float64)
+    maxs = np.array([np.max(points[:, axis]) for axis in range(3)], dtype=np.float64)
+    extent = np.max(maxs - mins)
+    max_cell = (1 << bits) - 1
+    scale = max_cell / extent if extent > 0 else 1.0
+    codes = np.zeros(len(points), dtype=np.uint64)
+    for axis in range(3):
+        cells = np.clip((points[:, axis] - mins[axis]) * scale, 0, max_cell)
+        cells = cells.astype(np.uint32)
+        spread = _SPREAD_TABLE[cells & 0x7FF]
+        spread |= _SPREAD_TABLE[cells >> 11] << np.uint64(33)
+        spread <<= np.uint64(axis)
+        codes |= spread
+    return codes
+
+
+def get_morton_order(points: npt.NDArray) -> npt.NDArray[np.int64]:
+    """Permutation that sorts the points along the Morton curve."""
+    if len(points) == 0:
+        return np.array([], dtype=np.int64)
+    return np.argsort(get_morton_codes(points))
+
+
+def invert_permutation(order: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    inverse = np.empty_like(order)
+    inverse[order] = np.arange(len(order), dtype=order.dtype)
+    return inverse
+
+
+def get_block_bounds(points: npt.NDArray, block_size: int = BLOCK_SIZE) -> BlockBounds:
+    """Bounds of each block of `block_size` consecutive points."""
+    starts = np.arange(0, len(points), block_size)
+    if len(starts) == 0:
+        empty = np.empty((0, 3), dtype=np.float32)
+        return BlockBounds(empty, empty, block_size)
+    return BlockBounds(
+        np.minimum.reduceat(points, starts, axis=0),
+        np.maximum.reduceat(points, starts, axis=0),
+        block_size,
+    )
+
+
+def get_points_in_overlapping_blocks(
+    block_bounds: BlockBounds,
+    no_of_points: int,
+    mins: npt.NDArray,
+    maxs: npt.NDArray,
+) -> npt.NDArray[np.int64]:
+    """Ids of the points in the blocks whose bounds overlap the box [mins, maxs]."""
+    overlapping = np.flatnonzero(
+        np.all((block_bounds.mins <= maxs) & (block_bounds.maxs >= mins), axis=1)
+    )
+    if len(overlapping) == 0:
+        return np.array([], dtype=np.int64)
+    block_size = block_bounds.block_size
+    ids = (overlapping[:, None] * block_size + np.arange(block_size)).ravel()
+    return ids[ids < no_of_points]
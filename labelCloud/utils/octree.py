@@ -0,0 +1,159 @@
+"""
+Octree chunks of point clouds sorted along the Morton curve.
+Each octree node is a contiguous range of the sorted points, so the chunks are the
+largest nodes with at most a given number of points. Every chunk has its own draw
+range and bounding box: chunks outside of the view frustum are not drawn and small
+or distant chunks only draw a coarse level of detail (see `lod`).
+"""
+
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from .morton import MORTON_BITS
+
+if TYPE_CHECKING:
+    from .camera import Camera
+
+DrawRanges = Tuple[npt.NDArray[np.int32], npt.NDArray[np.int32]]  # firsts, counts
+
+# corners of the unit cube, to get the corners of boxes from their bounds
+UNIT_CUBE_CORNERS = np.array(
+    [[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float64
+)
+
+
+def split_into_chunks(
+    sorted_codes: npt.NDArray[np.uint64],
+    max_chunk_points: int,
+    bits: int = MORTON_BITS,
+) -> npt.NDArray[np.int64]:
+    """Starts of the largest octree nodes with at most `max_chunk_points` points.
+
+    Nodes of identical codes cannot be split and may be larger. Without a limit (0),
+    all points form one chunk.
+    """
+    no_of_points = len(sorted_codes)
+    if max_chunk_points <= 0 or no_of_points <= max_chunk_points:
+        return np.zeros(1, dtype=np.int64)
+    starts = []
+    positions = np.arange(no_of_points)  # of the points in nodes that are too large
+    for depth in range(1, bits + 1):
+        keys = sorted_codes[positions] >> np.uint64(3 * (bits - depth))
+        node_starts = np.flatnonzero(np.diff(keys, prepend=~keys[:1]))
+        sizes = np.diff(node_starts, append=len(positions))
+        small = sizes <= max_chunk_points if depth < bits else np.ones_like(sizes, bool)
+        starts.append(positions[node_starts[small]])
+        positions = positions[np.repeat(~small, sizes)]
+        if len(positions) == 0:
+            break
+    return np.sort(np.concatenate(starts))
+
+
+def get_visible_boxes(
+    mins: npt.NDArray, maxs: npt.NDArray, mvp: npt.NDArray
+) -> npt.NDArray[np.bool_]:
+    """Whether the axis-aligned boxes (N, 3) intersect the view frustum.
+
+    Conservative, boxes are culled if all of their corners are outside of one plane.
+    """
+    corners = mins[:, None] + (maxs - mins)[:, None] * UNIT_CUBE_CORNERS  # (N, 8, 3)
+    clip = corners @ mvp[:, :3].T + mvp[:, 3]  # (N, 8, 4)
+    xyz, w = clip[..., :3], clip[..., 3:]
+    outside = np.all(xyz < -w, axis=1) | np.all(xyz > w, axis=1)  # (N, 3)
+    return ~np.any(outside, axis=1)
+
+
+def clip_draw_ranges(draw_ranges: DrawRanges, stop: int) -> DrawRanges:
+    """Restrict the ranges to the points before `stop`."""
+    firsts, counts = draw_ranges
+    counts = np.minimum(firsts + counts, stop) - firsts
+    drawn = counts > 0
+    return firsts[drawn], counts[drawn].astype(np.int32)
+
+
+class PointChunks(object):
+    """Draw ranges and bounds of the chunks of a point cloud.
+
+    The points of each chunk are sorted by level of detail, `level_ends[c, d]` is the
+    number of points of chunk c up to the level with 2^d voxels per axis.
+    """
+
+    def __init__(
+        self,
+        points: npt.NDArray,
+        starts: npt.NDArray[np.int64],
+        level_ends: npt.NDArray[np.int64],
+    ) -> None:
+        self.starts = starts
+        self.level_ends = level_ends
+        self.mins = np.stack(
+            [np.minimum.reduceat(points[:, axis], starts) for axis in range(3)], 1
+        )
+        self.maxs = np.stack(
+            [np.maximum.reduceat(points[:, axis], starts) for axis in range(3)], 1
+        )
+        # edge length of the voxel grid at depth 0, as used for the Morton codes
+        self.extent = float(np.max(self.maxs.max(axis=0) - self.mins.min(axis=0)))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def no_of_points(self) -> int:
+        return int(self.level_ends[:, -1].sum())
+
+    def moved(self, points: npt.NDArray) -> "PointChunks":
+        """Same chunks with the bounds of the transformed points."""
+        return PointChunks(points, self.starts, self.level_ends)
+
+    def get_max_depths(
+        self, camera: "Camera", voxel_pixels: float
+    ) -> npt.NDArray[np.int64]:
+        """Finest level of each chunk whose voxels are at least `voxel_pixels` large."""
+        eye = np.linalg.inv(camera.modelview)[:3, 3]
+        offsets = np.maximum(np.maximum(self.mins - eye, eye - self.maxs), 0)
+        distances = np.linalg.norm(offsets, axis=1)
+        finest = self.level_ends.shape[1] - 1
+        with np.errstate(divide="ignore"):
+            depths = np.log2(
+                self.extent / (distances * camera.get_pixel_slope() * voxel_pixels)
+            )
+        return np.clip(np.floor(depths), 0, finest).astype(np.int64)
+
+    def get_draw_ranges(
+        self,
+        camera: Optional["Camera"] = None,
+        point_budget: int = 0,
+        voxel_pixels: float = 0,
+    ) -> DrawRanges:
+        """First point and number of points to draw of each visible chunk.
+
+        With a camera, chunks outside of the view are culled and chunks are drawn
+        with voxels of at least `voxel_pixels` (if positive). All chunks are then
+        limited to the finest level that stays within the point budget (if positive).
+        """
+        chunks = np.arange(len(self))
+        finest = self.level_ends.shape[1] - 1
+        max_depths = np.full(len(self), finest)
+        if camera is not None:
+            chunks = np.flatnonzero(get_visible_boxes(self.mins, self.maxs, camera.mvp))
+            if voxel_pixels > 0:
+                max_depths = self.get_max_depths(camera, voxel_pixels)
+        max_depths = max_depths[chunks]
+        level_ends = self.level_ends[chunks]
+
+        if point_budget > 0:
+            # points drawn with each depth limit, the finest one within the budget
+            levels = np.minimum(np.arange(finest + 1)[:, None], max_depths)
+            totals = np.take_along_axis(level_ends.T, levels, axis=0).sum(axis=1)
+            depth = max(int(np.searchsorted(totals, point_budget, side="right")) - 1, 0)
+            max_depths = np.minimum(max_depths, depth)
+
+        counts = np.take_along_axis(level_ends, max_depths[:, None], axis=1)[:, 0]
+        drawn = counts > 0
+        return (
+            self.starts[chunks[drawn]].astype(np.int32),
+            counts[drawn].astype(np.int32),
+        )
@@ -4,19 +4,23 @@ import numpy as np
 import numpy.typing as npt
 
 import OpenGL.GL as GL
-from OpenGL import GLU
 
 from . import math3d
+from .picking import BBoxPicker
 from ..definitions import BBOX_SIDES, Color4f, Point3D
 
 
 if TYPE_CHECKING:
     from ..model import BBox, PointCloud, Point
+    from .camera import Camera
+    from .spatial_index import SpatialIndex
 
 
 DEVICE_PIXEL_RATIO: Optional[float] = (
     None  # is set once and for every window resize (retina display fix)
 )
+POINT_PICKING_THRESHOLD = 0.05  # max. distance of picked points to the ray
+BBOX_PICKER = BBoxPicker()  # keeps the stacked poses of the boxes between picks
 
 # new draw method for points removes scaling with distance and draws the points.
 # maybe playing with glPointParameter might help here too.
@@ -57,7 +61,7 @@ def draw_points(
 
 
 def draw_lines(
-    points: List[Point3D],
+    points: Union[List[Point3D], npt.NDArray],
     color: Color4f = (0, 1, 1, 1),
     line_width: int = 2,
 ) -> None:
@@ -139,117 +143,110 @@ def draw_xy_plane(pcd: "PointCloud") -> None:
 # RAY PICKING
 
 
-def get_pick_ray(x: float, y: float, modelview, projection) -> Tuple[Point3D, Point3D]:
+def get_pick_ray(x: float, y: float, camera: "Camera") -> Tuple[Point3D, Point3D]:
     """
     :param x: rightward screen coordinate
     :param y: downward screen coordinate
-    :param modelview: modelview matrix
-    :param projection: projection matrix
+    :param camera: camera of the viewer
     :return: two points of the pick ray from the closest and furthest frustum
     """
     x *= DEVICE_PIXEL_RATIO  # type: ignore
     y *= DEVICE_PIXEL_RATIO  # type: ignore
+    real_y = camera.viewport[3] - y  # adjust for down-facing y positions
+
+    # Unproject screen coords into world coords
+    p_front, p_back = camera.unproject([x, x], [real_y, real_y], [0, 1])
+    return tuple(p_front), tuple(p_back)  # type: ignore
 
-    viewport = GL.glGetIntegerv(GL.GL_VIEWPORT)
-    real_y = viewport[3] - y  # adjust for down-facing y positions
 
-    # Unproject screen coords into world coordsdd
-    p_front = GLU.gluUnProject(x, real_y, 0, modelview, projection, viewport)
-    p_back = GLU.gluUnProject(x, real_y, 1, modelview, projection, viewport)
-    return p_front, p_back
+def get_ray_picked_point(
+    x: float,
+    y: float,
+    spatial_index: "SpatialIndex",
+    camera: "Camera",
+    cone_radius: float,
+) -> Optional[int]:
+    """Finds the first point (by depth) within a cone around the pick ray.
+
+    Does not depend on the depth buffer, so it also hits points between sparse returns.
+
+    :param x: x screen coordinate
+    :param y: y screen coordinate
+    :param spatial_index: index of the point cloud
+    :param camera: camera of the viewer
+    :param cone_radius: radius of the cone on the screen in pixels
+    :return: index of the picked point or None if no point is inside the cone
+    """
+    p0, p1 = get_pick_ray(x, y, camera)
+    origin, direction = np.array(p0), np.subtract(p1, p0)
+    # the cone starts at the near plane and has about the same radius on screen everywhere
+    slope = cone_radius * DEVICE_PIXEL_RATIO * camera.get_pixel_slope()  # type: ignore
+    hit = spatial_index.query_ray_first(origin, direction, camera.near * slope, slope)
+    return None if hit is None else hit[0]
 
 
 def get_intersected_bboxes(
-    x: float, y: float, items: List[Union["BBox", "Point"]], modelview, projection
+    x: float, y: float, items: List[Union["BBox", "Point"]], camera: "Camera"
 ) -> Union[int, None]:
-    """Checks if the picking ray intersects any bounding box from bboxes.
+    """Checks if the picking ray intersects any bounding box or point from items.
 
     :param x: x screen coordinate
     :param y: y screen coordinate
-    :param bboxes: list of bounding boxes
-    :param modelview: modelview matrix
-    :param projection: projection matrix
-    :return: Id of the intersected bounding box or None if no bounding box is intersected
+    :param items: list of bounding boxes and points
+    :param camera: camera of the viewer
+    :return: Id of the closest intersected item or None if no item is intersected
     """
-    from ..model import BBox
-    intersected_bboxes = {}  # bbox_index: bbox
-    for index, item in enumerate(items):
-
-        if isinstance(item, BBox):
-            intersection_point, _ = get_intersected_sides(x, y, item, modelview, projection)
-        else:
-            intersection_point = get_point_intersection(x, y, item.point, modelview, projection)
-        if intersection_point is not None:
-            intersected_bboxes[index] = intersection_point[2]
-
-    p0, p1 = get_pick_ray(x, y, modelview, projection)  # Calculate picking ray
-    if intersected_bboxes and (
-        p0[2] >= p1[2]
-    ):  # Calculate which intersected bbox is closer to screen
-        return max(intersected_bboxes, key=intersected_bboxes.get)  # type: ignore
-    elif intersected_bboxes:
-        return min(intersected_bboxes, key=intersected_bboxes.get)  # type: ignore
-    else:
-        return None
+    from ..model import BBox, Point
+
+    p0, p1 = get_pick_ray(x, y, camera)  # Calculate picking ray
+    origin, direction = np.array(p0), np.subtract(p1, p0)
+
+    bbox_ids = [index for index, item in enumerate(items) if isinstance(item, BBox)]
+    point_ids = [index for index, item in enumerate(items) if isinstance(item, Point)]
+    distances = np.full(len(items), np.inf)  # along the ray, from the near plane
+    distances[bbox_ids] = BBOX_PICKER.intersect(
+        [item for item in items if isinstance(item, BBox)], origin, direction
+    )[0]
+    if point_ids:
+        distances[point_ids] = math3d.intersect_ray_with_points(
+            origin,
+            direction,
+            [item.point for item in items if isinstance(item, Point)],
+            POINT_PICKING_THRESHOLD,
+        )
+
+    if len(items) and np.isfinite(distances.min()):
+        return int(np.argmin(distances))
+    return None
 
 
 def get_intersected_sides(
-    x: float, y: float, bbox: "BBox", modelview, projection
-) -> Union[Tuple[List[int], str], Tuple[None, None]]:
+    x: float, y: float, bbox: "BBox", camera: "Camera"
+) -> Union[Tuple[List[float], str], Tuple[None, None]]:
     """Checks if and with which side of the given bounding box the picking ray intersects.
 
     :param x: x screen coordinate
     :param y: y screen coordinate:
     :param bbox: bounding box to check for intersection
-    :param modelview: modelview matrix
-    :param projection: projection matrix
+    :param camera: camera of the viewer
     :return: intersection point, name of intersected side [top, bottom, right, back, left, front]
     """
-    p0, p1 = get_pick_ray(x, y, modelview, projection)  # Calculate picking ray
-    vertices = bbox.get_vertices()
-
-    intersections: List[Tuple[list, str]] = (
-        list()
-    )  # (intersection_point, bounding box side)
-    for side, indices in BBOX_SIDES.items():
-        # Calculate plane equation
-        pl1 = vertices[indices[0]]  # point in plane
-        v1 = np.subtract(vertices[indices[1]], pl1)
-        v2 = np.subtract(vertices[indices[3]], pl1)
-        n = np.cross(v1, v2)  # plane normal
-
-        intersection = math3d.get_line_plane_intersection(p0, p1, pl1, tuple(n))  # type: ignore
-
-        # Check if intersection is inside rectangle
-        if intersection is not None:
-            v = np.subtract(intersection, pl1)
-            width = np.linalg.norm(v1)
-            height = np.linalg.norm(v2)
-            proj1 = np.dot(v, v1) / width
-            proj2 = np.dot(v, v2) / height
-
-            if (width > proj1 > 0) and (height > proj2 > 0):
-                intersections.append((intersection.tolist(), side))
-
-    # Calculate which intersected side is closer
-    intersections = sorted(
-        intersections, key=lambda element: element[0][2]
-    )  # sort by z-value
-    if intersections and (p0[2] >= p1[2]):
-        return intersections[-1]  # intersection point: list, side: str
-    elif intersections:
-        return intersections[0]
-    else:
+    p0, p1 = get_pick_ray(x, y, camera)  # Calculate picking ray
+    origin, direction = np.array(p0), np.subtract(p1, p0)
+    distances, sides = math3d.intersect_ray_with_bboxes(
+        origin, direction, bbox.get_pose()[None], [bbox.get_dimensions()]
+    )
+    if np.isinf(distances[0]):
         return None, None
+    return (origin + distances[0] * direction).tolist(), str(sides[0])
 
 
 def get_point_intersection(
     x: float,
     y: float,
     point: Union[np.ndarray, tuple, list],
-    modelview,
-    projection,
-    threshold: float = 0.05
+    camera: "Camera",
+    threshold: float = POINT_PICKING_THRESHOLD,
 ) -> Optional[np.ndarray]:
     """
     Checks if the picking ray intersects (is close to) a single point.
@@ -257,17 +254,13 @@ def get_point_intersection(
     :param x: x screen coordinate
     :param y: y screen coordinate
     :param point: (3,) array-like point coordinates
-    :param modelview: modelview matrix
-    :param projection: projection matrix
+    :param camera: camera of the viewer
     :param threshold: distance threshold for "hitting" the point
     :return: intersection point (np.ndarray) or None
     """
-    p0, p1 = get_pick_ray(x, y, modelview, projection)
-    p0, p1 = np.array(p0, dtype=float), np.array(p1, dtype=float)
-    point = np.array(point, dtype=float)
-
-    ray_dir = p1 - p0
-    ray_dir /= np.linalg.norm(ray_dir)
-
-    # vector from ray start to point
-    v = point - p0
+    p0, p1 = get_pick_ray(x, y, camera)
+    origin, direction = np.array(p0), np.subtract(p1, p0)
+    distance = math3d.intersect_ray_with_points(origin, direction, [point], threshold)
+    if np.isinf(distance[0]):
+        return None
+    return np.array(point, dtype=float)
@@ -0,0 +1,140 @@
+"""
+Ray picking of many bounding boxes at once.
+All boxes are intersected with one vectorized slab test. Above a configurable number of
+boxes, a bounding volume hierarchy first narrows them down to the boxes along the ray.
+"""
+
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from ..control.config_manager import config
+from . import math3d
+
+if TYPE_CHECKING:
+    from ..model import BBox
+
+
+def intersect_ray_with_aabbs(
+    origin: npt.NDArray, direction: npt.NDArray, mins: npt.NDArray, maxs: npt.NDArray
+) -> npt.NDArray[np.bool_]:
+    """Mask of the axis-aligned boxes (N, 3) hit by the ray."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_lower = (mins - origin) / direction
+        t_upper = (maxs - origin) / direction
+    t_near = np.nanmax(np.minimum(t_lower, t_upper), axis=1, initial=-np.inf)
+    t_far = np.nanmin(np.maximum(t_lower, t_upper), axis=1, initial=np.inf)
+    return (t_near <= t_far) & (t_far >= 0)
+
+
+class BoundingVolumeHierarchy(object):
+    """Binary tree of axis-aligned bounding boxes for ray queries.
+
+    Nodes are split at the median of their longest axis until they contain at most
+    `leaf_size` boxes. The tree is traversed level by level, testing all nodes of a
+    level at once.
+    """
+
+    def __init__(
+        self, mins: npt.NDArray, maxs: npt.NDArray, leaf_size: int = 8
+    ) -> None:
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(mins))  # box ids, sorted so each leaf is a range
+        self.node_mins: List[npt.NDArray] = []
+        self.node_maxs: List[npt.NDArray] = []
+        self.children: List[Tuple[int, int]] = []  # (-1, -1) for leaves
+        self.ranges: List[Tuple[int, int]] = []  # range of the leaves in `order`
+        self._build(mins, maxs, (mins + maxs) / 2, 0, len(mins))
+        self.node_mins_array = np.array(self.node_mins)
+        self.node_maxs_array = np.array(self.node_maxs)
+        self.children_array = np.array(self.children)
+
+    def _build(
+        self,
+        mins: npt.NDArray,
+        maxs: npt.NDArray,
+        centers: npt.NDArray,
+        start: int,
+        stop: int,
+    ) -> int:
+        node = len(self.children)
+        ids = self.order[start:stop]
+        self.node_mins.append(mins[ids].min(axis=0))
+        self.node_maxs.append(maxs[ids].max(axis=0))
+        self.children.append((-1, -1))
+        self.ranges.append((start, stop))
+        if stop - start <= self.leaf_size:
+            return node
+
+        axis = np.argmax(self.node_maxs[node] - self.node_mins[node])
+        self.order[start:stop] = ids[np.argsort(centers[ids, axis], kind="stable")]
+        middle = (start + stop) // 2
+        left = self._build(mins, maxs, centers, start, middle)
+        right = self._build(mins, maxs, centers, middle, stop)
+        self.children[node] = (left, right)
+        return node
+
+    def query_ray(self, origin: npt.NDArray, direction: npt.NDArray) -> npt.NDArray:
+        """Ids of the boxes whose bounding boxes are hit by the ray."""
+        candidates = []
+        nodes = np.array([0])
+        while len(nodes):
+            hits = nodes[
+                intersect_ray_with_aabbs(
+                    origin,
+                    direction,
+                    self.node_mins_array[nodes],
+                    self.node_maxs_array[nodes],
+                )
+            ]
+            children = self.children_array[hits]
+            for leaf in hits[children[:, 0] < 0]:
+                start, stop = self.ranges[leaf]
+                candidates.append(self.order[start:stop])
+            nodes = children[children[:, 0] >= 0].ravel()
+        return np.concatenate(candidates) if candidates else np.array([], dtype=int)
+
+
+class BBoxPicker(object):
+    """Stacked poses of the bounding boxes, rebuilt only when a box changed."""
+
+    def __init__(self) -> None:
+        self._versions: Optional[Tuple[int, ...]] = None
+        self.poses = np.zeros((0, 4, 4))
+        self.dimensions = np.zeros((0, 3))
+        self.bvh: Optional[BoundingVolumeHierarchy] = None
+
+    def update(self, bboxes: Sequence["BBox"]) -> None:
+        versions = tuple(bbox.version for bbox in bboxes)
+        if versions == self._versions:
+            return
+        self._versions = versions
+        self.poses = np.array([bbox.get_pose() for bbox in bboxes]).reshape(-1, 4, 4)
+        self.dimensions = np.array(
+            [bbox.get_dimensions() for bbox in bboxes], dtype=float
+        ).reshape(-1, 3)
+
+        self.bvh = None
+        if bboxes and len(bboxes) >= config.getint("LABEL", "picking_bvh_threshold"):
+            vertices = np.array([bbox.get_vertices() for bbox in bboxes])
+            self.bvh = BoundingVolumeHierarchy(
+                vertices.min(axis=1), vertices.max(axis=1)
+            )
+
+    def intersect(
+        self, bboxes: Sequence["BBox"], origin: npt.NDArray, direction: npt.NDArray
+    ) -> Tuple[npt.NDArray, npt.NDArray]:
+        """Ray parameters (inf for misses) and hit sides for each of the boxes."""
+        self.update(bboxes)
+        distances = np.full(len(bboxes), np.inf)
+        sides = np.full(len(bboxes), "", dtype=math3d.BBOX_SIDE_NAMES.dtype)
+
+        ids = np.arange(len(bboxes))
+        if self.bvh is not None:
+            ids = self.bvh.query_ray(origin, direction)
+        if len(ids):
+            distances[ids], sides[ids] = math3d.intersect_ray_with_bboxes(
+                origin, direction, self.poses[ids], self.dimensions[ids]
+            )
+        return distances, sides
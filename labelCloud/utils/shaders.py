@@ -0,0 +1,249 @@
+"""
+Shader programs for drawing point clouds.
+Points are drawn with their color and a 1-byte class id. The class colors are stored in
+a small palette texture and blended with the point colors in the fragment shader.
+For picking, the points can also be drawn with their index encoded as RGBA color.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import OpenGL.GL as GL
+from OpenGL.GL import shaders
+
+# Class ids are uploaded as unsigned bytes, so the palette has one color per byte value
+PALETTE_SIZE = 256
+
+# Generic vertex attribute locations of the point cloud shader
+POSITION_LOCATION = 0
+COLOR_LOCATION = 1
+CLASS_ID_LOCATION = 2
+POINT_ID_LOCATION = 1  # only used by the point id shader
+
+VERTEX_SHADER = """
+#version 120
+
+attribute vec3 position;
+attribute vec3 color;
+attribute float class_id;
+
+uniform float point_size;
+uniform vec3 attenuation;  // constant, linear and quadratic distance attenuation
+
+varying vec3 point_color;
+varying float point_class_id;
+
+void main() {
+    vec4 eye_position = gl_ModelViewMatrix * vec4(position, 1.0);
+    gl_Position = gl_ProjectionMatrix * eye_position;
+
+    float d = length(eye_position.xyz);
+    gl_PointSize = clamp(
+        point_size / sqrt(attenuation.x + attenuation.y * d + attenuation.z * d * d),
+        1.0,
+        200.0
+    );
+    point_color = color;
+    point_class_id = class_id;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+
+uniform sampler2D palette;
+uniform float mix_ratio;  // 0 shows the point colors only
+
+varying vec3 point_color;
+varying float point_class_id;
+
+void main() {
+    vec2 palette_coord = vec2((point_class_id + 0.5) / %(palette_size)d.0, 0.5);
+    vec3 label_color = texture2D(palette, palette_coord).rgb;
+    gl_FragColor = vec4(mix(point_color, label_color, mix_ratio), 1.0);
+}
+""" % {"palette_size": PALETTE_SIZE}
+
+
+ID_VERTEX_SHADER = """
+#version 120
+
+attribute vec3 position;
+attribute vec4 point_id;  // index + 1 as normalized little-endian bytes
+
+uniform mat4 modelview;
+uniform mat4 projection;
+uniform float point_size;
+uniform vec3 attenuation;
+
+varying vec4 point_id_color;
+
+void main() {
+    vec4 eye_position = modelview * vec4(position, 1.0);
+    gl_Position = projection * eye_position;
+
+    float d = length(eye_position.xyz);
+    gl_PointSize = clamp(
+        point_size / sqrt(attenuation.x + attenuation.y * d + attenuation.z * d * d),
+        1.0,
+        200.0
+    );
+    point_id_color = point_id;
+}
+"""
+
+ID_FRAGMENT_SHADER = """
+#version 120
+
+varying vec4 point_id_color;
+
+void main() {
+    gl_FragColor = point_id_color;
+}
+"""
+
+
+def link_program(
+    vertex_source: str, fragment_source: str, attributes: Dict[int, str]
+) -> int:
+    """Compile and link a shader program with fixed generic attribute locations."""
+    vertex_shader = shaders.compileShader(vertex_source, GL.GL_VERTEX_SHADER)
+    fragment_shader = shaders.compileShader(fragment_source, GL.GL_FRAGMENT_SHADER)
+    program = GL.glCreateProgram()
+    GL.glAttachShader(program, vertex_shader)
+    GL.glAttachShader(program, fragment_shader)
+    for location, name in attributes.items():
+        GL.glBindAttribLocation(program, location, name)
+    GL.glLinkProgram(program)
+    if GL.glGetProgramiv(program, GL.GL_LINK_STATUS) != GL.GL_TRUE:
+        raise RuntimeError(
+            f"Linking the point cloud shader failed: {GL.glGetProgramInfoLog(program)}"
+        )
+    GL.glDeleteShader(vertex_shader)
+    GL.glDeleteShader(fragment_shader)
+    return program
+
+
+def get_palette_texture_data(
+    class_colors: Tuple[Tuple[int, Tuple[float, float, float]], ...],
+) -> npt.NDArray[np.float32]:
+    """Return the (1, PALETTE_SIZE, 3) palette with the color of each class at its id."""
+    data = np.zeros((1, PALETTE_SIZE, 3), dtype=np.float32)
+    for class_id, color in class_colors:
+        data[0, class_id % PALETTE_SIZE] = color  # negative ids are wrapped like uint8
+    return data
+
+
+class PointCloudShader(object):
+    """Compiled shader program with the class color palette of the point cloud.
+
+    Must be created and used while the OpenGL context of the viewer is current.
+    """
+
+    def __init__(self) -> None:
+        self.program = link_program(
+            VERTEX_SHADER,
+            FRAGMENT_SHADER,
+            {
+                POSITION_LOCATION: "position",
+                COLOR_LOCATION: "color",
+                CLASS_ID_LOCATION: "class_id",
+            },
+        )
+
+        self.uniforms = {
+            name: GL.glGetUniformLocation(self.program, name)
+            for name in ["point_size", "attenuation", "palette", "mix_ratio"]
+        }
+
+        self.palette_texture = GL.glGenTextures(1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.palette_texture)
+        for parameter in [GL.GL_TEXTURE_MIN_FILTER, GL.GL_TEXTURE_MAG_FILTER]:
+            GL.glTexParameteri(GL.GL_TEXTURE_2D, parameter, GL.GL_NEAREST)
+        for parameter in [GL.GL_TEXTURE_WRAP_S, GL.GL_TEXTURE_WRAP_T]:
+            GL.glTexParameteri(GL.GL_TEXTURE_2D, parameter, GL.GL_CLAMP_TO_EDGE)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        self.palette_key: Optional[tuple] = None
+        logging.info("Compiled point cloud shader.")
+
+    def set_palette(
+        self, class_colors: Tuple[Tuple[int, Tuple[float, float, float]], ...]
+    ) -> None:
+        """Upload the class colors (id, rgb) into the palette texture if they changed."""
+        if class_colors == self.palette_key:
+            return
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.palette_texture)
+        GL.glTexImage2D(
+            GL.GL_TEXTURE_2D,
+            0,
+            GL.GL_RGB,
+            PALETTE_SIZE,
+            1,
+            0,
+            GL.GL_RGB,
+            GL.GL_FLOAT,
+            get_palette_texture_data(class_colors),
+        )
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        self.palette_key = class_colors
+
+    def use(
+        self,
+        point_size: float,
+        attenuation: Tuple[float, float, float],
+        mix_ratio: float,
+    ) -> None:
+        GL.glUseProgram(self.program)
+        GL.glUniform1f(self.uniforms["point_size"], point_size)
+        GL.glUniform3f(self.uniforms["attenuation"], *attenuation)
+        GL.glUniform1f(self.uniforms["mix_ratio"], mix_ratio)
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.palette_texture)
+        GL.glUniform1i(self.uniforms["palette"], 0)
+
+    @staticmethod
+    def release() -> None:
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        GL.glUseProgram(0)
+
+
+class PointIdShader(object):
+    """Shader program that draws each point with its index + 1 as RGBA8 color.
+
+    Uses explicit matrices, so it does not depend on the fixed-function matrix stack.
+    """
+
+    def __init__(self) -> None:
+        self.program = link_program(
+            ID_VERTEX_SHADER,
+            ID_FRAGMENT_SHADER,
+            {POSITION_LOCATION: "position", POINT_ID_LOCATION: "point_id"},
+        )
+        self.uniforms = {
+            name: GL.glGetUniformLocation(self.program, name)
+            for name in ["modelview", "projection", "point_size", "attenuation"]
+        }
+
+    def use(
+        self,
+        modelview: npt.NDArray,
+        projection: npt.NDArray,
+        point_size: float,
+        attenuation: Tuple[float, float, float],
+    ) -> None:
+        GL.glUseProgram(self.program)
+        # row-major matrices, transposed by OpenGL
+        GL.glUniformMatrix4fv(
+            self.uniforms["modelview"], 1, GL.GL_TRUE, modelview.astype(np.float32)
+        )
+        GL.glUniformMatrix4fv(
+            self.uniforms["projection"], 1, GL.GL_TRUE, projection.astype(np.float32)
+        )
+        GL.glUniform1f(self.uniforms["point_size"], point_size)
+        GL.glUniform3f(self.uniforms["attenuation"], *attenuation)
+
+    @staticmethod
+    def release() -> None:
+        GL.glUseProgram(0)
@@ -0,0 +1,329 @@
+"""
+Uniform voxel grid over the points of a point cloud for neighbourhood queries.
+The points are not copied: the index only keeps their order sorted by cell and the
+first position of each occupied cell, which are looked up with binary search.
+"""
+
+import functools
+import logging
+import time
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+POINTS_PER_CELL = 32  # average number of points in an occupied cell
+
+
+class SpatialIndex(object):
+    """Voxel grid with k-nearest neighbour, radius and ray queries."""
+
+    def __init__(
+        self, points: npt.NDArray[np.float32], points_per_cell: int = POINTS_PER_CELL
+    ) -> None:
+        start = time.perf_counter()
+        self.points = points
+        self.mins = points.min(axis=0).astype(np.float64)
+        self.maxs = points.max(axis=0).astype(np.float64)
+        self.cell_size = self.get_cell_size(
+            points, self.mins, self.maxs, points_per_cell
+        )
+        self.shape = (
+            np.floor((self.maxs - self.mins) / self.cell_size).astype(np.int64) + 1
+        )
+
+        keys = self.get_cell_keys(self.get_cells(points))
+        index_dtype = np.int32 if len(points) < np.iinfo(np.int32).max else np.int64
+        self.order = np.argsort(keys, kind="stable").astype(index_dtype)
+        sorted_keys = keys[self.order]
+        first = np.flatnonzero(np.diff(sorted_keys)) + 1
+        self.cell_keys = sorted_keys[np.concatenate([[0], first])]
+        self.cell_starts = np.concatenate([[0], first, [len(points)]])
+        self._cell_coordinates: Optional[npt.NDArray[np.int64]] = None
+        logging.info(
+            f"Built spatial index with {len(self.cell_keys)} cells of "
+            f"{self.cell_size:.3f} m in {time.perf_counter() - start:.2f} s."
+        )
+
+    @staticmethod
+    def get_cell_size(
+        points: npt.NDArray, mins: npt.NDArray, maxs: npt.NDArray, points_per_cell: int
+    ) -> float:
+        """Cell size for the given number of points per occupied cell.
+
+        Starts from the size for uniformly filled bounds and shrinks it by the fraction of
+        occupied cells in a sample, as scans mostly cover surfaces.
+        """
+        extent = np.maximum(maxs - mins, 1e-6)
+        cells = max(len(points) / points_per_cell, 1)
+        cell_size = float(np.cbrt(np.prod(extent) / cells))
+        sample = points[:: max(1, len(points) // 100_000)]
+        for _ in range(3):
+            occupied = len(np.unique(np.floor((sample - mins) / cell_size), axis=0))
+            expected = min(cells, len(sample))
+            if occupied >= 0.5 * expected or cell_size < 1e-3:
+                break
+            cell_size *= np.sqrt(occupied / expected)  # surfaces scale quadratically
+        return max(cell_size, 1e-3)
+
+    @property
+    def nbytes(self) -> int:
+        return self.order.nbytes + self.cell_keys.nbytes + self.cell_starts.nbytes
+
+    def get_cells(self, points: npt.ArrayLike) -> npt.NDArray[np.int64]:
+        return np.floor((np.asarray(points) - self.mins) / self.cell_size).astype(
+            np.int64
+        )
+
+    def get_cell_keys(self, cells: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+        return (cells[..., 0] * self.shape[1] + cells[..., 1]) * self.shape[2] + cells[
+            ..., 2
+        ]
+
+    def get_points_in_cells(self, cells: npt.NDArray[np.int64]) -> npt.NDArray:
+        """Ids of all points in the given (M, 3) cells."""
+        inside = np.all((cells >= 0) & (cells < self.shape), axis=1)
+        keys = np.unique(self.get_cell_keys(cells[inside]))
+        positions = np.searchsorted(self.cell_keys, keys)
+        positions = positions[positions < len(self.cell_keys)]
+        positions = positions[self.cell_keys[positions] == keys[: len(positions)]]
+        return self.get_points_at_positions(positions)
+
+    def get_points_at_positions(self, positions: npt.NDArray) -> npt.NDArray:
+        """Ids of all points in the occupied cells with the given positions."""
+        if not len(positions):
+            return np.array([], dtype=self.order.dtype)
+        starts, stops = self.cell_starts[positions], self.cell_starts[positions + 1]
+        lengths = stops - starts
+        # concatenated ranges start:stop of all cells
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.order[offsets + np.arange(lengths.sum())]
+
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def get_ring_offsets(rings: int) -> npt.NDArray[np.int64]:
+        """Offsets (M, 3) of the cells up to `rings` cells away from a cell."""
+        steps = np.arange(-rings, rings + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1)
+        return offsets.reshape(-1, 3)
+
+    def get_cells_in_range(
+        self, center_cell: npt.NDArray[np.int64], rings: int
+    ) -> npt.NDArray[np.int64]:
+        return center_cell + self.get_ring_offsets(rings)
+
+    @property
+    def cell_coordinates(self) -> npt.NDArray[np.int64]:
+        """Grid coordinates (M, 3) of the occupied cells, computed on first use."""
+        if self._cell_coordinates is None:
+            yz, z = np.divmod(self.cell_keys, self.shape[2])
+            x, y = np.divmod(yz, self.shape[1])
+            self._cell_coordinates = np.stack([x, y, z], axis=1)
+        return self._cell_coordinates
+
+    def query_aabb_candidates(
+        self, mins: npt.ArrayLike, maxs: npt.ArrayLike
+    ) -> npt.NDArray:
+        """Ids of the points in the cells that overlap the axis-aligned box.
+
+        This is a superset of the points inside the box. Small boxes look up their
+        cells, large ones filter the occupied cells instead of enumerating the range.
+        """
+        mins, maxs = np.asarray(mins), np.asarray(maxs)
+        if np.any(maxs < self.mins) or np.any(mins > self.maxs):
+            return np.array([], dtype=self.order.dtype)
+        lower = np.clip(self.get_cells(mins), 0, self.shape - 1)
+        upper = np.clip(self.get_cells(maxs), 0, self.shape - 1)
+        if np.prod(upper - lower + 1) <= len(self.cell_keys):
+            axes = [np.arange(low, up + 1) for low, up in zip(lower, upper)]
+            cells = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+            return self.get_points_in_cells(cells.reshape(-1, 3))
+        coordinates = self.cell_coordinates
+        overlapping = np.all((coordinates >= lower) & (coordinates <= upper), axis=1)
+        return self.get_points_at_positions(np.flatnonzero(overlapping))
+
+    def query_radius(self, point: npt.ArrayLike, radius: float) -> npt.NDArray:
+        """Ids of the points within the radius around the point, sorted by distance."""
+        point = np.asarray(point, dtype=np.float64)
+        rings = int(np.ceil(radius / self.cell_size))
+        candidates = self.get_points_in_cells(
+            self.get_cells_in_range(self.get_cells(point), rings)
+        )
+        distances = np.linalg.norm(self.points[candidates] - point, axis=1)
+        inside = distances <= radius
+        return candidates[inside][np.argsort(distances[inside], kind="stable")]
+
+    def query_knn(
+        self, point: npt.ArrayLike, k: int = 1
+    ) -> Tuple[npt.NDArray, npt.NDArray]:
+        """Ids and distances of the k nearest points, sorted by distance."""
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self.points))
+        center_cell = self.get_cells(point)
+        # rings needed until the whole grid is searched
+        max_rings = (
+            int(np.max(np.maximum(center_cell, self.shape - 1 - center_cell).clip(0)))
+            + 1
+        )
+        rings = 1
+        while True:
+            candidates = self.get_points_in_cells(
+                self.get_cells_in_range(center_cell, rings)
+            )
+            if len(candidates) >= k:
+                distances = np.linalg.norm(self.points[candidates] - point, axis=1)
+                nearest = np.argsort(distances, kind="stable")[:k]
+                # all points within `rings - 1` cells around the point were searched
+                if distances[nearest[-1]] <= (rings - 1) * self.cell_size or (
+                    rings >= max_rings
+                ):
+                    return candidates[nearest], distances[nearest]
+            elif rings >= max_rings:
+                return np.array([], dtype=self.order.dtype), np.array([])
+            rings = min(2 * rings, max_rings)
+
+    def clip_ray(
+        self,
+        origin: npt.NDArray,
+        unit_direction: npt.NDArray,
+        length: float,
+        margin: float,
+    ) -> Tuple[float, float]:
+        """Range of the ray parameter inside the bounds of the points plus the margin."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_lower = (self.mins - margin - origin) / unit_direction
+            t_upper = (self.maxs + margin - origin) / unit_direction
+        t_near = np.nanmax(np.minimum(t_lower, t_upper), initial=0)
+        t_far = np.nanmin(np.maximum(t_lower, t_upper), initial=length)
+        return float(t_near), float(t_far)
+
+    def iter_ray_cells(
+        self,
+        origin: npt.NDArray,
+        unit_direction: npt.NDArray,
+        length: float,
+        radius: float,
+        radius_slope: float,
+        batch_size: int = 16,
+    ) -> Iterator[Tuple[npt.NDArray[np.int64], float]]:
+        """Cells within the cone around the ray in batches from front to back.
+
+        The ray is sampled every half cell; each sample adds the cells within the cone
+        radius. Every point inside the cone with a ray parameter up to the yielded value
+        is in the cells of this batch or an earlier one. The batches start small and
+        double in size, so close hits visit few cells and long misses few batches.
+        """
+        t_near, t_far = self.clip_ray(
+            origin, unit_direction, length, radius + radius_slope * length
+        )
+        if t_near > t_far:
+            return
+        # the cone can't be wider than at the end of the first clipped range
+        t_near, t_far = self.clip_ray(
+            origin, unit_direction, length, radius + radius_slope * t_far
+        )
+        step = self.cell_size / 2
+        samples = np.arange(t_near, t_far + step, step)
+        start = 0
+        while start < len(samples):
+            batch = samples[start : start + batch_size]
+            start, batch_size = start + batch_size, 2 * batch_size
+            cells = self.get_cells(origin + batch[:, None] * unit_direction)
+            # the cell of each point is at most `rings` away from its nearest sample
+            max_radius = radius + radius_slope * (batch[-1] + step)
+            rings = int(np.ceil((max_radius + step / 2) / self.cell_size))
+            cells = (cells[:, None] + self.get_ring_offsets(rings)[None]).reshape(-1, 3)
+
+            # skip the neighbouring cells that don't touch the cone
+            centers = self.mins + (cells + 0.5) * self.cell_size - origin
+            t = centers @ unit_direction
+            distances = np.linalg.norm(centers - t[:, None] * unit_direction, axis=1)
+            cell_radius = np.sqrt(3) / 2 * self.cell_size
+            near = distances <= radius + radius_slope * np.maximum(t, 0) + cell_radius
+            yield cells[near], batch[-1] + step / 2
+
+    def get_cone_hits(
+        self,
+        cells: npt.NDArray[np.int64],
+        origin: npt.NDArray,
+        unit_direction: npt.NDArray,
+        length: float,
+        radius: float,
+        radius_slope: float,
+    ) -> Tuple[npt.NDArray, npt.NDArray]:
+        """Ids and ray parameters (in meters) of the points of the cells in the cone."""
+        candidates = self.get_points_in_cells(cells)
+        offsets = self.points[candidates] - origin
+        t = offsets @ unit_direction
+        distances = np.linalg.norm(offsets - t[:, None] * unit_direction, axis=1)
+        inside = (t >= 0) & (t <= length) & (distances <= radius + radius_slope * t)
+        return candidates[inside], t[inside]
+
+    def query_ray(
+        self,
+        origin: npt.ArrayLike,
+        direction: npt.ArrayLike,
+        radius: float,
+        radius_slope: float = 0.0,
+    ) -> Tuple[npt.NDArray, npt.NDArray]:
+        """Points within a cone around the ray, sorted by their distance along the ray.
+
+        The cone has the radius at the origin and widens by `radius_slope` per meter.
+        Only the cells along the ray are visited.
+
+        :return: ids of the points and their ray parameters (in units of `direction`)
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        length = float(np.linalg.norm(direction))
+        unit_direction = direction / length
+
+        hits = [
+            self.get_cone_hits(
+                cells, origin, unit_direction, length, radius, radius_slope
+            )
+            for cells, _ in self.iter_ray_cells(
+                origin, unit_direction, length, radius, radius_slope
+            )
+        ]
+        if not hits:
+            return np.array([], dtype=self.order.dtype), np.array([])
+        # neighbouring batches share cells
+        ids, first = np.unique(np.concatenate([h[0] for h in hits]), return_index=True)
+        t = np.concatenate([h[1] for h in hits])[first]
+        order = np.argsort(t, kind="stable")
+        return ids[order], t[order] / length
+
+    def query_ray_first(
+        self,
+        origin: npt.ArrayLike,
+        direction: npt.ArrayLike,
+        radius: float,
+        radius_slope: float = 0.0,
+    ) -> Optional[Tuple[int, float]]:
+        """Point within the cone around the ray with the smallest ray parameter.
+
+        Visits the cells from front to back and stops at the first batch of cells
+        after which no closer point can follow.
+
+        :return: id of the point and its ray parameter (in units of `direction`)
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.float64)
+        length = float(np.linalg.norm(direction))
+        unit_direction = direction / length
+
+        best: Optional[Tuple[int, float]] = None
+        for cells, complete_t in self.iter_ray_cells(
+            origin, unit_direction, length, radius, radius_slope
+        ):
+            ids, t = self.get_cone_hits(
+                cells, origin, unit_direction, length, radius, radius_slope
+            )
+            if len(ids):
+                closest = np.argmin(t)
+                if best is None or t[closest] < best[1]:
+                    best = int(ids[closest]), float(t[closest])
+            if best is not None and best[1] <= complete_t:
+                break
+        return None if best is None else (best[0], best[1] / length)
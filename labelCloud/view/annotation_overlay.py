@@ -0,0 +1,152 @@
+"""
+Draws the edges of all bounding boxes and all picked points with one draw call each.
+The vertices and class colors of the labels are kept in two vertex buffer objects
+(positions and colors interleaved), only the labels that changed are uploaded again.
+"""
+
+import ctypes
+from typing import Callable, Generic, Hashable, List, Optional, Sequence, TypeVar, Union
+
+import numpy as np
+import numpy.typing as npt
+import OpenGL.GL as GL
+
+from ..control.config_manager import config
+from ..definitions import BBOX_EDGES
+from ..io.labels.config import LabelConfig
+from ..model.bbox import BBox
+from ..model.point import Point
+
+VERTEX_SIZE = 6  # x, y, z, r, g, b as float32
+VERTEX_BYTES = VERTEX_SIZE * 4
+
+Label = TypeVar("Label", bound=Union[BBox, Point])
+
+
+def get_bbox_key(bbox: BBox) -> Hashable:
+    return bbox.version  # unique for each box geometry
+
+
+def get_point_key(point: Point) -> Hashable:
+    return tuple(point.point)
+
+
+class OverlayBuffer(Generic[Label]):
+    """Vertex buffer with a fixed number of vertices for each label."""
+
+    def __init__(
+        self,
+        vertices_per_item: int,
+        get_key: Callable[[Label], Hashable],
+        get_vertices: Callable[[Label], npt.ArrayLike],
+    ) -> None:
+        self.vertices_per_item = vertices_per_item
+        self.get_key = get_key
+        self.get_vertices = get_vertices
+
+        self.vbo: Optional[int] = None
+        self.data = np.empty((0, VERTEX_SIZE), dtype=np.float32)
+        self.keys: List[Hashable] = []
+
+        self.uploaded_items = 0  # number of labels uploaded since the creation
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def update(self, items: Sequence[Label], colors: Sequence[Hashable]) -> None:
+        """Recompute and upload the vertices of all labels whose key has changed."""
+        keys = [(self.get_key(item), color) for item, color in zip(items, colors)]
+        if len(keys) != len(self.keys):
+            self.keys = [None] * len(keys)
+            self.data = np.empty(
+                (len(keys) * self.vertices_per_item, VERTEX_SIZE), dtype=np.float32
+            )
+            changed = list(range(len(keys)))
+            reallocate = True
+        else:
+            changed = [i for i, key in enumerate(keys) if key != self.keys[i]]
+            reallocate = False
+        if not changed:
+            return
+
+        k = self.vertices_per_item
+        for i in changed:
+            self.data[i * k : (i + 1) * k, :3] = self.get_vertices(items[i])
+            self.data[i * k : (i + 1) * k, 3:] = colors[i]
+            self.keys[i] = keys[i]
+        self.uploaded_items += len(changed)
+
+        if self.vbo is None:
+            self.vbo = GL.glGenBuffers(1)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+        if reallocate:
+            GL.glBufferData(
+                GL.GL_ARRAY_BUFFER, self.data.nbytes, self.data, GL.GL_DYNAMIC_DRAW
+            )
+        else:  # upload the consecutive ranges of changed labels
+            for run in np.split(changed, np.where(np.diff(changed) != 1)[0] + 1):
+                start, stop = run[0] * k, (run[-1] + 1) * k
+                GL.glBufferSubData(
+                    GL.GL_ARRAY_BUFFER,
+                    start * VERTEX_BYTES,
+                    (stop - start) * VERTEX_BYTES,
+                    self.data[start:stop],
+                )
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+    def draw(self, mode: int) -> None:
+        if self.vbo is None or not len(self):
+            return
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glEnableClientState(GL.GL_COLOR_ARRAY)
+        GL.glVertexPointer(3, GL.GL_FLOAT, VERTEX_BYTES, ctypes.c_void_p(0))
+        GL.glColorPointer(3, GL.GL_FLOAT, VERTEX_BYTES, ctypes.c_void_p(12))
+        GL.glDrawArrays(mode, 0, len(self))
+        GL.glDisableClientState(GL.GL_COLOR_ARRAY)
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+
+class AnnotationOverlay(object):
+    """Draws all bounding boxes and picked points in their class colors.
+
+    Must be drawn while the OpenGL context of the viewer is current.
+    """
+
+    def __init__(self) -> None:
+        self.lines: OverlayBuffer[BBox] = OverlayBuffer(
+            2 * len(BBOX_EDGES), get_bbox_key, BBox.get_edge_vertices
+        )
+        self.points: OverlayBuffer[Point] = OverlayBuffer(
+            1, get_point_key, lambda point: point.point
+        )
+
+    def update(self, items: Sequence[object]) -> None:
+        label_config = LabelConfig()
+        bboxes = [item for item in items if isinstance(item, BBox)]
+        points = [item for item in items if isinstance(item, Point)]
+        self.lines.update(
+            bboxes, [label_config.get_class_color(b.classname) for b in bboxes]
+        )
+        self.points.update(
+            points, [label_config.get_class_color(p.classname) for p in points]
+        )
+
+    def draw(self, items: Sequence[object]) -> None:
+        self.update(items)
+        GL.glPushAttrib(GL.GL_LINE_BIT | GL.GL_POINT_BIT | GL.GL_ENABLE_BIT)
+
+        GL.glLineWidth(2)
+        self.lines.draw(GL.GL_LINES)
+
+        # Fixed-size points, same as `oglhelper.draw_points`
+        GL.glDisable(GL.GL_PROGRAM_POINT_SIZE)
+        GL.glDisable(GL.GL_POINT_SMOOTH)
+        GL.glPointSize(
+            max(1.0, min(config.getfloat("POINTCLOUD", "POINT_SIZE") * 2.5, 20))
+        )
+        GL.glPointParameterfv(GL.GL_POINT_DISTANCE_ATTENUATION, [1.0, 0.0, 0.0])
+        self.points.draw(GL.GL_POINTS)
+
+        GL.glPopAttrib()
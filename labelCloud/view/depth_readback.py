@@ -0,0 +1,124 @@
+"""
+Reads depth values around the cursor from the depth buffer.
+Reads for the crosshair are done asynchronously into two pixel buffer objects (PBOs)
+and collected one frame later, so the GL pipeline is not stalled. All read depth
+windows are cached by cursor position and view, so repeated queries skip the GPU.
+"""
+
+import ctypes
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import OpenGL.GL as GL
+
+# Size of the (square) depth window read around the cursor
+DEPTH_WINDOW_SIZE = 21
+DEPTH_WINDOW_BYTES = DEPTH_WINDOW_SIZE * DEPTH_WINDOW_SIZE * 4  # float32
+
+
+def get_window_origin(x: float, y: float) -> Tuple[int, int]:
+    """Lower left corner of the depth window around the (GL) pixel position."""
+    offset = DEPTH_WINDOW_SIZE // 2
+    return int(x) - offset, int(y) - offset
+
+
+class DepthReadback(object):
+    def __init__(self, cache_size: int = 64) -> None:
+        self.cache_size = cache_size
+        self.cache: "OrderedDict[Hashable, npt.NDArray[np.float32]]" = OrderedDict()
+        self.pbos: List[int] = []
+        self.pending: List[Optional[Hashable]] = [None, None]  # key read into each PBO
+
+        self.hits = 0
+        self.misses = 0
+
+    def init_gl(self) -> None:
+        """Create the pixel buffer objects, must be called with a current context."""
+        self.pbos = list(GL.glGenBuffers(2))
+        for pbo in self.pbos:
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+            GL.glBufferData(
+                GL.GL_PIXEL_PACK_BUFFER, DEPTH_WINDOW_BYTES, None, GL.GL_STREAM_READ
+            )
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        self.pending = [None, None]
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all cached depths (e.g. because the drawn point cloud has changed)."""
+        self.cache.clear()
+
+    def get(self, key: Hashable) -> Optional[npt.NDArray[np.float32]]:
+        depths = self.cache.get(key)
+        if depths is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+        return depths
+
+    def read(self, key: Hashable, x: float, y: float) -> npt.NDArray[np.float32]:
+        """Return the depth window around (x, y), read synchronously on a cache miss."""
+        depths = self.get(key)
+        if depths is None:
+            self.misses += 1
+            depths = np.asarray(
+                GL.glReadPixels(
+                    *get_window_origin(x, y),
+                    DEPTH_WINDOW_SIZE,
+                    DEPTH_WINDOW_SIZE,
+                    GL.GL_DEPTH_COMPONENT,
+                    GL.GL_FLOAT,
+                ),
+                dtype=np.float32,
+            ).reshape(DEPTH_WINDOW_SIZE, DEPTH_WINDOW_SIZE)
+            self._store(key, depths)
+        return depths
+
+    def read_async(self, key: Hashable, x: float, y: float) -> None:
+        """Start reading the depth window around (x, y) into a free PBO.
+
+        The depths are available by `get` after the next `collect`.
+        """
+        if not self.pbos or key in self.cache or key in self.pending:
+            return
+        index = self.pending.index(None) if None in self.pending else 0
+        if self.pending[index] is not None:
+            self._collect(index)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, self.pbos[index])
+        GL.glReadPixels(
+            *get_window_origin(x, y),
+            DEPTH_WINDOW_SIZE,
+            DEPTH_WINDOW_SIZE,
+            GL.GL_DEPTH_COMPONENT,
+            GL.GL_FLOAT,
+            ctypes.c_void_p(0),
+        )
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        self.pending[index] = key
+
+    @property
+    def has_pending(self) -> bool:
+        return any(key is not None for key in self.pending)
+
+    def collect(self) -> None:
+        """Move the results of reads started in earlier frames into the cache."""
+        for index, key in enumerate(self.pending):
+            if key is not None:
+                self._collect(index)
+
+    def _collect(self, index: int) -> None:
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, self.pbos[index])
+        data = GL.glGetBufferSubData(GL.GL_PIXEL_PACK_BUFFER, 0, DEPTH_WINDOW_BYTES)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        depths = np.frombuffer(np.asarray(data).tobytes(), dtype=np.float32)
+        self._store(
+            self.pending[index], depths.reshape(DEPTH_WINDOW_SIZE, DEPTH_WINDOW_SIZE)
+        )
+        self.pending[index] = None
+
+    def _store(self, key: Hashable, depths: npt.NDArray[np.float32]) -> None:
+        self.cache[key] = depths
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
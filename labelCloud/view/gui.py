@@ -29,6 +29,7 @@ from ..labeling_strategies import PickingStrategy, SpanningStrategy, PickingPoin
 from ..model.point_cloud import PointCloud
 from .settings_dialog import SettingsDialog  # type: ignore
 from .startup.dialog import StartupDialog
+from .redraw_scheduler import RedrawScheduler
 from .status_manager import StatusManager
 from .viewer import GLWidget
 
@@ -217,11 +218,13 @@ class GUI(QtWidgets.QMainWindow):
         self.act_change_class_color = QtWidgets.QAction("Change class color")
         self.act_delete_class = QtWidgets.QAction("Delete label")
         self.act_crop_pointcloud_inside = QtWidgets.QAction("Save points inside as")
+        self.act_assign_all_labels = QtWidgets.QAction("Assign points in all boxes")
         self.label_list.addActions(
             [
                 self.act_change_class_color,
                 self.act_delete_class,
                 self.act_crop_pointcloud_inside,
+                self.act_assign_all_labels,
             ]
         )
         self.label_list.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
@@ -268,16 +271,15 @@ class GUI(QtWidgets.QMainWindow):
         # Segmentation only functionalities
         if LabelConfig().type == LabelingMode.OBJECT_DETECTION:
             self.button_assign_label.setVisible(False)
+            self.act_assign_all_labels.setVisible(False)
             self.act_color_with_label.setVisible(False)
 
         # Connect with controller
         self.controller.startup(self)
 
-        # Start event cycle
-        self.timer = QtCore.QTimer(self)
-        self.timer.setInterval(20)  # period, in milliseconds
-        self.timer.timeout.connect(self.controller.loop_gui)
-        self.timer.start()
+        # Redraw whenever the scene has changed
+        self.redraw_scheduler = RedrawScheduler(self.controller.loop_gui, parent=self)
+        self.redraw_scheduler.request()
 
     # Event connectors
     def connect_events(self) -> None:
@@ -286,6 +288,7 @@ class GUI(QtWidgets.QMainWindow):
             lambda: self.controller.next_pcd(save=True)
         )
         self.button_prev_pcd.clicked.connect(self.controller.prev_pcd)
+        self.gl_widget.upload_progress.connect(self.status_manager.set_upload_progress)
 
         # BBOX CONTROL
         self.button_bbox_up.pressed.connect(
@@ -342,6 +345,9 @@ class GUI(QtWidgets.QMainWindow):
             self.controller.crop_pointcloud_inside_active_bbox
         )
         self.act_change_class_color.triggered.connect(self.change_label_color)
+        self.act_assign_all_labels.triggered.connect(
+            self.controller.bbox_controller.assign_point_label_in_all_boxes
+        )
 
         # open_2D_img
         self.button_show_image.pressed.connect(lambda: self.show_2d_image())
@@ -464,6 +470,9 @@ class GUI(QtWidgets.QMainWindow):
 
     # Collect, filter and forward events to viewer
     def eventFilter(self, event_object, event) -> bool:
+        # Any user input might change the scene
+        self.redraw_scheduler.request_for_event(event)
+
         # Keyboard Events
         if (event.type() == QEvent.KeyPress) and event_object in [
             self,
@@ -502,7 +511,11 @@ class GUI(QtWidgets.QMainWindow):
     def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
         logging.info("Closing window after saving ...")
         self.controller.save()
-        self.timer.stop()
+        self.redraw_scheduler.stop()
+        logging.info(
+            f"Computed the hovered side {self.controller.hover_recomputes} times, "
+            f"reused it {self.controller.hover_hits} times."
+        )
         a0.accept()
 
     def show_settings_dialog(self) -> None:
@@ -0,0 +1,168 @@
+"""
+Picks points by rendering their indices into an offscreen framebuffer.
+Each point is drawn with its index + 1 encoded as RGBA8 color, so the point under the
+cursor is found by reading back a single pixel. The framebuffer is only drawn again
+when the view has changed since the last pick, independent of the number of points.
+"""
+
+import logging
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+import OpenGL.GL as GL
+
+from ..utils.shaders import POINT_ID_LOCATION, POSITION_LOCATION, PointIdShader
+
+if TYPE_CHECKING:
+    from ..model import PointCloud
+    from ..utils.camera import Camera
+
+
+def encode_point_ids(no_of_points: int) -> np.ndarray:
+    """Indices + 1 as little-endian RGBA bytes (0 is the empty background)."""
+    return np.arange(1, no_of_points + 1, dtype="<u4").view(np.uint8)
+
+
+def decode_point_id(rgba: bytes) -> Optional[int]:
+    point_id = int(np.frombuffer(rgba, dtype="<u4", count=1)[0])
+    return point_id - 1 if point_id else None
+
+
+class PointIdBuffer(object):
+    """Offscreen framebuffer with the index of the visible point at each pixel.
+
+    Must be used while the OpenGL context of the viewer is current.
+    """
+
+    def __init__(self) -> None:
+        self.shader: Optional[PointIdShader] = None
+        self.fbo: Optional[int] = None
+        self.renderbuffers: Tuple[int, ...] = ()
+        self.size = (0, 0)
+        self.id_vbo: Optional[int] = None
+        self.id_vbo_points = 0  # number of point ids uploaded into `id_vbo`
+        self.outdated = True
+
+        self.renders = 0
+        self.reads = 0
+
+    @property
+    def is_ready(self) -> bool:
+        return self.fbo is not None
+
+    def init_gl(self) -> None:
+        """Compile the shader and create the framebuffer, disabled if unsupported."""
+        try:
+            self.shader = PointIdShader()
+            self.fbo = GL.glGenFramebuffers(1)
+            self.renderbuffers = tuple(GL.glGenRenderbuffers(2))
+        except Exception:
+            logging.exception("Point id buffer is not supported, picking uses depths.")
+            self.shader = self.fbo = None
+        self.size = (0, 0)
+        self.id_vbo = None
+        self.id_vbo_points = 0
+        self.outdated = True
+
+    def invalidate(self) -> None:
+        """Draw the ids again before the next pick (e.g. because the view changed)."""
+        self.outdated = True
+
+    def _resize(self, width: int, height: int) -> None:
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.fbo)
+        for renderbuffer, internal_format, attachment in zip(
+            self.renderbuffers,
+            [GL.GL_RGBA8, GL.GL_DEPTH_COMPONENT24],
+            [GL.GL_COLOR_ATTACHMENT0, GL.GL_DEPTH_ATTACHMENT],
+        ):
+            GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, renderbuffer)
+            GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, internal_format, width, height)
+            GL.glFramebufferRenderbuffer(
+                GL.GL_FRAMEBUFFER, attachment, GL.GL_RENDERBUFFER, renderbuffer
+            )
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, 0)
+        status = GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER)
+        if status != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"Point id framebuffer is incomplete ({status}).")
+        self.size = (width, height)
+
+    def _upload_point_ids(self, no_of_points: int) -> None:
+        """The ids only depend on the number of points, so the buffer is only grown."""
+        if self.id_vbo is None:
+            self.id_vbo = GL.glGenBuffers(1)
+        if no_of_points > self.id_vbo_points:
+            ids = encode_point_ids(no_of_points)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.id_vbo)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, ids.nbytes, ids, GL.GL_STATIC_DRAW)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+            self.id_vbo_points = no_of_points
+
+    def render(self, pointcloud: "PointCloud", camera: "Camera", scaled: bool) -> None:
+        """Draw the point ids with the current view, if it changed since the last draw."""
+        if not self.is_ready or not self.outdated:
+            return
+        assert self.shader is not None
+        previous_fbo = GL.glGetIntegerv(GL.GL_FRAMEBUFFER_BINDING)
+        width, height = camera.viewport[2:]
+        if self.size != (width, height):
+            self._resize(width, height)
+        self._upload_point_ids(pointcloud.get_no_of_points())
+
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.fbo)
+        GL.glPushAttrib(
+            GL.GL_COLOR_BUFFER_BIT
+            | GL.GL_DEPTH_BUFFER_BIT
+            | GL.GL_ENABLE_BIT
+            | GL.GL_VIEWPORT_BIT
+        )
+        GL.glViewport(0, 0, width, height)
+        GL.glClearColor(0, 0, 0, 0)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        GL.glEnable(GL.GL_DEPTH_TEST)
+        GL.glDepthMask(GL.GL_TRUE)
+        # ids must be written unchanged
+        for capability in [GL.GL_BLEND, GL.GL_DITHER, GL.GL_POINT_SMOOTH]:
+            GL.glDisable(capability)
+        GL.glEnable(GL.GL_PROGRAM_POINT_SIZE)
+
+        self.shader.use(
+            camera.modelview,
+            camera.projection,
+            max(1.0, pointcloud.point_size),
+            pointcloud.get_point_attenuation(scaled),
+        )
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, pointcloud.position_vbo)
+        GL.glEnableVertexAttribArray(POSITION_LOCATION)
+        GL.glVertexAttribPointer(
+            POSITION_LOCATION, 3, GL.GL_FLOAT, GL.GL_FALSE, 0, None
+        )
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.id_vbo)
+        GL.glEnableVertexAttribArray(POINT_ID_LOCATION)
+        GL.glVertexAttribPointer(
+            POINT_ID_LOCATION, 4, GL.GL_UNSIGNED_BYTE, GL.GL_TRUE, 0, None
+        )
+        GL.glDrawArrays(GL.GL_POINTS, 0, pointcloud.get_no_of_points())
+        GL.glDisableVertexAttribArray(POINT_ID_LOCATION)
+        GL.glDisableVertexAttribArray(POSITION_LOCATION)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        self.shader.release()
+
+        GL.glPopAttrib()
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, previous_fbo)
+        self.outdated = False
+        self.renders += 1
+
+    def pick(self, x: int, y: int) -> Optional[int]:
+        """Index of the point at the (GL) pixel, None for the background."""
+        if not self.is_ready or self.outdated:
+            return None
+        if not (0 <= x < self.size[0] and 0 <= y < self.size[1]):
+            return None
+        previous_fbo = GL.glGetIntegerv(GL.GL_FRAMEBUFFER_BINDING)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.fbo)
+        rgba = GL.glReadPixels(x, y, 1, 1, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, previous_fbo)
+        self.reads += 1
+        if not isinstance(rgba, bytes):  # depends on the PyOpenGL array handlers
+            rgba = np.asarray(rgba, dtype=np.uint8).tobytes()
+        return decode_point_id(rgba)
@@ -0,0 +1,72 @@
+import logging
+from typing import Callable, Optional
+
+from PyQt5 import QtCore, QtGui
+from PyQt5.QtCore import QEvent
+
+# Events that might change the scene (camera, labels, cursor or previews)
+REDRAW_EVENTS = {
+    QEvent.Type.MouseMove,
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.MouseButtonRelease,
+    QEvent.Type.MouseButtonDblClick,
+    QEvent.Type.Wheel,
+    QEvent.Type.KeyPress,
+    QEvent.Type.KeyRelease,
+}
+DEFAULT_REFRESH_RATE = 60.0  # Hz, if the screen doesn't report its refresh rate
+
+
+class RedrawScheduler(QtCore.QObject):
+    """Redraws the viewer only if the scene has been marked dirty.
+
+    Any number of redraw requests between two frames are coalesced into a single
+    redraw, which happens at most once per screen refresh. Without requests (e.g. no
+    user input) nothing is redrawn at all.
+    """
+
+    def __init__(
+        self, redraw: Callable[[], None], parent: Optional[QtCore.QObject] = None
+    ) -> None:
+        super().__init__(parent)
+        self.redraw = redraw
+
+        screen = QtGui.QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen else 0
+        self.frame_interval = 1000 / (refresh_rate or DEFAULT_REFRESH_RATE)  # in ms
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._redraw)
+        self.last_redraw = QtCore.QElapsedTimer()
+        self.last_redraw.start()
+
+        self.redraws = 0
+        self.requests = 0
+
+    @property
+    def dirty(self) -> bool:
+        return self.timer.isActive()
+
+    def request(self) -> None:
+        """Mark the scene as dirty and schedule a redraw if none is pending."""
+        self.requests += 1
+        if self.timer.isActive():
+            return  # coalesced with the pending redraw
+        remaining = self.frame_interval - self.last_redraw.elapsed()
+        self.timer.start(max(0, int(remaining)))
+
+    def request_for_event(self, event: QEvent) -> None:
+        if event.type() in REDRAW_EVENTS:
+            self.request()
+
+    def stop(self) -> None:
+        self.timer.stop()
+        logging.info(
+            f"Redrew the scene {self.redraws} times for {self.requests} requests."
+        )
+
+    def _redraw(self) -> None:
+        self.last_redraw.restart()
+        self.redraws += 1
+        self.redraw()
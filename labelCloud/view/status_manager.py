@@ -23,11 +23,22 @@ class StatusManager:
         self.message_label.setAlignment(QtCore.Qt.AlignLeft)
         self.status_bar.addWidget(self.message_label, stretch=1)
 
+        # Progress of uploading a large point cloud, hidden once it is drawn completely
+        self.upload_progress_bar = QtWidgets.QProgressBar()
+        self.upload_progress_bar.setFormat("Uploading points %p%")
+        self.upload_progress_bar.setMaximumWidth(200)
+        self.upload_progress_bar.hide()
+        self.status_bar.addPermanentWidget(self.upload_progress_bar)
+
         self.msg_context = Context.DEFAULT
 
     def set_mode(self, mode: Mode) -> None:
         self.mode_label.setText(mode.value)
 
+    def set_upload_progress(self, progress: float) -> None:
+        self.upload_progress_bar.setValue(int(progress * 100))
+        self.upload_progress_bar.setVisible(progress < 1)
+
     def set_message(self, message: str, context: Context = Context.DEFAULT) -> None:
         if context >= self.msg_context:
             self.message_label.setText(message)
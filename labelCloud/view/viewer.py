@@ -5,7 +5,6 @@ from typing import Optional, Tuple, Union
 import numpy as np
 import numpy.typing as npt
 import OpenGL.GL as GL
-from OpenGL import GLU
 from PyQt5 import QtGui, QtOpenGL, QtCore
 
 from ..control.alignmode import AlignMode
@@ -15,10 +14,18 @@ from ..control.drawing_manager import DrawingManager
 from ..control.pcd_manager import PointCloudManger
 from ..definitions.types import Color4f, Point2D
 from ..utils import oglhelper
+from ..utils.camera import Camera
+from ..utils.shaders import PointCloudShader
+from .annotation_overlay import AnnotationOverlay
+from .depth_readback import DEPTH_WINDOW_SIZE, DepthReadback
+from .point_id_buffer import PointIdBuffer
 
 from ..model.bbox import BBox
 from ..model.point import Point
 
+LOD_REFINE_DELAY = 150  # ms without camera movement until all points are drawn
+
+
 @contextmanager
 def ignore_depth_mask():
     GL.glDepthMask(GL.GL_FALSE)
@@ -30,8 +37,11 @@ def ignore_depth_mask():
 
 # Main widget for presenting the point cloud
 class GLWidget(QtOpenGL.QGLWidget):
+    upload_progress = QtCore.pyqtSignal(float)  # of the point cloud buffers
+
     NEAR_PLANE = config.getfloat("USER_INTERFACE", "near_plane")
     FAR_PLANE = config.getfloat("USER_INTERFACE", "far_plane")
+    FIELD_OF_VIEW = 45.0
 
     def __init__(self, parent=None) -> None:
         QtOpenGL.QGLWidget.__init__(self, parent)
@@ -39,8 +49,20 @@ class GLWidget(QtOpenGL.QGLWidget):
             True
         )  # mouseMoveEvent is called also without button pressed
 
-        self.modelview: Optional[npt.NDArray] = None
-        self.projection: Optional[npt.NDArray] = None
+        self.camera = Camera(
+            GLWidget.FIELD_OF_VIEW, GLWidget.NEAR_PLANE, GLWidget.FAR_PLANE
+        )
+        self.depth_readback = DepthReadback()
+        self.point_id_buffer = PointIdBuffer()
+        self.drawn_scene: Optional[tuple] = None  # everything that affects the depths
+        # levels of detail: fewer points while the camera moves, all once it stops
+        self.drawn_camera_version = -1
+        self.lod_refine_timer = QtCore.QTimer(self)
+        self.lod_refine_timer.setSingleShot(True)
+        self.lod_refine_timer.timeout.connect(self.update)
+        self.drawn_upload_progress = 1.0
+        self.crosshair_world: Optional[Tuple[float, float, float]] = None
+        self.annotation_overlay = AnnotationOverlay()
         self.DEVICE_PIXEL_RATIO: float = (
             self.devicePixelRatioF()
         )  # 1 = normal; 2 = retina display
@@ -61,6 +83,7 @@ class GLWidget(QtOpenGL.QGLWidget):
         self.align_mode: Union[AlignMode, None] = None
 
         self.current_label_text: Optional[str] = None
+        self.pointcloud_shader: Optional[PointCloudShader] = None
 
     def set_pointcloud_controller(self, pcd_manager: PointCloudManger) -> None:
         self.pcd_manager = pcd_manager
@@ -81,6 +104,10 @@ class GLWidget(QtOpenGL.QGLWidget):
         GL.glEnable(GL.GL_DEPTH_TEST)  # for visualization of depth
         GL.glEnable(GL.GL_BLEND)  # enable transparency
         GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+        self.pointcloud_shader = PointCloudShader()
+        self.depth_readback.init_gl()
+        if config.getboolean("LABEL", "point_picking_id_buffer"):
+            self.point_id_buffer.init_gl()
         logging.info("Intialized widget.")
 
         # Must be written again, due to buffer clearing
@@ -89,11 +116,9 @@ class GLWidget(QtOpenGL.QGLWidget):
     def resizeGL(self, width, height) -> None:
         logging.info("Resized widget.")
         GL.glViewport(0, 0, width, height)
+        self.camera.set_viewport(width, height)
         GL.glMatrixMode(GL.GL_PROJECTION)
-        GL.glLoadIdentity()
-        aspect = width / float(height)
-
-        GLU.gluPerspective(45.0, aspect, GLWidget.NEAR_PLANE, GLWidget.FAR_PLANE)
+        GL.glLoadMatrixd(self.camera.projection.T)  # same as gluPerspective
         GL.glMatrixMode(GL.GL_MODELVIEW)
 
 
@@ -125,18 +150,20 @@ class GLWidget(QtOpenGL.QGLWidget):
         GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
         GL.glPushMatrix()  # push the current matrix to the current stack
 
-
+        pointcloud = self.pcd_manager.pointcloud
+        self.update_camera_pose()
+        self.upload_next_chunk()
+        # only the visible chunks, at the level of detail within the point budget
+        draw_ranges = pointcloud.get_draw_ranges(self.camera, self.get_point_budget())  # type: ignore
 
         if config.getboolean("USER_INTERFACE", "scaled_point_size"):
             # Draw point cloud
-            self.pcd_manager.pointcloud.draw_pointcloud()  # type: ignore
+            self.pcd_manager.pointcloud.draw_pointcloud(self.pointcloud_shader, draw_ranges)  # type: ignore
         else:
             # Draw point cloud
-            self.pcd_manager.pointcloud.draw_pointcloud_()  # type: ignore
+            self.pcd_manager.pointcloud.draw_pointcloud_(self.pointcloud_shader, draw_ranges)  # type: ignore
 
-        # Get actual matrices for click unprojection
-        self.modelview = GL.glGetDoublev(GL.GL_MODELVIEW_MATRIX)
-        self.projection = GL.glGetDoublev(GL.GL_PROJECTION_MATRIX)
+        self.update_drawn_scene()
 
         with ignore_depth_mask():  # Do not write decoration and preview elements in depth buffer
             if config.getboolean("USER_INTERFACE", "show_floor"):
@@ -147,8 +174,9 @@ class GLWidget(QtOpenGL.QGLWidget):
 
             # Draw crosshair/ cursor in 3D world
             if self.crosshair_pos:
-                cx, cy, cz = self.get_world_coords(*self.crosshair_pos, correction=True)
-                oglhelper.draw_crosshair(cx, cy, cz, color=self.crosshair_col)
+                crosshair = self.get_crosshair_coords()
+                if crosshair is not None:
+                    oglhelper.draw_crosshair(*crosshair, color=self.crosshair_col)
 
             if self.drawing_mode.has_preview():
                 self.drawing_mode.draw_preview()
@@ -170,46 +198,163 @@ class GLWidget(QtOpenGL.QGLWidget):
                 self.unified_annotation_controller.get_active_item().draw_orientation()
 
 
-        for label in  self.unified_annotation_controller.items:
-            label.draw()
+        # All labels with two draw calls, only changed labels are uploaded again
+        self.annotation_overlay.draw(self.unified_annotation_controller.items)
 
         GL.glPopMatrix()  # restore the previous modelview matrix
 
 
+    def update_camera_pose(self) -> None:
+        """Keep the matrices for unprojection, only recomputed if the view changed."""
+        pointcloud = self.pcd_manager.pointcloud
+        if pointcloud is None:
+            return
+        self.camera.set_pose(
+            pointcloud.get_translation(),
+            pointcloud.get_rotations(),
+            pointcloud.get_rotation_pivot(),
+        )
+
+    def upload_next_chunk(self) -> None:
+        """Upload one chunk of a large point cloud per frame, the prefix is drawn."""
+        pointcloud = self.pcd_manager.pointcloud
+        if not pointcloud.is_uploaded:  # type: ignore
+            pointcloud.upload_next_chunk()  # type: ignore
+            QtCore.QTimer.singleShot(0, self.update)  # the next chunk in the next frame
+        if pointcloud.upload_progress != self.drawn_upload_progress:  # type: ignore
+            self.drawn_upload_progress = pointcloud.upload_progress  # type: ignore
+            self.upload_progress.emit(self.drawn_upload_progress)
+
+    def get_point_budget(self) -> int:
+        """Maximum number of points to draw, smaller while the camera moves."""
+        moving = self.camera.version != self.drawn_camera_version
+        self.drawn_camera_version = self.camera.version
+        if self.pcd_manager.pointcloud.chunks is None:  # type: ignore
+            return 0
+        if moving:  # draw all points again once the camera stops
+            self.lod_refine_timer.start(LOD_REFINE_DELAY)
+        if self.lod_refine_timer.isActive():
+            return config.getint("POINTCLOUD", "moving_point_budget")
+        return config.getint("POINTCLOUD", "point_budget")
+
+    def update_drawn_scene(self) -> None:
+        """Drop cached depths and point ids if the view or the point cloud has changed."""
+        drawn_scene = (
+            self.pcd_manager.pointcloud,
+            self.camera.mvp.tobytes(),
+            self.camera.viewport,
+            config.getfloat("POINTCLOUD", "point_size"),
+            config.getboolean("USER_INTERFACE", "scaled_point_size"),
+            # fewer points are drawn while the camera moves
+            self.pcd_manager.pointcloud.drawn_points,  # type: ignore
+        )
+        self.depth_readback.collect()  # reads started in the previous frame
+        if self.drawn_scene is None or any(
+            new is not old and new != old
+            for new, old in zip(drawn_scene, self.drawn_scene)
+        ):
+            self.depth_readback.clear()
+            self.point_id_buffer.invalidate()
+        self.drawn_scene = drawn_scene
+
+    def to_gl_pixel(self, x: float, y: float) -> Tuple[int, int]:
+        x *= self.DEVICE_PIXEL_RATIO  # For fixing mac retina bug
+        y *= self.DEVICE_PIXEL_RATIO
+        return int(x), int(self.camera.viewport[3] - y)  # adjust for down-facing y positions
+
+    def get_crosshair_coords(self) -> Optional[Tuple[float, float, float]]:
+        """World coordinates of the crosshair without stalling the GL pipeline.
+
+        On a cache miss the depths are read asynchronously and the last crosshair
+        position is kept for this frame; another frame is drawn with the new depths.
+        """
+        x, y = self.to_gl_pixel(*self.crosshair_pos)
+        depths = self.depth_readback.get((x, y))
+        if depths is None and self.crosshair_world is None:
+            depths = self.depth_readback.read((x, y), x, y)
+        if depths is not None:
+            self.crosshair_world = self.unproject_depths(x, y, depths, correction=True)
+        else:
+            self.depth_readback.read_async((x, y), x, y)
+            QtCore.QTimer.singleShot(0, self.update)  # redraw with the collected depths
+        return self.crosshair_world
+
+    def pick_point_id(self, x: float, y: float) -> Optional[int]:
+        """Index of the point under the cursor, otherwise the first one along the ray.
+
+        Returns None while the spatial index is built and the id buffer can't be used,
+        the caller then falls back to the depth under the cursor.
+        """
+        pointcloud = self.pcd_manager.pointcloud
+        if pointcloud is None:
+            return None
+        point_id = None
+        # points that are not uploaded yet would be missing in the id buffer
+        if self.point_id_buffer.is_ready and pointcloud.is_uploaded:
+            self.makeCurrent()
+            # only drawn again if the view changed since the last pick
+            self.point_id_buffer.render(
+                pointcloud,
+                self.camera,
+                config.getboolean("USER_INTERFACE", "scaled_point_size"),
+            )
+            point_id = self.point_id_buffer.pick(*self.to_gl_pixel(x, y))
+        # don't wait for the index, this runs on every mouse move
+        if point_id is None and pointcloud.has_spatial_index:
+            point_id = self.pick_point_along_ray(x, y)
+        return point_id
+
+    def pick_point_along_ray(self, x: float, y: float) -> Optional[int]:
+        """Index of the first point within the picking cone around the cursor ray."""
+        if self.pcd_manager.pointcloud is None:
+            return None
+        return oglhelper.get_ray_picked_point(
+            x,
+            y,
+            self.pcd_manager.pointcloud.spatial_index,
+            self.camera,
+            config.getfloat("LABEL", "point_picking_cone"),
+        )
+
     # Translates the 2D cursor position from screen plane into 3D world space coordinates
     def get_world_coords(
         self, x: float, y: float, z: Optional[float] = None, correction: bool = False
     ) -> Tuple[float, float, float]:
-        x *= self.DEVICE_PIXEL_RATIO  # For fixing mac retina bug
-        y *= self.DEVICE_PIXEL_RATIO
-
-        # Stored projection matrices are taken from loop
-        viewport = GL.glGetIntegerv(GL.GL_VIEWPORT)
-        real_y = viewport[3] - y  # adjust for down-facing y positions
-
+        gl_x, gl_y = self.to_gl_pixel(x, y)
         if z is None:
-            buffer_size = 21
-            center = buffer_size // 2 + 1
-            depths = GL.glReadPixels(
-                x - center + 1,
-                real_y - center + 1,
-                buffer_size,
-                buffer_size,
-                GL.GL_DEPTH_COMPONENT,
-                GL.GL_FLOAT,
-            )
-            z = depths[center][center]  # Read selected pixel from depth buffer
+            # Depths are cached per cursor position until the view changes
+            depths = self.depth_readback.read((gl_x, gl_y), gl_x, gl_y)
+            center = DEPTH_WINDOW_SIZE // 2 + 1
+            pointcloud = self.pcd_manager.pointcloud
+            # no depth under the cursor, pick between the points instead of guessing,
+            # unless the index is still built (this runs on every mouse move)
+            if (
+                depths[center][center] == 1
+                and pointcloud is not None
+                and pointcloud.has_spatial_index
+            ):
+                point_id = self.pick_point_along_ray(x, y)
+                if point_id is not None:
+                    mod_x, mod_y, mod_z = pointcloud.points[point_id]
+                    return float(mod_x), float(mod_y), float(mod_z)
+            return self.unproject_depths(gl_x, gl_y, depths, correction)
+
+        mod_x, mod_y, mod_z = self.camera.unproject(gl_x, gl_y, z)
+        return mod_x, mod_y, mod_z
 
-            if z == 1:
-                z = depth_smoothing(depths, center)
-            elif correction:
-                z = depth_min(depths, center)
+    def unproject_depths(
+        self, x: int, y: int, depths: npt.NDArray, correction: bool
+    ) -> Tuple[float, float, float]:
+        center = DEPTH_WINDOW_SIZE // 2 + 1
+        z = depths[center][center]  # Read selected pixel from depth buffer
 
-        mod_x, mod_y, mod_z = GLU.gluUnProject(
-            x, real_y, z, self.modelview, self.projection, viewport
-        )
+        if z == 1:
+            z = depth_smoothing(depths, center)
+        elif correction:
+            z = depth_min(depths, center)
+
+        mod_x, mod_y, mod_z = self.camera.unproject(x, y, z)
         return mod_x, mod_y, mod_z
-    
 
     def set_current_label(self, text: Optional[str]) -> None:
         """Set the label text to display at the bottom of the widget."""